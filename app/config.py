@@ -6,20 +6,131 @@ load_dotenv()
 
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./ops_dashboard.db")
+    # Optional read replica for heavy read-only routes
+    DATABASE_REPLICA_URL: str = os.getenv("DATABASE_REPLICA_URL", "")
+    REPLICA_READ_YOUR_WRITES_SECONDS: float = float(os.getenv("REPLICA_READ_YOUR_WRITES_SECONDS", "10"))
     SECRET_KEY: str = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     APP_VERSION: str = "1.0.0"
+    # full: create tables and seed demo data on boot; schema: create tables only;
+    # fast: neither (schema managed out of band by `alembic upgrade head`); fast in production
+    STARTUP_MODE: str = os.getenv("STARTUP_MODE", "fast" if ENVIRONMENT == "production" else "full")
+    # Pool connections opened concurrently during startup
+    DB_WARM_CONNECTIONS: int = int(os.getenv("DB_WARM_CONNECTIONS", "4"))
+    # Connection pool; pre-ping costs a round trip per checkout, recycle covers stale connections
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    # Responses smaller than this (bytes) are sent uncompressed
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    # Pages are pre-rendered once; auto-reload re-renders them when a template file changes
+    TEMPLATE_AUTO_RELOAD: bool = os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true"
+    TEMPLATE_CACHE_DIR: str = os.getenv("TEMPLATE_CACHE_DIR", "")
+    # Embed the dashboard's initial API data in the page to save first-load round trips
+    PAGE_INITIAL_DATA: bool = os.getenv("PAGE_INITIAL_DATA", "true").lower() == "true"
+    # Health-check cycle: parallel checks, confirmation re-probes and circuit breaker
+    HEALTH_CHECK_CONCURRENCY: int = int(os.getenv("HEALTH_CHECK_CONCURRENCY", "20"))
+    CHECK_CONFIRM_RETRIES: int = int(os.getenv("CHECK_CONFIRM_RETRIES", "2"))
+    CHECK_RETRY_BACKOFF_MS: float = float(os.getenv("CHECK_RETRY_BACKOFF_MS", "250"))
+    # Re-probes (retries + vantage) allowed per cycle across all services
+    CHECK_RETRY_BUDGET: int = int(os.getenv("CHECK_RETRY_BUDGET", "50"))
+    # Second instance of this app used to confirm failures from another network
+    PROBE_VANTAGE_URL: str = os.getenv("PROBE_VANTAGE_URL", "")
+    # Bearer token sent to the vantage worker, and required by this instance's /api/probe
+    PROBE_VANTAGE_TOKEN: str = os.getenv("PROBE_VANTAGE_TOKEN", "")
+    # Circuit breaker: failures before it opens, then the first and longest cooldown in seconds
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    BREAKER_BASE_COOLDOWN: float = float(os.getenv("BREAKER_BASE_COOLDOWN", "120"))
+    BREAKER_MAX_COOLDOWN: float = float(os.getenv("BREAKER_MAX_COOLDOWN", "1800"))
+    # Checks slower than this are "degraded" unless the service sets degraded_after_ms
+    CHECK_DEGRADED_MS: float = float(os.getenv("CHECK_DEGRADED_MS", "200"))
+    # Upper bound on body bytes read for content assertions
+    HTTP_MAX_BODY_BYTES: int = int(os.getenv("HTTP_MAX_BODY_BYTES", "65536"))
+    # Certificates expiring within this many days mark the service degraded
+    TLS_EXPIRY_WARN_DAYS: int = int(os.getenv("TLS_EXPIRY_WARN_DAYS", "14"))
+    # Remote probe agents: seconds of silence before an agent is reported stale,
+    # and the largest decompressed result batch the dashboard accepts
+    AGENT_STALE_SECONDS: float = float(os.getenv("AGENT_STALE_SECONDS", "300"))
+    AGENT_MAX_BATCH_BYTES: int = int(os.getenv("AGENT_MAX_BATCH_BYTES", str(8 * 1024 * 1024)))
+    # Agent side (probe_agent.py): the dashboard to report to and this agent's token
+    AGENT_SERVER_URL: str = os.getenv("AGENT_SERVER_URL", "http://localhost:8000")
+    AGENT_TOKEN: str = os.getenv("AGENT_TOKEN", "")
+    AGENT_INTERVAL: float = float(os.getenv("AGENT_INTERVAL", "60"))
+    AGENT_BATCH_SIZE: int = int(os.getenv("AGENT_BATCH_SIZE", "500"))
+    # Most services a single bulk create may carry
+    SERVICE_BULK_LIMIT: int = int(os.getenv("SERVICE_BULK_LIMIT", "10000"))
+    # Comma-separated tenants accepted, "default" included; empty accepts any well-formed name
+    TENANTS: str = os.getenv("TENANTS", "")
+    # Shared secret the reverse proxy sends in X-Tenant-Proxy-Token; X-Tenant is rejected without it
+    TENANT_PROXY_TOKEN: str = os.getenv("TENANT_PROXY_TOKEN", "")
+    # Per-tenant limits: monitored services (0 = unlimited) and concurrent checks (0 = global limit only)
+    TENANT_MAX_SERVICES: int = int(os.getenv("TENANT_MAX_SERVICES", "0"))
+    TENANT_CHECK_CONCURRENCY: int = int(os.getenv("TENANT_CHECK_CONCURRENCY", "0"))
+    # Alert rules evaluated on every health-check result
+    ALERT_CONSECUTIVE_FAILURES: int = int(os.getenv("ALERT_CONSECUTIVE_FAILURES", "3"))
+    ALERT_LATENCY_P95_MS: float = float(os.getenv("ALERT_LATENCY_P95_MS", "1000"))
+    ALERT_LATENCY_WINDOW: int = int(os.getenv("ALERT_LATENCY_WINDOW", "20"))
+    ALERT_FLAP_TRANSITIONS: int = int(os.getenv("ALERT_FLAP_TRANSITIONS", "4"))
+    ALERT_FLAP_WINDOW: int = int(os.getenv("ALERT_FLAP_WINDOW", "10"))
+    # Notification sinks; each is enabled by setting its destination
+    ALERT_WEBHOOK_URL: str = os.getenv("ALERT_WEBHOOK_URL", "")
+    ALERT_SMTP_HOST: str = os.getenv("ALERT_SMTP_HOST", "")
+    ALERT_SMTP_PORT: int = int(os.getenv("ALERT_SMTP_PORT", "25"))
+    ALERT_EMAIL_FROM: str = os.getenv("ALERT_EMAIL_FROM", "ops-dashboard@localhost")
+    ALERT_EMAIL_TO: str = os.getenv("ALERT_EMAIL_TO", "")
+    ALERT_CREATE_TICKETS: bool = os.getenv("ALERT_CREATE_TICKETS", "true").lower() == "true"
+    # Minimum seconds between "still failing" updates appended to an incident ticket
+    INCIDENT_UPDATE_INTERVAL: float = float(os.getenv("INCIDENT_UPDATE_INTERVAL", "900"))
+    # Per-service latency baselines; robust z-score and absolute margin needed to flag an anomaly
+    ANOMALY_DETECTION: bool = os.getenv("ANOMALY_DETECTION", "true").lower() == "true"
+    ANOMALY_WINDOW: int = int(os.getenv("ANOMALY_WINDOW", "240"))
+    ANOMALY_MIN_SAMPLES: int = int(os.getenv("ANOMALY_MIN_SAMPLES", "20"))
+    ANOMALY_THRESHOLD: float = float(os.getenv("ANOMALY_THRESHOLD", "5"))
+    ANOMALY_MIN_DELTA_MS: float = float(os.getenv("ANOMALY_MIN_DELTA_MS", "50"))
+    ANOMALY_CONSECUTIVE: int = int(os.getenv("ANOMALY_CONSECUTIVE", "2"))
+    # Results kept per service for each UTC hour of the day; 0 turns off time-of-day baselines
+    ANOMALY_SEASONAL_SAMPLES: int = int(os.getenv("ANOMALY_SEASONAL_SAMPLES", "60"))
+    # Seconds between batch recomputes of the median/MAD baselines
+    ANOMALY_RECOMPUTE_SECONDS: float = float(os.getenv("ANOMALY_RECOMPUTE_SECONDS", "300"))
+    # Ticket SLA targets per priority as "priority:response_minutes/resolution_minutes"
+    TICKET_SLA_TARGETS: str = os.getenv(
+        "TICKET_SLA_TARGETS", "critical:15/240,high:60/480,medium:240/1440,low:480/4320",
+    )
+    # Comma-separated assignees for successive escalation levels; empty keeps the assignee
+    TICKET_ESCALATION_CHAIN: str = os.getenv("TICKET_ESCALATION_CHAIN", "")
+    # Similar tickets/articles returned per suggestion list, and how often the in-memory index is rebuilt
+    SUGGESTION_TOP_K: int = int(os.getenv("SUGGESTION_TOP_K", "5"))
+    SUGGESTION_REFRESH_SECONDS: float = float(os.getenv("SUGGESTION_REFRESH_SECONDS", "900"))
+    # Outbound-heavy endpoints as "name:client_per_minute/total_per_minute/max_in_flight" (0 = no limit)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMITS: str = os.getenv(
+        "RATE_LIMITS", "portscan:6/30/4,geoip:30/120/8,service-check:30/300/10,bulk-check:4/20/2",
+    )
+    # Behind a proxy, identify clients by the first X-Forwarded-For address instead of the socket peer
+    RATE_LIMIT_TRUST_FORWARDED: bool = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Admin-only endpoints (profiling) are disabled unless a token is configured
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    # Callbacks blocking the event loop longer than this are logged with a stack trace (0 = off)
+    LOOP_BLOCK_THRESHOLD_MS: float = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "250"))
 
     def __init__(self):
+        self.DATABASE_URL = self._normalize_url(self.DATABASE_URL)
+        self.DATABASE_REPLICA_URL = self._normalize_url(self.DATABASE_REPLICA_URL)
+
+    @staticmethod
+    def _normalize_url(url: str) -> str:
         # Render provides postgres:// but SQLAlchemy needs postgresql+asyncpg://
-        if self.DATABASE_URL.startswith("postgres://"):
-            self.DATABASE_URL = self.DATABASE_URL.replace(
-                "postgres://", "postgresql+asyncpg://", 1
-            )
-        elif self.DATABASE_URL.startswith("postgresql://"):
-            self.DATABASE_URL = self.DATABASE_URL.replace(
-                "postgresql://", "postgresql+asyncpg://", 1
-            )
+        if url.startswith("postgres://"):
+            return url.replace("postgres://", "postgresql+asyncpg://", 1)
+        elif url.startswith("postgresql://"):
+            return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+        return url
 
 
 settings = Settings()
@@ -1,15 +1,77 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import time
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
 
-# Handle SQLite for local dev vs PostgreSQL for production
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine = create_async_engine(settings.DATABASE_URL, echo=False)
-else:
-    engine = create_async_engine(settings.DATABASE_URL, echo=False, pool_pre_ping=True)
+
+def _is_sqlite_memory(url: str) -> bool:
+    return ":memory:" in url or url.rstrip("/").endswith("sqlite+aiosqlite:")
+
+
+def _pool_kwargs() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers proceed while the health checker writes; busy_timeout makes
+    # concurrent writers wait for the lock instead of failing with "database is locked".
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def build_engine(url: str) -> AsyncEngine:
+    """Create an engine with pool and driver settings tuned for the backend."""
+    if url.startswith("sqlite"):
+        if _is_sqlite_memory(url):
+            engine = create_async_engine(url, echo=False)
+        else:
+            # aiosqlite defaults to NullPool, which reopens the file (and re-runs
+            # the pragmas) on every checkout.
+            engine = create_async_engine(url, echo=False, poolclass=AsyncAdaptedQueuePool, **_pool_kwargs())
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+        return engine
+
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg"):
+        connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+    return create_async_engine(url, echo=False, connect_args=connect_args, **_pool_kwargs())
+
+
+engine = build_engine(settings.DATABASE_URL)
+replica_engine = build_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
+
+if settings.METRICS_ENABLED:
+    from app.services.metrics import instrument_engine
+    instrument_engine(engine)
+    if replica_engine is not None:
+        instrument_engine(replica_engine, "replica")
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# Falls back to the primary when no replica is configured
+replica_session = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None else async_session
+)
+
+# Set on responses to mutating requests so the same client keeps reading from the
+# primary until the replica has had time to catch up.
+LAST_WRITE_COOKIE = "ops_last_write"
 
 
 class Base(DeclarativeBase):
@@ -24,6 +86,28 @@ async def get_db():
             await session.close()
 
 
+def replica_enabled() -> bool:
+    return replica_session is not async_session
+
+
+def wrote_recently(request: Request) -> bool:
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    return time.time() - last_write < settings.REPLICA_READ_YOUR_WRITES_SECONDS
+
+
+async def get_read_db(request: Request):
+    """Session for read-only routes: the replica, unless this client just wrote."""
+    factory = async_session if wrote_recently(request) else replica_session
+    async with factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
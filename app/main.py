@@ -1,14 +1,18 @@
 import asyncio
 from contextlib import asynccontextmanager
 
+# Imported first so the startup timer covers loading the rest of the app
+from app.services import startup
+
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.config import settings
-from app.database import init_db
+from app.database import engine, init_db
+from app.static_files import STATIC_DIR, CachedStaticFiles
+from app.templating import get_shell
+from app.middleware import CompressionMiddleware, MetricsMiddleware, ReadYourWritesMiddleware
 
 # Import models so tables are registered with Base.metadata
 import app.models  # noqa: F401
@@ -20,21 +24,60 @@ from app.routers import knowledge as knowledge_router
 from app.routers import logs as logs_router
 from app.routers import websocket as websocket_router
 from app.routers import dashboard as dashboard_router
-from app.services.health_checker import health_check_loop
+from app.routers import bulk as bulk_router
+from app.routers import admin as admin_router
+from app.routers import alerts as alerts_router
+from app.routers import probe as probe_router
+from app.routers import reports as reports_router
+from app.routers import agents as agents_router
+from app.services.health_checker import close_http_client, health_check_loop
+from app.services.metrics import registry
+from app.services.ticket_sla import scheduler as ticket_sla_scheduler
+from app.services.watchdog import loop_watchdog
+
+
+async def prepare_database():
+    if settings.STARTUP_MODE in ("full", "schema"):
+        with startup.timer.phase("schema"):
+            await init_db()
+    if settings.STARTUP_MODE == "full":
+        with startup.timer.phase("seed"):
+            from seed import seed_database
+            await seed_database(create_schema=False)
+
+
+async def warm_pool():
+    if settings.DB_WARM_CONNECTIONS > 0:
+        with startup.timer.phase("pool_warmup"):
+            await startup.warm_pool(engine, settings.DB_WARM_CONNECTIONS)
+
+
+async def background_health_checks():
+    # Load httpx & co. off the event loop before the first check needs them
+    await startup.prewarm_imports()
+    await health_check_loop()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: create tables and seed data
-    await init_db()
-    from seed import seed_database
-    await seed_database()
+    startup.timer.record("import", startup.timer.elapsed())
+    # Schema/seed and pool warm-up are independent, so run them concurrently
+    await asyncio.gather(prepare_database(), warm_pool())
+    with startup.timer.phase("templates"):
+        dashboard_router.prerender_pages()
 
     # Start background health check loop
-    task = asyncio.create_task(health_check_loop())
+    tasks = [
+        asyncio.create_task(background_health_checks()),
+        asyncio.create_task(loop_watchdog.run()),
+        asyncio.create_task(ticket_sla_scheduler.run()),
+    ]
+    startup.timer.ready()
     yield
     # Shutdown
-    task.cancel()
+    for task in tasks:
+        task.cancel()
+    await close_http_client()
 
 
 app = FastAPI(
@@ -44,8 +87,12 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
-templates = Jinja2Templates(directory="app/templates")
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+app.add_middleware(ReadYourWritesMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
 
 # Register routers
 app.include_router(services_router.router)
@@ -54,14 +101,20 @@ app.include_router(tickets_router.router)
 app.include_router(knowledge_router.router)
 app.include_router(logs_router.router)
 app.include_router(websocket_router.router)
+app.include_router(bulk_router.router)
+app.include_router(admin_router.router)
+app.include_router(alerts_router.router)
+app.include_router(probe_router.router)
+app.include_router(reports_router.router)
+app.include_router(agents_router.router)
 app.include_router(dashboard_router.router)  # Page routes last so API takes precedence
 
 
 @app.exception_handler(StarletteHTTPException)
 async def custom_404_handler(request: Request, exc: StarletteHTTPException):
     if exc.status_code == 404 and not request.url.path.startswith("/api/"):
-        return templates.TemplateResponse("404.html", {"request": request}, status_code=404)
-    return HTMLResponse(content=str(exc.detail), status_code=exc.status_code)
+        return HTMLResponse(get_shell("404.html")[0], status_code=404)
+    return HTMLResponse(content=str(exc.detail), status_code=exc.status_code, headers=exc.headers)
 
 
 @app.get("/health")
@@ -71,3 +124,8 @@ async def health_check():
         "version": settings.APP_VERSION,
         "environment": settings.ENVIRONMENT,
     }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,204 @@
+"""Pure ASGI middleware used by the application."""
+
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Optional: fall back to gzip only
+    brotli = None
+
+from app import database
+from app.config import settings
+from app.services.metrics import http_request_duration, http_requests_in_flight
+
+
+class MetricsMiddleware:
+    """Record request latency per route template (not raw path, to bound cardinality)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            if route is not None:
+                path = route.path
+            elif scope["path"].startswith("/static/"):
+                path = "/static/{path}"
+            else:
+                path = "unmatched"
+            http_request_duration.labels(scope["method"], path, status).observe(time.perf_counter() - start)
+
+
+class ReadYourWritesMiddleware:
+    """Tag clients that just wrote so their reads stay on the primary for a while."""
+
+    SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in self.SAFE_METHODS or not database.replica_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                max_age = int(settings.REPLICA_READ_YOUR_WRITES_SECONDS) + 1
+                cookie = (
+                    f"{database.LAST_WRITE_COOKIE}={time.time():.3f}; Max-Age={max_age}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, whichever the client prefers and we support.
+
+    Buffered bodies below `minimum_size` are sent as-is; streamed bodies are
+    compressed chunk by chunk. Responses that are already encoded or whose
+    content type doesn't compress well pass through untouched.
+    """
+
+    COMPRESSIBLE_TYPES = (
+        "application/json", "application/x-ndjson", "application/javascript",
+        "text/", "image/svg+xml",
+    )
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 5, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose_encoding(self, scope) -> str | None:
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accepted = {part.split(b";")[0].strip() for part in value.lower().split(b",")}
+                if brotli is not None and b"br" in accepted:
+                    return "br"
+                if b"gzip" in accepted:
+                    return "gzip"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        encoding = self._choose_encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if start_message is not None:
+                start, start_message = start_message, None
+                headers = {k.lower(): v for k, v in start["headers"]}
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if (
+                    b"content-encoding" in headers
+                    or not content_type.startswith(self.COMPRESSIBLE_TYPES)
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = self._new_compressor(encoding)
+                new_headers = [
+                    (k, v) for k, v in start["headers"] if k.lower() not in (b"content-length", b"etag")
+                ]
+                # Representations differ per encoding, so strong ETags must too
+                if b"etag" in headers:
+                    etag = headers[b"etag"]
+                    if not etag.startswith(b"W/"):
+                        etag = etag[:-1] + f"-{encoding}".encode() + etag[-1:]
+                    new_headers.append((b"etag", etag))
+                new_headers.append((b"content-encoding", encoding.encode()))
+                new_headers.append((b"vary", b"Accept-Encoding"))
+                if not more_body:
+                    compressed = compressor.compress(body) + compressor.flush()
+                    new_headers.append((b"content-length", str(len(compressed)).encode()))
+                    await send({**start, "headers": new_headers})
+                    await send({"type": "http.response.body", "body": compressed})
+                    compressor = None
+                    return
+                await send({**start, "headers": new_headers})
+
+            if compressor is None:
+                await send(message)
+                return
+            more_body = message.get("more_body", False)
+            chunk = compressor.compress(message.get("body", b""))
+            if more_body:
+                chunk += compressor.flush_partial()
+            else:
+                chunk += compressor.flush()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _new_compressor(self, encoding: str):
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush_partial(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush_partial(self) -> bytes:
+        return self._obj.flush()
+
+    def flush(self) -> bytes:
+        return self._obj.finish()
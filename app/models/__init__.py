@@ -1,6 +1,12 @@
 from app.models.service import MonitoredService
-from app.models.ticket import Ticket
+from app.models.ticket import Ticket, TicketEvent
 from app.models.log_entry import LogEntry
 from app.models.knowledge import KnowledgeArticle
+from app.models.sla import ServiceStatusInterval, SlaMonth, SlaMonthlySummary
+from app.models.agent import ProbeAgent
+from app.models.table_version import TableVersion
 
-__all__ = ["MonitoredService", "Ticket", "LogEntry", "KnowledgeArticle"]
+__all__ = [
+    "MonitoredService", "Ticket", "TicketEvent", "LogEntry", "KnowledgeArticle",
+    "ServiceStatusInterval", "SlaMonth", "SlaMonthlySummary", "ProbeAgent", "TableVersion",
+]
@@ -1,13 +1,16 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Integer, String, Text
+from sqlalchemy import DateTime, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
+from app.tenancy import DEFAULT_TENANT
 
 
 class KnowledgeArticle(Base):
     __tablename__ = "knowledge_articles"
+    # Articles are listed newest first within a tenant
+    __table_args__ = (Index("ix_knowledge_articles_tenant_updated_at", "tenant", "updated_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -18,6 +21,7 @@ class KnowledgeArticle(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+    tenant: Mapped[str] = mapped_column(String(50), nullable=False, default=DEFAULT_TENANT)
 
     def to_dict(self) -> dict:
         return {
@@ -28,4 +32,5 @@ class KnowledgeArticle(Base):
             "tags": self.tags,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "tenant": self.tenant,
         }
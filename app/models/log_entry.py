@@ -1,13 +1,19 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Integer, String, Text
+from sqlalchemy import DateTime, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
+from app.tenancy import DEFAULT_TENANT
 
 
 class LogEntry(Base):
     __tablename__ = "log_entries"
+    # The log viewer's newest-first listing and its source list, per tenant
+    __table_args__ = (
+        Index("ix_log_entries_tenant_timestamp", "tenant", "timestamp"),
+        Index("ix_log_entries_tenant_source", "tenant", "source"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -15,6 +21,7 @@ class LogEntry(Base):
     source: Mapped[str] = mapped_column(String(100), nullable=False)
     message: Mapped[str] = mapped_column(Text, nullable=False)
     metadata_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    tenant: Mapped[str] = mapped_column(String(50), nullable=False, default=DEFAULT_TENANT)
 
     def to_dict(self) -> dict:
         return {
@@ -24,4 +31,5 @@ class LogEntry(Base):
             "source": self.source,
             "message": self.message,
             "metadata_json": self.metadata_json,
+            "tenant": self.tenant,
         }
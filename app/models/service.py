@@ -1,13 +1,19 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Float, Integer, String
+from sqlalchemy import JSON, Boolean, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
+from app.tenancy import DEFAULT_TENANT
 
 
 class MonitoredService(Base):
     __tablename__ = "monitored_services"
+    # Tenant-scoped listings, by name and by group
+    __table_args__ = (
+        Index("ix_monitored_services_tenant_name", "tenant", "name"),
+        Index("ix_monitored_services_tenant_group", "tenant", "group_name"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -19,6 +25,28 @@ class MonitoredService(Base):
     last_checked: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Free-form grouping (e.g. a datacenter); tags are comma-separated like knowledge article tags
+    group_name: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    tags: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    # Upstream service this one depends on; see app.services.topology
+    parent_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("monitored_services.id", ondelete="SET NULL"), nullable=True, index=True,
+    )
+    # Probe agent that checks this service remotely; None means the dashboard checks it
+    agent_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("probe_agents.id", ondelete="SET NULL"), nullable=True, index=True,
+    )
+    # HTTP check configuration; None falls back to the global defaults
+    http_method: Mapped[str] = mapped_column(String(10), default="GET")
+    http_headers: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    degraded_after_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    body_contains: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    body_regex: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    max_body_bytes: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Filled in by checks
+    check_detail: Mapped[str | None] = mapped_column(String(300), nullable=True)
+    tls_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    tenant: Mapped[str] = mapped_column(String(50), nullable=False, default=DEFAULT_TENANT)
 
     def to_dict(self) -> dict:
         return {
@@ -32,4 +60,17 @@ class MonitoredService(Base):
             "last_checked": self.last_checked.isoformat() if self.last_checked else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "is_active": self.is_active,
+            "group_name": self.group_name,
+            "tags": self.tags,
+            "parent_id": self.parent_id,
+            "agent_id": self.agent_id,
+            "http_method": self.http_method,
+            "http_headers": self.http_headers,
+            "degraded_after_ms": self.degraded_after_ms,
+            "body_contains": self.body_contains,
+            "body_regex": self.body_regex,
+            "max_body_bytes": self.max_body_bytes,
+            "check_detail": self.check_detail,
+            "tls_expires_at": self.tls_expires_at.isoformat() if self.tls_expires_at else None,
+            "tenant": self.tenant,
         }
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Float, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ServiceStatusInterval(Base):
+    """A run of identical check results: the service was `status` from started_at to ended_at."""
+
+    __tablename__ = "service_status_intervals"
+    # Unique, so two writers rolling the same interval over a month boundary can't duplicate it
+    __table_args__ = (Index("ix_status_intervals_service_start", "service_id", "started_at", unique=True),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    service_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    # None while the interval is still open
+    ended_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
+    # Set on the interval that starts an outage (a move from up or unknown into a down status)
+    failure: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "service_id": self.service_id,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "ended_at": self.ended_at.isoformat() if self.ended_at else None,
+            "failure": self.failure,
+        }
+
+
+class SlaMonthlySummary(Base):
+    """Precomputed totals for one service over one closed calendar month."""
+
+    __tablename__ = "sla_monthly_summaries"
+
+    # service_id first: reports sum a range of months per service, which then needs no sort
+    service_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    observed_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    up_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    down_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    failures: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class SlaMonth(Base):
+    """Marks a month whose summaries have been computed for every service."""
+
+    __tablename__ = "sla_months"
+
+    month: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,56 @@
+from sqlalchemy import DDL, Integer, String, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.knowledge import KnowledgeArticle
+from app.models.log_entry import LogEntry
+from app.models.service import MonitoredService
+from app.models.ticket import Ticket
+
+
+class TableVersion(Base):
+    """Change counter per table, bumped by triggers; see app.services.table_versions."""
+
+    __tablename__ = "table_versions"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+TRACKED_TABLES = (MonitoredService.__table__, Ticket.__table__, KnowledgeArticle.__table__, LogEntry.__table__)
+
+_BUMP = (
+    "INSERT INTO table_versions (name, version) VALUES ({name}, 1) "
+    "ON CONFLICT (name) DO UPDATE SET version = table_versions.version + 1"
+)
+
+BUMP_FUNCTION_DDL = f"""
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    {_BUMP.format(name="TG_TABLE_NAME")};
+    RETURN NULL;
+END $$
+"""
+
+
+def trigger_ddl(table_name: str, dialect: str) -> list[str]:
+    """Triggers bumping `table_name`'s version in the writing transaction."""
+    if dialect == "postgresql":
+        # Once per statement, so bulk writes and COPY bump once
+        return [
+            BUMP_FUNCTION_DDL,
+            f"CREATE TRIGGER {table_name}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+            f"ON {table_name} FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()",
+        ]
+    # SQLite only has row triggers
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_version_{op.lower()} AFTER {op} ON {table_name} "
+        f"BEGIN {_BUMP.format(name=repr(table_name))}; END"
+        for op in ("INSERT", "UPDATE", "DELETE")
+    ]
+
+
+for _table in TRACKED_TABLES:
+    for _dialect in ("sqlite", "postgresql"):
+        for _statement in trigger_ddl(_table.name, _dialect):
+            event.listen(_table, "after_create", DDL(_statement).execute_if(dialect=_dialect))
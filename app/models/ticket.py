@@ -1,13 +1,28 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Integer, String, Text
+from sqlalchemy import DDL, JSON, Boolean, DateTime, Index, Integer, String, Text, event, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
+from app.tenancy import DEFAULT_TENANT
+
+
+# The document searched on PostgreSQL; queries must use the same expression for
+# the GIN index below to apply
+TICKET_TSVECTOR = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
 
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        Index("ix_tickets_fulltext", text(TICKET_TSVECTOR), postgresql_using="gin").ddl_if(dialect="postgresql"),
+        # Tenant-leading: listings, search filters and stats all start from one tenant's rows
+        Index("ix_tickets_tenant_created_at", "tenant", "created_at"),
+        Index("ix_tickets_tenant_status", "tenant", "status"),
+        Index("ix_tickets_tenant_assigned_to", "tenant", "assigned_to"),
+        # Never reuse the id of a deleted ticket: its history is kept under that id
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -21,6 +36,18 @@ class Ticket(Base):
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
     resolved_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Set on tickets opened automatically for an incident, e.g. "service:12"
+    fingerprint: Mapped[str | None] = mapped_column(String(100), nullable=True, index=True)
+    # SLA timers; see app.services.ticket_sla
+    responded_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    response_due_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    resolution_due_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    response_breached: Mapped[bool] = mapped_column(Boolean, default=False)
+    resolution_breached: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Earliest deadline still pending; None once no timer can fire
+    next_due_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
+    escalation_level: Mapped[int] = mapped_column(Integer, default=0)
+    tenant: Mapped[str] = mapped_column(String(50), nullable=False, default=DEFAULT_TENANT)
 
     def to_dict(self) -> dict:
         return {
@@ -34,4 +61,69 @@ class Ticket(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "resolved_at": self.resolved_at.isoformat() if self.resolved_at else None,
+            "fingerprint": self.fingerprint,
+            "responded_at": self.responded_at.isoformat() if self.responded_at else None,
+            "response_due_at": self.response_due_at.isoformat() if self.response_due_at else None,
+            "resolution_due_at": self.resolution_due_at.isoformat() if self.resolution_due_at else None,
+            "response_breached": self.response_breached,
+            "resolution_breached": self.resolution_breached,
+            "next_due_at": self.next_due_at.isoformat() if self.next_due_at else None,
+            "escalation_level": self.escalation_level,
+            "tenant": self.tenant,
+        }
+
+
+# On SQLite the full-text index is an external-content FTS5 table over
+# tickets.title/description, kept in sync by triggers so every write path
+# (ORM, Core inserts, bulk imports) updates it in the same transaction
+TICKETS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE tickets_fts USING fts5("
+    "title, description, content='tickets', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER tickets_fts_insert AFTER INSERT ON tickets BEGIN "
+    "INSERT INTO tickets_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER tickets_fts_delete AFTER DELETE ON tickets BEGIN "
+    "INSERT INTO tickets_fts(tickets_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER tickets_fts_update AFTER UPDATE OF title, description ON tickets BEGIN "
+    "INSERT INTO tickets_fts(tickets_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tickets_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+)
+for _ddl in TICKETS_FTS_DDL:
+    event.listen(Ticket.__table__, "after_create", DDL(_ddl).execute_if(dialect="sqlite"))
+event.listen(Ticket.__table__, "after_drop", DDL("DROP TABLE IF EXISTS tickets_fts").execute_if(dialect="sqlite"))
+
+
+class TicketEvent(Base):
+    """One append-only entry in a ticket's history: what changed, when and by whom."""
+
+    __tablename__ = "ticket_events"
+    # Keyset pagination: a ticket's timeline and an actor's activity are both
+    # "WHERE key = ? AND id < ? ORDER BY id DESC", a single index range scan
+    __table_args__ = (
+        Index("ix_ticket_events_ticket_id_id", "ticket_id", "id"),
+        Index("ix_ticket_events_tenant_id", "tenant", "id"),
+        Index("ix_ticket_events_tenant_actor_id", "tenant", "actor", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # Not a foreign key: the history outlives the ticket
+    ticket_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    tenant: Mapped[str] = mapped_column(String(50), nullable=False, default=DEFAULT_TENANT)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # "created", "updated", "escalated" or "deleted"
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    actor: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    # {field: [old, new]}
+    changes: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "ticket_id": self.ticket_id,
+            "tenant": self.tenant,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "kind": self.kind,
+            "actor": self.actor,
+            "changes": self.changes,
         }
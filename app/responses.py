@@ -0,0 +1,69 @@
+"""Fast, revalidatable responses for list endpoints and pages.
+
+List routes select plain column tuples instead of hydrating ORM objects and
+encode them with orjson, skipping FastAPI's generic `jsonable_encoder` pass.
+orjson renders naive datetimes exactly like `datetime.isoformat()`, so the
+output matches the models' `to_dict()`.
+
+Responses carry a weak ETag derived from the versions of the tables they read,
+the query string and the tenant, so polling clients get a bodyless 304 until
+something actually changes. The versions are read on the route's own session,
+before its data; see app.services.table_versions.
+"""
+
+import hashlib
+
+from fastapi import Query, Request, Response
+from fastapi.responses import HTMLResponse, ORJSONResponse
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import table_versions
+
+# Accepted values for the `format` query parameter on list endpoints
+ROW_FORMATS = "^(objects|columnar)$"
+
+
+def row_format(format: str = Query("objects", pattern=ROW_FORMATS)) -> str:
+    """`objects` is a list of dicts; `columnar` is {"columns": [...], "rows": [[...], ...]}."""
+    return format
+
+
+async def list_etag(request: Request, db: AsyncSession, tenant: str, *tables: str) -> str:
+    key = f"{await table_versions.version(db, *tables)}?{request.url.query}#{tenant}"
+    return f'W/"{hashlib.blake2b(key.encode(), digest_size=8).hexdigest()}"'
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """Return a 304 response if the client already holds `etag`, else None."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return Response(status_code=304, headers=_cache_headers(etag))
+    return None
+
+
+def _cache_headers(etag: str | None) -> dict:
+    if etag is None:
+        return {}
+    # Always revalidate: the ETag is cheap to compute and the data changes often.
+    # The same URL serves different data per tenant
+    return {"ETag": etag, "Cache-Control": "no-cache", "Vary": "X-Tenant"}
+
+
+def json_response(content, etag: str | None = None) -> ORJSONResponse:
+    return ORJSONResponse(content, headers=_cache_headers(etag))
+
+
+def html_response(body: bytes, etag: str | None = None, status_code: int = 200) -> HTMLResponse:
+    return HTMLResponse(body, status_code=status_code, headers=_cache_headers(etag))
+
+
+def rows_response(result: Result, format: str = "objects", etag: str | None = None) -> ORJSONResponse:
+    columns = list(result.keys())
+    rows = result.all()
+    if format == "columnar":
+        return json_response({"columns": columns, "rows": [tuple(row) for row in rows]}, etag)
+    return json_response([dict(zip(columns, row)) for row in rows], etag)
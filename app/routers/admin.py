@@ -0,0 +1,36 @@
+"""Admin-only diagnostics: sampling profiler, event-loop stall history and startup timings."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.security import require_admin
+from app.services import startup
+from app.services.profiler import ProfilerBusy, profile
+from app.services.watchdog import loop_watchdog
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post("/profile")
+async def profile_endpoint(
+    seconds: float = Query(5.0, ge=0.1, le=60.0),
+    interval_ms: float = Query(5.0, ge=1.0, le=100.0),
+):
+    try:
+        text, samples = await profile(seconds, interval_ms / 1000)
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return PlainTextResponse(text, headers={"X-Profile-Samples": str(samples)})
+
+
+@router.get("/loop-stalls")
+async def loop_stalls():
+    return {
+        "threshold_ms": loop_watchdog.threshold * 1000,
+        "stalls": list(loop_watchdog.recent_stalls),
+    }
+
+
+@router.get("/startup")
+async def startup_timings():
+    return startup.timer.to_dict()
@@ -0,0 +1,190 @@
+"""Remote probe agents: registration, service assignments and result ingestion.
+
+Services with an `agent_id` are checked by that agent instead of the dashboard.
+The agent pulls its assignments from `/api/agents/me/assignments` and pushes
+gzip-compressed result batches to `/api/agents/me/results`, which go through the
+same status, alerting and SLA path as local checks.
+"""
+
+import secrets
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db, get_read_db
+from app.models.agent import ProbeAgent
+from app.models.service import MonitoredService
+from app.responses import rows_response
+from app.security import hash_token, require_admin, require_agent
+from app.services import metrics, sla
+from app.services.alerting import alert_manager
+from app.services.check_policy import VANTAGE_FIELDS
+from app.services.health_checker import apply_result
+
+router = APIRouter(prefix="/api/agents", tags=["agents"])
+
+# Keeps a batch's service lookup under every backend's bound-parameter limit
+MAX_RESULTS_PER_BATCH = 5000
+
+
+class AgentCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+
+
+class AgentResult(BaseModel):
+    service_id: int
+    status: str = Field(..., pattern="^(online|degraded|offline)$")
+    response_time_ms: float | None = None
+    detail: str | None = Field(None, max_length=300)
+    tls_expires_at: datetime | None = None
+    checked_at: datetime
+
+
+class ResultBatch(BaseModel):
+    results: list[AgentResult] = Field(..., max_length=MAX_RESULTS_PER_BATCH)
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+async def _read_batch(request: Request) -> bytes:
+    """The request body, gunzipped if needed, refusing anything over AGENT_MAX_BATCH_BYTES."""
+    limit = settings.AGENT_MAX_BATCH_BYTES
+    gzipped = request.headers.get("content-encoding", "").lower() == "gzip"
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    body = bytearray()
+    async for chunk in request.stream():
+        if inflater is not None:
+            try:
+                # Bounded output, so a small "zip bomb" can't expand without limit
+                chunk = inflater.decompress(chunk, limit + 1 - len(body))
+            except zlib.error:
+                raise HTTPException(status_code=400, detail="Invalid gzip body")
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail="Result batch too large")
+    if inflater is not None and not inflater.eof:
+        raise HTTPException(status_code=400, detail="Truncated gzip body")
+    return bytes(body)
+
+
+@router.get("")
+async def list_agents(db: AsyncSession = Depends(get_read_db)):
+    """Registered agents with their service counts; silent agents are flagged stale."""
+    counts = dict((await db.execute(
+        select(MonitoredService.agent_id, func.count())
+        .where(MonitoredService.agent_id.is_not(None))
+        .group_by(MonitoredService.agent_id)
+    )).all())
+    agents = (await db.execute(select(ProbeAgent).order_by(ProbeAgent.name))).scalars().all()
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.AGENT_STALE_SECONDS)
+    return [
+        {
+            **agent.to_dict(),
+            "services": counts.get(agent.id, 0),
+            "stale": agent.last_seen_at is None or agent.last_seen_at < stale_before,
+        }
+        for agent in agents
+    ]
+
+
+@router.post("", status_code=201, dependencies=[Depends(require_admin)])
+async def register_agent(data: AgentCreate, db: AsyncSession = Depends(get_db)):
+    """Register an agent. Its token is returned once and only its hash is stored."""
+    token = secrets.token_urlsafe(32)
+    agent = ProbeAgent(name=data.name, token_hash=hash_token(token))
+    db.add(agent)
+    try:
+        await db.commit()
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="An agent with that name already exists")
+    await db.refresh(agent)
+    return {**agent.to_dict(), "token": token}
+
+
+@router.delete("/{agent_id}", dependencies=[Depends(require_admin)])
+async def delete_agent(agent_id: int, db: AsyncSession = Depends(get_db)):
+    agent = await db.get(ProbeAgent, agent_id)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    # Its services go back to being checked by the dashboard
+    await db.execute(update(MonitoredService).where(MonitoredService.agent_id == agent_id).values(agent_id=None))
+    await db.delete(agent)
+    await db.commit()
+    return {"message": "Agent deleted"}
+
+
+@router.get("/me/assignments")
+async def assignments(agent: ProbeAgent = Depends(require_agent), db: AsyncSession = Depends(get_db)):
+    """The active services this agent should check, with their check configuration."""
+    agent.last_seen_at = datetime.utcnow()
+    await db.commit()
+    columns = [MonitoredService.id, MonitoredService.status] + [
+        getattr(MonitoredService, field) for field in VANTAGE_FIELDS
+    ]
+    result = await db.execute(
+        select(*columns)
+        .where(MonitoredService.agent_id == agent.id)
+        .where(MonitoredService.is_active == True)
+        .order_by(MonitoredService.id)
+    )
+    return rows_response(result)
+
+
+@router.post("/me/results")
+async def ingest_results(request: Request, agent: ProbeAgent = Depends(require_agent),
+                         db: AsyncSession = Depends(get_db)):
+    """Apply a batch of check results, optionally gzip-compressed, in one transaction.
+
+    Results for services not assigned to this agent are rejected; results older
+    than the service's last check are ignored as stale.
+    """
+    try:
+        batch = ResultBatch.model_validate_json(await _read_batch(request))
+    except ValidationError as e:
+        first = e.errors()[0]
+        raise HTTPException(status_code=422, detail=f"{'.'.join(str(p) for p in first['loc'])}: {first['msg']}")
+
+    ids = {r.service_id for r in batch.results}
+    result = await db.execute(
+        select(MonitoredService).where(MonitoredService.id.in_(ids)).where(MonitoredService.agent_id == agent.id)
+    )
+    services = {service.id: service for service in result.scalars()}
+    previous = {sid: service.status for sid, service in services.items()}
+
+    now = datetime.utcnow()
+    notifications = []
+    accepted = stale = 0
+    rejected = sorted(ids - services.keys())
+    for r in sorted(batch.results, key=lambda r: _naive_utc(r.checked_at)):
+        service = services.get(r.service_id)
+        if service is None:
+            continue
+        checked_at = min(_naive_utc(r.checked_at), now)
+        if service.last_checked is not None and checked_at <= service.last_checked:
+            stale += 1
+            continue
+        notifications += await apply_result(db, service, {
+            "status": r.status,
+            "response_time_ms": r.response_time_ms,
+            "detail": r.detail,
+            "tls_expires_at": _naive_utc(r.tls_expires_at) if r.tls_expires_at else None,
+        })
+        service.last_checked = checked_at
+        accepted += 1
+
+    await sla.record_statuses(db, {sid: service.status for sid, service in services.items()}, previous)
+    agent.last_seen_at = now
+    await db.commit()
+    await alert_manager.deliver(notifications)
+    metrics.agent_results.labels(agent.name).inc(accepted)
+    return {"accepted": accepted, "stale": stale, "rejected": rejected}
@@ -0,0 +1,21 @@
+"""Alert incidents raised by the rules engine."""
+
+from fastapi import APIRouter, Depends
+
+from app.services.alerting import alert_manager
+from app.tenancy import current_tenant
+
+router = APIRouter(prefix="/api/alerts", tags=["alerts"])
+
+
+@router.get("")
+async def list_incidents(tenant: str = Depends(current_tenant)):
+    return {
+        "open": [i.to_dict() for i in alert_manager.open_incidents.values() if i.tenant == tenant],
+        "recent": [i.to_dict() for i in alert_manager.recent_incidents if i.tenant == tenant],
+    }
+
+
+@router.get("/rules")
+async def list_rules():
+    return [dict(vars(rule)) for rule in alert_manager.rules]
@@ -0,0 +1,38 @@
+"""Streaming bulk import/export endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.services.bulk_io import ENTITIES, FORMATS, export_records, import_records
+from app.tenancy import current_tenant
+
+router = APIRouter(prefix="/api", tags=["bulk"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _validate(entity: str, fmt: str):
+    if entity not in ENTITIES:
+        raise HTTPException(status_code=404, detail=f"Unknown entity '{entity}'")
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(FORMATS)}")
+
+
+@router.post("/import/{entity}")
+async def import_endpoint(entity: str, request: Request, format: str | None = None,
+                          tenant: str = Depends(current_tenant)):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    _validate(entity, format)
+    return await import_records(entity, request.stream(), format, tenant)
+
+
+@router.get("/export/{entity}")
+async def export_endpoint(entity: str, format: str = "ndjson", tenant: str = Depends(current_tenant)):
+    _validate(entity, format)
+    return StreamingResponse(
+        export_records(entity, tenant, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{format}"'},
+    )
@@ -1,37 +1,77 @@
-"""Page routes serving Jinja2 templates."""
+"""Page routes serving pre-rendered Jinja2 templates."""
 
-from fastapi import APIRouter, Request
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.models.log_entry import LogEntry
+from app.models.service import MonitoredService
+from app.models.ticket import Ticket
+from app.routers import logs, services, tickets
+from app.templating import Snapshot, page_response, prerender
+from app.tenancy import current_tenant
 
 router = APIRouter(tags=["pages"])
-templates = Jinja2Templates(directory="app/templates")
+
+PAGES = {
+    "/": "dashboard.html",
+    "/services": "services.html",
+    "/tickets": "tickets.html",
+    "/network": "network.html",
+    "/knowledge": "knowledge.html",
+    "/logs": "logs.html",
+    None: "404.html",
+}
+
+# Everything dashboard.js requests on load, keyed by the exact URL it uses
+dashboard_snapshot = Snapshot(
+    tables=(MonitoredService.__tablename__, Ticket.__tablename__, LogEntry.__tablename__),
+    sources={
+        "/api/services/stats": lambda request, db, tenant: services.service_stats(request, tenant, db),
+        "/api/tickets/stats": lambda request, db, tenant: tickets.ticket_stats(request, tenant, db),
+        "/api/services": lambda request, db, tenant: services.list_services(
+            request, format="objects", tenant=tenant, db=db,
+        ),
+        "/api/logs?limit=20": lambda request, db, tenant: logs.list_logs(
+            request, limit=20, format="objects", tenant=tenant, db=db,
+        ),
+        "/api/tickets?sort_by=created_at&order=desc": lambda request, db, tenant: tickets.list_tickets(
+            request, sort_by="created_at", order="desc", format="objects", tenant=tenant, db=db,
+        ),
+    },
+)
+
+
+def prerender_pages():
+    prerender(PAGES)
 
 
 @router.get("/")
-async def dashboard_page(request: Request):
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+async def dashboard_page(request: Request, tenant: str = Depends(current_tenant),
+                         db: AsyncSession = Depends(get_read_db)):
+    return await page_response(request, "dashboard.html", "/", dashboard_snapshot, db, tenant)
 
 
 @router.get("/services")
 async def services_page(request: Request):
-    return templates.TemplateResponse("services.html", {"request": request})
+    return await page_response(request, "services.html", "/services")
 
 
 @router.get("/tickets")
 async def tickets_page(request: Request):
-    return templates.TemplateResponse("tickets.html", {"request": request})
+    return await page_response(request, "tickets.html", "/tickets")
 
 
 @router.get("/network")
 async def network_page(request: Request):
-    return templates.TemplateResponse("network.html", {"request": request})
+    return await page_response(request, "network.html", "/network")
 
 
 @router.get("/knowledge")
 async def knowledge_page(request: Request):
-    return templates.TemplateResponse("knowledge.html", {"request": request})
+    return await page_response(request, "knowledge.html", "/knowledge")
 
 
 @router.get("/logs")
 async def logs_page(request: Request):
-    return templates.TemplateResponse("logs.html", {"request": request})
+    return await page_response(request, "logs.html", "/logs")
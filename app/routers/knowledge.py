@@ -2,13 +2,16 @@
 
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel
 from sqlalchemy import select, or_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.knowledge import KnowledgeArticle
+from app.responses import list_etag, not_modified, row_format, rows_response
+from app.services.suggestions import suggester
+from app.tenancy import current_tenant
 
 router = APIRouter(prefix="/api/knowledge", tags=["knowledge"])
 
@@ -29,11 +32,18 @@ class ArticleUpdate(BaseModel):
 
 @router.get("")
 async def list_articles(
+    request: Request,
     search: str | None = None,
     category: str | None = None,
-    db: AsyncSession = Depends(get_db),
+    format: str = Depends(row_format),
+    tenant: str = Depends(current_tenant),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    query = select(KnowledgeArticle)
+    etag = await list_etag(request, db, tenant, KnowledgeArticle.__tablename__)
+    if cached := not_modified(request, etag):
+        return cached
+
+    query = select(*KnowledgeArticle.__table__.c).where(KnowledgeArticle.tenant == tenant)
 
     if category:
         query = query.where(KnowledgeArticle.category == category)
@@ -50,23 +60,25 @@ async def list_articles(
 
     query = query.order_by(desc(KnowledgeArticle.updated_at))
     result = await db.execute(query)
-    articles = result.scalars().all()
-    return [a.to_dict() for a in articles]
+    return rows_response(result, format, etag)
 
 
 @router.post("", status_code=201)
-async def create_article(data: ArticleCreate, db: AsyncSession = Depends(get_db)):
-    article = KnowledgeArticle(**data.model_dump())
+async def create_article(data: ArticleCreate, tenant: str = Depends(current_tenant),
+                         db: AsyncSession = Depends(get_db)):
+    article = KnowledgeArticle(**data.model_dump(), tenant=tenant)
     db.add(article)
     await db.commit()
     await db.refresh(article)
+    suggester.index_article(article)
     return article.to_dict()
 
 
 @router.get("/{article_id}")
-async def get_article(article_id: int, db: AsyncSession = Depends(get_db)):
+async def get_article(article_id: int, tenant: str = Depends(current_tenant),
+                      db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(
-        select(KnowledgeArticle).where(KnowledgeArticle.id == article_id)
+        select(KnowledgeArticle).where(KnowledgeArticle.id == article_id, KnowledgeArticle.tenant == tenant)
     )
     article = result.scalar_one_or_none()
     if not article:
@@ -75,9 +87,10 @@ async def get_article(article_id: int, db: AsyncSession = Depends(get_db)):
 
 
 @router.put("/{article_id}")
-async def update_article(article_id: int, data: ArticleUpdate, db: AsyncSession = Depends(get_db)):
+async def update_article(article_id: int, data: ArticleUpdate, tenant: str = Depends(current_tenant),
+                         db: AsyncSession = Depends(get_db)):
     result = await db.execute(
-        select(KnowledgeArticle).where(KnowledgeArticle.id == article_id)
+        select(KnowledgeArticle).where(KnowledgeArticle.id == article_id, KnowledgeArticle.tenant == tenant)
     )
     article = result.scalar_one_or_none()
     if not article:
@@ -90,13 +103,15 @@ async def update_article(article_id: int, data: ArticleUpdate, db: AsyncSession
     article.updated_at = datetime.utcnow()
     await db.commit()
     await db.refresh(article)
+    suggester.index_article(article)
     return article.to_dict()
 
 
 @router.delete("/{article_id}")
-async def delete_article(article_id: int, db: AsyncSession = Depends(get_db)):
+async def delete_article(article_id: int, tenant: str = Depends(current_tenant),
+                         db: AsyncSession = Depends(get_db)):
     result = await db.execute(
-        select(KnowledgeArticle).where(KnowledgeArticle.id == article_id)
+        select(KnowledgeArticle).where(KnowledgeArticle.id == article_id, KnowledgeArticle.tenant == tenant)
     )
     article = result.scalar_one_or_none()
     if not article:
@@ -104,4 +119,5 @@ async def delete_article(article_id: int, db: AsyncSession = Depends(get_db)):
 
     await db.delete(article)
     await db.commit()
+    suggester.forget_article(tenant, article_id)
     return {"message": "Article deleted"}
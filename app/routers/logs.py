@@ -1,23 +1,32 @@
 """Log viewer API endpoints."""
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_read_db
 from app.models.log_entry import LogEntry
+from app.responses import json_response, list_etag, not_modified, row_format, rows_response
+from app.tenancy import current_tenant
 
 router = APIRouter(prefix="/api/logs", tags=["logs"])
 
 
 @router.get("")
 async def list_logs(
+    request: Request,
     level: str | None = None,
     source: str | None = None,
     limit: int = 50,
-    db: AsyncSession = Depends(get_db),
+    format: str = Depends(row_format),
+    tenant: str = Depends(current_tenant),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    query = select(LogEntry)
+    etag = await list_etag(request, db, tenant, LogEntry.__tablename__)
+    if cached := not_modified(request, etag):
+        return cached
+
+    query = select(*LogEntry.__table__.c).where(LogEntry.tenant == tenant)
 
     if level:
         query = query.where(LogEntry.level == level)
@@ -26,12 +35,16 @@ async def list_logs(
 
     query = query.order_by(desc(LogEntry.timestamp)).limit(limit)
     result = await db.execute(query)
-    logs = result.scalars().all()
-    return [log.to_dict() for log in logs]
+    return rows_response(result, format, etag)
 
 
 @router.get("/sources")
-async def list_sources(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(LogEntry.source).distinct())
+async def list_sources(request: Request, tenant: str = Depends(current_tenant),
+                       db: AsyncSession = Depends(get_read_db)):
+    etag = await list_etag(request, db, tenant, LogEntry.__tablename__)
+    if cached := not_modified(request, etag):
+        return cached
+
+    result = await db.execute(select(LogEntry.source).where(LogEntry.tenant == tenant).distinct())
     sources = [row[0] for row in result.all()]
-    return sources
+    return json_response(sources, etag)
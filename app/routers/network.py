@@ -4,6 +4,7 @@ from fastapi import APIRouter
 from pydantic import BaseModel
 
 from app.services.network_tools import dns_lookup, geoip_lookup, port_scan, reverse_dns_lookup
+from app.services.rate_limit import rate_limited
 
 router = APIRouter(prefix="/api/network", tags=["network"])
 
@@ -31,12 +32,12 @@ async def dns_lookup_endpoint(data: DnsRequest):
     return await dns_lookup(data.domain, data.record_type)
 
 
-@router.post("/geoip")
+@router.post("/geoip", dependencies=[rate_limited("geoip")])
 async def geoip_endpoint(data: GeoIpRequest):
     return await geoip_lookup(data.ip)
 
 
-@router.post("/portscan")
+@router.post("/portscan", dependencies=[rate_limited("portscan")])
 async def portscan_endpoint(data: PortScanRequest):
     return await port_scan(data.host, data.ports)
 
@@ -0,0 +1,28 @@
+"""Vantage probe endpoint: lets another instance confirm a failure from this network."""
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+
+from app.models.service import MonitoredService
+from app.security import require_probe_token
+from app.services.health_checker import check_service
+
+router = APIRouter(prefix="/api/probe", tags=["probe"], dependencies=[Depends(require_probe_token)])
+
+
+class ProbeRequest(BaseModel):
+    url: str
+    check_type: str = "http"
+    expected_status: int = 200
+    http_method: str = "GET"
+    http_headers: dict[str, str] | None = None
+    degraded_after_ms: float | None = None
+    body_contains: str | None = None
+    body_regex: str | None = None
+    max_body_bytes: int | None = None
+
+
+@router.post("")
+async def probe(data: ProbeRequest):
+    # Transient instance, never added to a session
+    return await check_service(MonitoredService(**data.model_dump()))
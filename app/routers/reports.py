@@ -0,0 +1,91 @@
+"""SLA reports: uptime, MTBF and MTTR per service and per group."""
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.service import MonitoredService
+from app.responses import json_response
+from app.services import sla, topology
+from app.tenancy import current_tenant
+
+router = APIRouter(prefix="/api/reports", tags=["reports"])
+
+
+def _group_key(group_by: str, service, graph: topology.ServiceGraph, names: dict[int, str]) -> str:
+    if group_by == "check_type":
+        return service.check_type or "http"
+    if group_by == "group":
+        return service.group_name or ""
+    # "dependency": the root of the service's dependency chain
+    chain = graph.ancestors(service.id)
+    return names.get(chain[-1] if chain else service.id, "")
+
+
+@router.get("/sla")
+async def sla_report(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    month: str | None = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    service_id: int | None = None,
+    group_by: str | None = Query(None, pattern="^(check_type|dependency|group)$"),
+    tenant: str = Depends(current_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """Defaults to the current month so far; `month=YYYY-MM` selects a calendar month."""
+    now = datetime.utcnow()
+    if month:
+        start = datetime.strptime(month, "%Y-%m")
+        end = sla.next_month(start)
+    start = (start or sla.month_start(now)).replace(tzinfo=None)
+    end = (end or now).replace(tzinfo=None)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+
+    query = (
+        select(MonitoredService.id, MonitoredService.name, MonitoredService.check_type, MonitoredService.group_name)
+        .where(MonitoredService.tenant == tenant)
+        .order_by(MonitoredService.name)
+    )
+    if service_id is not None:
+        query = query.where(MonitoredService.id == service_id)
+    services = (await db.execute(query)).all()
+    if service_id is not None and not services:
+        raise HTTPException(status_code=404, detail="Service not found")
+
+    totals = await sla.compute(start, end, service_id)
+    overall = sla.Totals()
+    rows = []
+    for service in services:
+        t = totals.get(service.id, sla.Totals())
+        overall.add(t)
+        rows.append({"id": service.id, "name": service.name, **t.to_dict()})
+
+    groups = None
+    if group_by:
+        graph = await topology.load_graph(db)
+        names = {service.id: service.name for service in services}
+        if group_by == "dependency" and service_id is not None:
+            names = dict((await db.execute(
+                select(MonitoredService.id, MonitoredService.name).where(MonitoredService.tenant == tenant)
+            )).all())
+        grouped: dict[str, list] = {}
+        for service in services:
+            group = grouped.setdefault(_group_key(group_by, service, graph, names), [sla.Totals(), 0])
+            group[0].add(totals.get(service.id, sla.Totals()))
+            group[1] += 1
+        groups = [
+            {"group": key, "services": count, **t.to_dict()}
+            for key, (t, count) in sorted(grouped.items())
+        ]
+
+    return json_response({
+        "start": start.isoformat(),
+        "end": min(end, now).isoformat(),
+        "overall": overall.to_dict(),
+        "services": rows,
+        "groups": groups,
+    })
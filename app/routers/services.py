@@ -1,25 +1,76 @@
 """Service monitoring CRUD and health check endpoints."""
 
-from datetime import datetime
+import re
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from sqlalchemy import select, func
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import and_, delete, insert, literal, select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.config import settings
+from app.database import async_session, get_db, get_read_db
+from app.models.agent import ProbeAgent
 from app.models.service import MonitoredService
-from app.services.health_checker import check_service
+from app.responses import json_response, list_etag, not_modified, row_format, rows_response
+from app.security import require_admin
+from app.services import anomaly, sla, topology
+from app.services.alerting import alert_manager
+from app.services.check_policy import breaker
+from app.services.health_checker import apply_result, check_each, check_service, last_cycle, store_result
+from app.services.rate_limit import Slot, rate_limited
+from app.tenancy import current_tenant
 
 router = APIRouter(prefix="/api/services", tags=["services"])
 
 
+HTTP_METHODS = "^(GET|HEAD|POST|PUT|PATCH|DELETE|OPTIONS)$"
+TAG_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_.:/-]{0,49}$")
+
+
+def _valid_regex(value: str | None) -> str | None:
+    if value is not None:
+        try:
+            re.compile(value)
+        except re.error as e:
+            raise ValueError(f"invalid regular expression: {e}")
+    return value
+
+
+def _normalize_tags(value: str | None) -> str | None:
+    """Lowercase, trim and de-duplicate comma-separated tags."""
+    if value is None:
+        return None
+    tags = []
+    for tag in value.split(","):
+        tag = tag.strip().lower()
+        if not tag or tag in tags:
+            continue
+        if not TAG_PATTERN.match(tag):
+            raise ValueError(f"invalid tag '{tag}'")
+        tags.append(tag)
+    return ",".join(tags) or None
+
+
 class ServiceCreate(BaseModel):
     name: str
     url: str
     check_type: str = "http"
     expected_status: int = 200
     is_active: bool = True
+    http_method: str = Field("GET", pattern=HTTP_METHODS)
+    http_headers: dict[str, str] | None = None
+    degraded_after_ms: float | None = Field(None, gt=0)
+    body_contains: str | None = Field(None, max_length=500)
+    body_regex: str | None = Field(None, max_length=500)
+    max_body_bytes: int | None = Field(None, gt=0, le=10 * 1024 * 1024)
+    parent_id: int | None = None
+    agent_id: int | None = None
+    group_name: str | None = Field(None, max_length=100)
+    tags: str | None = Field(None, max_length=500)
+
+    _check_regex = field_validator("body_regex")(_valid_regex)
+    _check_tags = field_validator("tags")(_normalize_tags)
 
 
 class ServiceUpdate(BaseModel):
@@ -28,18 +79,141 @@ class ServiceUpdate(BaseModel):
     check_type: str | None = None
     expected_status: int | None = None
     is_active: bool | None = None
+    http_method: str | None = Field(None, pattern=HTTP_METHODS)
+    http_headers: dict[str, str] | None = None
+    degraded_after_ms: float | None = Field(None, gt=0)
+    body_contains: str | None = Field(None, max_length=500)
+    body_regex: str | None = Field(None, max_length=500)
+    max_body_bytes: int | None = Field(None, gt=0, le=10 * 1024 * 1024)
+    parent_id: int | None = None
+    agent_id: int | None = None
+    group_name: str | None = Field(None, max_length=100)
+    tags: str | None = Field(None, max_length=500)
+
+    _check_regex = field_validator("body_regex")(_valid_regex)
+    _check_tags = field_validator("tags")(_normalize_tags)
+
+
+class ServiceSelection(BaseModel):
+    """Services matching every given criterion."""
+
+    ids: list[int] | None = Field(None, min_length=1)
+    group_name: str | None = None
+    tag: str | None = None
+
+
+class BulkCreate(BaseModel):
+    services: list[ServiceCreate] = Field(..., min_length=1, max_length=settings.SERVICE_BULK_LIMIT)
+
+
+class BulkUpdate(ServiceSelection):
+    changes: ServiceUpdate = Field(default_factory=ServiceUpdate)
+    add_tags: str | None = None
+    remove_tags: str | None = None
+
+    _check_tags = field_validator("add_tags", "remove_tags")(_normalize_tags)
+
+
+def _has_tag(tag: str):
+    pattern = "%," + tag.strip().lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + ",%"
+    return (literal(",") + MonitoredService.tags + literal(",")).like(pattern, escape="\\")
+
+
+def _selection(selection: ServiceSelection, tenant: str):
+    if not (selection.ids or selection.group_name or selection.tag):
+        raise HTTPException(status_code=400, detail="Select services by ids, group_name or tag")
+    clauses = [MonitoredService.tenant == tenant]
+    if selection.ids:
+        clauses.append(MonitoredService.id.in_(selection.ids))
+    if selection.group_name:
+        clauses.append(MonitoredService.group_name == selection.group_name)
+    if selection.tag:
+        clauses.append(_has_tag(selection.tag))
+    return and_(*clauses)
+
+
+async def _selected_ids(db: AsyncSession, selection: ServiceSelection, tenant: str) -> list[int]:
+    result = await db.execute(
+        select(MonitoredService.id).where(_selection(selection, tenant)).order_by(MonitoredService.id)
+    )
+    return list(result.scalars())
+
+
+async def _missing_parents(db: AsyncSession, tenant: str, parent_ids: set[int]) -> list[int]:
+    """Parents that don't exist in the tenant; services only depend on their own tenant's services."""
+    result = await db.execute(
+        select(MonitoredService.id).where(MonitoredService.id.in_(parent_ids), MonitoredService.tenant == tenant)
+    )
+    return sorted(parent_ids - set(result.scalars()))
+
+
+async def _check_parent(db: AsyncSession, tenant: str, parent_id: int | None, service_ids: list[int] = ()):
+    """Reject a parent that doesn't exist or would close a dependency cycle."""
+    if parent_id is None:
+        return
+    if await _missing_parents(db, tenant, {parent_id}):
+        raise HTTPException(status_code=400, detail="Parent service not found")
+    if service_ids:
+        graph = await topology.load_graph(db)
+        if any(graph.would_cycle(sid, parent_id) for sid in service_ids):
+            raise HTTPException(status_code=400, detail="Parent would create a dependency cycle")
+
+
+async def _check_quota(db: AsyncSession, tenant: str, adding: int):
+    if not settings.TENANT_MAX_SERVICES:
+        return
+    count = (await db.execute(
+        select(func.count()).select_from(MonitoredService).where(MonitoredService.tenant == tenant)
+    )).scalar_one()
+    if count + adding > settings.TENANT_MAX_SERVICES:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Service quota exceeded: tenant may monitor {settings.TENANT_MAX_SERVICES} services",
+        )
+
+
+async def _check_agents(db: AsyncSession, agent_ids: set[int | None]):
+    agent_ids = agent_ids - {None}
+    if agent_ids:
+        result = await db.execute(select(ProbeAgent.id).where(ProbeAgent.id.in_(agent_ids)))
+        missing = sorted(agent_ids - set(result.scalars()))
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Probe agent not found: {missing}")
 
 
 @router.get("")
-async def list_services(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(MonitoredService).order_by(MonitoredService.name))
-    services = result.scalars().all()
-    return [s.to_dict() for s in services]
+async def list_services(
+    request: Request,
+    format: str = Depends(row_format),
+    group_name: str | None = None,
+    tag: str | None = None,
+    tenant: str = Depends(current_tenant),
+    db: AsyncSession = Depends(get_read_db),
+):
+    etag = await list_etag(request, db, tenant, MonitoredService.__tablename__)
+    if cached := not_modified(request, etag):
+        return cached
+
+    query = (
+        select(*MonitoredService.__table__.c)
+        .where(MonitoredService.tenant == tenant)
+        .order_by(MonitoredService.name)
+    )
+    if group_name:
+        query = query.where(MonitoredService.group_name == group_name)
+    if tag:
+        query = query.where(_has_tag(tag))
+    result = await db.execute(query)
+    return rows_response(result, format, etag)
 
 
 @router.post("", status_code=201)
-async def create_service(data: ServiceCreate, db: AsyncSession = Depends(get_db)):
-    service = MonitoredService(**data.model_dump())
+async def create_service(data: ServiceCreate, tenant: str = Depends(current_tenant),
+                         db: AsyncSession = Depends(get_db)):
+    await _check_quota(db, tenant, 1)
+    await _check_parent(db, tenant, data.parent_id)
+    await _check_agents(db, {data.agent_id})
+    service = MonitoredService(**data.model_dump(), tenant=tenant)
     db.add(service)
     await db.commit()
     await db.refresh(service)
@@ -47,31 +221,222 @@ async def create_service(data: ServiceCreate, db: AsyncSession = Depends(get_db)
 
 
 @router.get("/stats")
-async def service_stats(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(MonitoredService))
+async def service_stats(request: Request, tenant: str = Depends(current_tenant),
+                        db: AsyncSession = Depends(get_read_db)):
+    etag = await list_etag(request, db, tenant, MonitoredService.__tablename__)
+    if cached := not_modified(request, etag):
+        return cached
+
+    result = await db.execute(select(MonitoredService).where(MonitoredService.tenant == tenant))
     services = result.scalars().all()
 
     total = len(services)
     online = sum(1 for s in services if s.status == "online")
     offline = sum(1 for s in services if s.status == "offline")
     degraded = sum(1 for s in services if s.status == "degraded")
+    unreachable = sum(1 for s in services if s.status == "unreachable")
     response_times = [s.response_time_ms for s in services if s.response_time_ms is not None]
     avg_response = round(sum(response_times) / len(response_times), 2) if response_times else 0
 
-    return {
+    return json_response({
         "total": total,
         "online": online,
         "offline": offline,
         "degraded": degraded,
-        "unknown": total - online - offline - degraded,
+        "unreachable": unreachable,
+        "unknown": total - online - offline - degraded - unreachable,
         "avg_response_time_ms": avg_response,
         "online_percentage": round((online / total) * 100, 1) if total > 0 else 0,
-    }
+    }, etag)
+
+
+@router.get("/certificates")
+async def certificate_expiry(request: Request, tenant: str = Depends(current_tenant),
+                             db: AsyncSession = Depends(get_read_db)):
+    """HTTPS services ordered by TLS certificate expiry, soonest first."""
+    etag = await list_etag(request, db, tenant, MonitoredService.__tablename__)
+    if cached := not_modified(request, etag):
+        return cached
+
+    result = await db.execute(
+        select(MonitoredService.id, MonitoredService.name, MonitoredService.url, MonitoredService.tls_expires_at)
+        .where(MonitoredService.tenant == tenant, MonitoredService.tls_expires_at.is_not(None))
+        .order_by(MonitoredService.tls_expires_at)
+    )
+    return rows_response(result, etag=etag)
+
+
+@router.get("/check-cycle", dependencies=[Depends(require_admin)])
+async def check_cycle():
+    """Probe counts and budget use of the last health-check cycle, plus open circuit breakers.
+
+    The cycle covers every tenant's services, so this is an operator endpoint.
+    """
+    return {"last_cycle": last_cycle, "open_circuits": breaker.open_circuits()}
+
+
+@router.get("/anomalies")
+async def latency_anomalies(all: bool = False, tenant: str = Depends(current_tenant),
+                            db: AsyncSession = Depends(get_read_db)):
+    """Services whose response time is anomalous against their baseline; `all=true` lists every baseline."""
+    baselines = anomaly.detector.snapshot() if all else anomaly.detector.active()
+    names = dict((await db.execute(
+        select(MonitoredService.id, MonitoredService.name)
+        .where(MonitoredService.tenant == tenant, MonitoredService.id.in_(list(baselines)))
+    )).all()) if baselines else {}
+    return [
+        {"id": sid, "name": names[sid], **b.to_dict()}
+        for sid, b in sorted(baselines.items()) if sid in names
+    ]
+
+
+@router.get("/groups")
+async def service_groups(tenant: str = Depends(current_tenant), db: AsyncSession = Depends(get_read_db)):
+    """Service counts per group, broken down by status; ungrouped services are under null."""
+    result = await db.execute(
+        select(MonitoredService.group_name, MonitoredService.status, func.count())
+        .where(MonitoredService.tenant == tenant)
+        .group_by(MonitoredService.group_name, MonitoredService.status)
+    )
+    groups: dict = {}
+    for group_name, status, count in result:
+        group = groups.setdefault(group_name, {"group_name": group_name, "services": 0, "statuses": {}})
+        group["services"] += count
+        group["statuses"][status] = count
+    return sorted(groups.values(), key=lambda g: (g["group_name"] is None, g["group_name"] or ""))
+
+
+@router.post("/bulk", status_code=201)
+async def bulk_create(data: BulkCreate, tenant: str = Depends(current_tenant), db: AsyncSession = Depends(get_db)):
+    """Create services in one transaction; one invalid service rejects the whole batch."""
+    await _check_quota(db, tenant, len(data.services))
+    parents = {s.parent_id for s in data.services if s.parent_id is not None}
+    if parents:
+        missing = await _missing_parents(db, tenant, parents)
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Parent service not found: {missing[:10]}")
+    await _check_agents(db, {s.agent_id for s in data.services})
+    result = await db.execute(
+        insert(MonitoredService).returning(MonitoredService.id),
+        [{**service.model_dump(), "tenant": tenant} for service in data.services],
+    )
+    ids = list(result.scalars())
+    await db.commit()
+    return {"created": len(ids), "ids": ids}
+
+
+@router.patch("/bulk")
+async def bulk_update(data: BulkUpdate, tenant: str = Depends(current_tenant), db: AsyncSession = Depends(get_db)):
+    """Apply the same changes to every selected service in one transaction.
+
+    `add_tags` and `remove_tags` edit each service's tags instead of replacing them.
+    """
+    changes = data.changes.model_dump(exclude_unset=True)
+    if not changes and not data.add_tags and not data.remove_tags:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    ids = await _selected_ids(db, data, tenant)
+    if not ids:
+        return {"updated": 0}
+    await _check_agents(db, {changes.get("agent_id")})
+    await _check_parent(db, tenant, changes.get("parent_id"), ids)
+
+    if changes:
+        await db.execute(
+            update(MonitoredService).where(_selection(data, tenant)).values(**changes)
+            .execution_options(synchronize_session=False)
+        )
+    if data.add_tags or data.remove_tags:
+        add = data.add_tags.split(",") if data.add_tags else []
+        remove = set(data.remove_tags.split(",")) if data.remove_tags else set()
+        result = await db.execute(select(MonitoredService.id, MonitoredService.tags).where(_selection(data, tenant)))
+        rows = []
+        for sid, tags in result:
+            current = tags.split(",") if tags else []
+            merged = [t for t in dict.fromkeys(current + add) if t not in remove]
+            if merged != current:
+                rows.append({"id": sid, "tags": ",".join(merged) or None})
+        if rows:
+            await db.execute(update(MonitoredService), rows)
+    await db.commit()
+    return {"updated": len(ids)}
+
+
+@router.post("/bulk/delete")
+async def bulk_delete(selection: ServiceSelection, tenant: str = Depends(current_tenant),
+                      db: AsyncSession = Depends(get_db)):
+    """Delete every selected service in one transaction."""
+    ids = await _selected_ids(db, selection, tenant)
+    if not ids:
+        return {"deleted": 0}
+    selected = select(MonitoredService.id).where(_selection(selection, tenant))
+    # Dependents become roots; not every backend enforces ON DELETE SET NULL
+    await db.execute(
+        update(MonitoredService).where(MonitoredService.parent_id.in_(selected)).values(parent_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    await sla.forget_services(db, ids)
+    await db.execute(
+        delete(MonitoredService).where(_selection(selection, tenant)).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    for service_id in ids:
+        alert_manager.forget(service_id)
+        breaker.forget(service_id)
+        anomaly.detector.forget(service_id)
+    return {"deleted": len(ids)}
+
+
+async def _stream_checks(selection: ServiceSelection, tenant: str):
+    async with async_session() as session:
+        result = await session.execute(select(MonitoredService).where(_selection(selection, tenant)))
+        services = result.scalars().all()
+        previous = {service.id: service.status for service in services}
+        # Agent-assigned services are checked by their agent; open circuits wait for their trial probe
+        remote = [s for s in services if s.agent_id is not None]
+        skipped = [s for s in services if s.agent_id is None and not breaker.allow(s.id)]
+        due = [s for s in services if s.agent_id is None and breaker.allow(s.id)]
+        statuses: dict[str, int] = {}
+        notifications = []
+        async for service, check_result in check_each(due):
+            breaker.record(service.id, check_result["status"] != "offline")
+            notifications += await apply_result(session, service, check_result)
+            statuses[service.status] = statuses.get(service.status, 0) + 1
+            yield orjson.dumps({
+                "id": service.id,
+                "name": service.name,
+                "status": service.status,
+                "response_time_ms": service.response_time_ms,
+                "check_detail": service.check_detail,
+            }) + b"\n"
+        await sla.record_statuses(session, {s.id: s.status for s in due}, previous)
+        await session.commit()
+    await alert_manager.deliver(notifications)
+    yield orjson.dumps({
+        "done": True, "checked": len(due), "statuses": statuses,
+        "remote": len(remote), "skipped_by_breaker": len(skipped),
+    }) + b"\n"
+
+
+@router.post("/bulk/check")
+async def bulk_check(selection: ServiceSelection, tenant: str = Depends(current_tenant),
+                     slot: Slot = rate_limited("bulk-check")):
+    """Check the selected services concurrently, streaming NDJSON results as each finishes.
+
+    Results go through the same confirmation, circuit breaker, alerting and
+    logging as the background cycle. Services assigned to a probe agent and
+    services with an open circuit are not probed. Results are saved when the
+    last check completes; a final line summarises the run.
+    """
+    _selection(selection, tenant)
+    return slot.response(_stream_checks(selection, tenant), media_type="application/x-ndjson")
 
 
 @router.get("/{service_id}")
-async def get_service(service_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(MonitoredService).where(MonitoredService.id == service_id))
+async def get_service(service_id: int, tenant: str = Depends(current_tenant),
+                      db: AsyncSession = Depends(get_read_db)):
+    result = await db.execute(
+        select(MonitoredService).where(MonitoredService.id == service_id, MonitoredService.tenant == tenant)
+    )
     service = result.scalar_one_or_none()
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
@@ -79,13 +444,19 @@ async def get_service(service_id: int, db: AsyncSession = Depends(get_db)):
 
 
 @router.put("/{service_id}")
-async def update_service(service_id: int, data: ServiceUpdate, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(MonitoredService).where(MonitoredService.id == service_id))
+async def update_service(service_id: int, data: ServiceUpdate, tenant: str = Depends(current_tenant),
+                         db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(MonitoredService).where(MonitoredService.id == service_id, MonitoredService.tenant == tenant)
+    )
     service = result.scalar_one_or_none()
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
 
     update_data = data.model_dump(exclude_unset=True)
+    if "parent_id" in update_data:
+        await _check_parent(db, tenant, update_data["parent_id"], [service_id])
+    await _check_agents(db, {update_data.get("agent_id")})
     for key, value in update_data.items():
         setattr(service, key, value)
 
@@ -95,28 +466,67 @@ async def update_service(service_id: int, data: ServiceUpdate, db: AsyncSession
 
 
 @router.delete("/{service_id}")
-async def delete_service(service_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(MonitoredService).where(MonitoredService.id == service_id))
+async def delete_service(service_id: int, tenant: str = Depends(current_tenant),
+                         db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(MonitoredService).where(MonitoredService.id == service_id, MonitoredService.tenant == tenant)
+    )
     service = result.scalar_one_or_none()
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
 
+    # Dependents become roots; not every backend enforces ON DELETE SET NULL
+    await db.execute(
+        update(MonitoredService).where(MonitoredService.parent_id == service_id).values(parent_id=None)
+    )
+    await sla.forget_service(db, service_id)
     await db.delete(service)
     await db.commit()
+    alert_manager.forget(service_id)
+    breaker.forget(service_id)
+    anomaly.detector.forget(service_id)
     return {"message": "Service deleted"}
 
 
-@router.post("/{service_id}/check")
-async def manual_check(service_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(MonitoredService).where(MonitoredService.id == service_id))
+@router.get("/{service_id}/impact")
+async def service_impact(service_id: int, tenant: str = Depends(current_tenant),
+                         db: AsyncSession = Depends(get_read_db)):
+    """What this service depends on, and everything that goes unreachable if it fails."""
+    graph = await topology.load_graph(db)
+    if service_id not in graph.parents or await _missing_parents(db, tenant, {service_id}):
+        raise HTTPException(status_code=404, detail="Service not found")
+
+    upstream = graph.ancestors(service_id)
+    dependents = graph.descendants(service_id)
+    ids = {service_id, *upstream, *(sid for sid, _ in dependents)}
+    result = await db.execute(
+        select(MonitoredService.id, MonitoredService.name, MonitoredService.status)
+        .where(MonitoredService.tenant == tenant, MonitoredService.id.in_(ids))
+    )
+    info = {row.id: {"id": row.id, "name": row.name, "status": row.status} for row in result}
+    return {
+        "service": info.get(service_id),
+        "upstream": [info[sid] for sid in upstream if sid in info],
+        "dependents": [{**info[sid], "depth": depth} for sid, depth in dependents if sid in info],
+        "impact_count": len(dependents),
+        "max_depth": max((depth for _, depth in dependents), default=0),
+        "in_cycle": service_id in graph.cyclic,
+    }
+
+
+@router.post("/{service_id}/check", dependencies=[rate_limited("service-check")])
+async def manual_check(service_id: int, tenant: str = Depends(current_tenant),
+                       db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(MonitoredService).where(MonitoredService.id == service_id, MonitoredService.tenant == tenant)
+    )
     service = result.scalar_one_or_none()
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
 
-    check_result = await check_service(service)
-    service.status = check_result["status"]
-    service.response_time_ms = check_result["response_time_ms"]
-    service.last_checked = datetime.utcnow()
+    previous = service.status
+    store_result(service, await check_service(service))
+    await sla.record_statuses(db, {service.id: service.status}, {service.id: previous})
 
     await db.commit()
     await db.refresh(service)
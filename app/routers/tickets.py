@@ -1,16 +1,20 @@
 """Ticket management system CRUD endpoints."""
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from pydantic import BaseModel
 from sqlalchemy import select, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.ticket import Ticket
+from app.responses import json_response, list_etag, not_modified, row_format, rows_response
+from app.services import ticket_history, ticket_search, ticket_sla
+from app.services.suggestions import suggester
 from app.services.log_collector import create_log
 from app.routers.websocket import broadcast_event
+from app.tenancy import current_tenant
 
 router = APIRouter(prefix="/api/tickets", tags=["tickets"])
 
@@ -32,16 +36,29 @@ class TicketUpdate(BaseModel):
     assigned_to: str | None = None
 
 
+def current_actor(x_actor: str | None = Header(default=None, max_length=100)) -> str | None:
+    """Who is making the change, as recorded in the ticket history."""
+    return x_actor
+
+
 @router.get("")
 async def list_tickets(
+    request: Request,
     status: str | None = None,
     priority: str | None = None,
     category: str | None = None,
+    assigned_to: str | None = None,
     sort_by: str = "created_at",
     order: str = "desc",
-    db: AsyncSession = Depends(get_db),
+    format: str = Depends(row_format),
+    tenant: str = Depends(current_tenant),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    query = select(Ticket)
+    etag = await list_etag(request, db, tenant, Ticket.__tablename__)
+    if cached := not_modified(request, etag):
+        return cached
+
+    query = select(*Ticket.__table__.c).where(Ticket.tenant == tenant)
 
     if status:
         query = query.where(Ticket.status == status)
@@ -49,6 +66,8 @@ async def list_tickets(
         query = query.where(Ticket.priority == priority)
     if category:
         query = query.where(Ticket.category == category)
+    if assigned_to:
+        query = query.where(Ticket.assigned_to == assigned_to)
 
     if sort_by == "priority":
         col = Ticket.priority
@@ -60,32 +79,44 @@ async def list_tickets(
     query = query.order_by(desc(col) if order == "desc" else col)
 
     result = await db.execute(query)
-    tickets = result.scalars().all()
-    return [t.to_dict() for t in tickets]
+    return rows_response(result, format, etag)
 
 
 @router.post("", status_code=201)
-async def create_ticket(data: TicketCreate, db: AsyncSession = Depends(get_db)):
-    ticket = Ticket(**data.model_dump())
+async def create_ticket(data: TicketCreate, db: AsyncSession = Depends(get_db),
+                        actor: str | None = Depends(current_actor), tenant: str = Depends(current_tenant)):
+    ticket = Ticket(**data.model_dump(), tenant=tenant)
+    ticket_sla.apply_timers(ticket)
     db.add(ticket)
     await db.flush()
+    ticket_history.record_created(db, ticket, actor)
 
-    await create_log(db, "INFO", "ticket-system", f"New ticket created: {ticket.title} (#{ticket.id}).")
+    await create_log(db, "INFO", "ticket-system", f"New ticket created: {ticket.title} (#{ticket.id}).", tenant=tenant)
     await db.commit()
     await db.refresh(ticket)
+    ticket_sla.scheduler.schedule(ticket.id, ticket.next_due_at)
+    suggestions = await suggester.suggest(
+        tenant, f"{ticket.title} {ticket.description or ''}", exclude_ticket=ticket.id,
+    )
+    suggester.index_ticket(ticket)
 
     await broadcast_event({
         "type": "ticket_created",
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "data": {"id": ticket.id, "title": ticket.title, "priority": ticket.priority},
-    })
+    }, tenant)
 
-    return ticket.to_dict()
+    return {**ticket.to_dict(), "suggestions": suggestions}
 
 
 @router.get("/stats")
-async def ticket_stats(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Ticket))
+async def ticket_stats(request: Request, tenant: str = Depends(current_tenant),
+                       db: AsyncSession = Depends(get_read_db)):
+    etag = await list_etag(request, db, tenant, Ticket.__tablename__)
+    if cached := not_modified(request, etag):
+        return cached
+
+    result = await db.execute(select(Ticket).where(Ticket.tenant == tenant))
     tickets = result.scalars().all()
 
     open_count = sum(1 for t in tickets if t.status == "open")
@@ -102,7 +133,7 @@ async def ticket_stats(db: AsyncSession = Depends(get_db)):
         cat = t.category or "uncategorized"
         by_category[cat] = by_category.get(cat, 0) + 1
 
-    return {
+    return json_response({
         "total": len(tickets),
         "open": open_count,
         "in_progress": in_progress,
@@ -110,12 +141,133 @@ async def ticket_stats(db: AsyncSession = Depends(get_db)):
         "closed": closed,
         "by_priority": by_priority,
         "by_category": by_category,
-    }
+    }, etag)
+
+
+@router.get("/search")
+async def search_tickets(
+    request: Request,
+    q: str | None = Query(None, max_length=500),
+    status: str | None = None,
+    priority: str | None = None,
+    category: str | None = None,
+    assigned_to: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    interval: str = Query("day", pattern="^(day|week|month)$"),
+    limit: int = Query(50, ge=0, le=500),
+    offset: int = Query(0, ge=0),
+    tenant: str = Depends(current_tenant),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Full-text search over title and description, with facet counts and a creation-date histogram."""
+    etag = await list_etag(request, db, tenant, Ticket.__tablename__)
+    if cached := not_modified(request, etag):
+        return cached
+    filters = {"tenant": tenant, "status": status, "priority": priority, "category": category,
+               "assigned_to": assigned_to}
+    return json_response(await ticket_search.search(
+        db, q, filters, created_from, created_to, interval, limit, offset,
+    ), etag)
+
+
+@router.get("/due-soon")
+async def tickets_due_soon(
+    within: int = Query(60, ge=0, le=7 * 24 * 60),
+    limit: int = Query(100, ge=1, le=1000),
+    tenant: str = Depends(current_tenant),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Tickets whose next SLA deadline is within `within` minutes, overdue first."""
+    now = datetime.utcnow()
+    result = await db.execute(
+        select(
+            Ticket.id, Ticket.title, Ticket.priority, Ticket.status, Ticket.assigned_to,
+            Ticket.next_due_at, Ticket.responded_at, Ticket.response_due_at, Ticket.resolution_due_at,
+            Ticket.response_breached, Ticket.resolution_breached, Ticket.escalation_level,
+        )
+        .where(Ticket.tenant == tenant)
+        .where(Ticket.next_due_at <= now + timedelta(minutes=within))
+        .order_by(Ticket.next_due_at)
+        .limit(limit)
+    )
+    return json_response([
+        {
+            "id": row.id,
+            "title": row.title,
+            "priority": row.priority,
+            "status": row.status,
+            "assigned_to": row.assigned_to,
+            "timer": ticket_sla.pending_timer(row),
+            "due_at": row.next_due_at,
+            "overdue": row.next_due_at <= now,
+            "escalation_level": row.escalation_level,
+        }
+        for row in result
+    ])
+
+
+@router.get("/suggestions")
+async def suggest_for_text(
+    q: str = Query(..., min_length=1, max_length=5000),
+    k: int | None = Query(None, ge=1, le=50),
+    tenant: str = Depends(current_tenant),
+):
+    """Tickets and knowledge articles similar to free text, e.g. a ticket being drafted."""
+    return json_response(await suggester.suggest(tenant, q, k))
+
+
+@router.get("/activity")
+async def ticket_activity(
+    before: int | None = Query(None, description="Cursor: `next_before` from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    actor: str | None = None,
+    kind: str | None = Query(None, pattern="^(created|updated|escalated|deleted)$"),
+    tenant: str = Depends(current_tenant),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Changes across all tickets, newest first."""
+    return json_response(await ticket_history.page(db, tenant, actor=actor, kind=kind, before=before, limit=limit))
+
+
+@router.get("/{ticket_id}/history")
+async def ticket_timeline(
+    ticket_id: int,
+    before: int | None = Query(None, description="Cursor: `next_before` from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    tenant: str = Depends(current_tenant),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """One ticket's changes, newest first. Still available after the ticket is deleted."""
+    page = await ticket_history.page(db, tenant, ticket_id=ticket_id, before=before, limit=limit)
+    if not page["events"] and before is None:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return json_response(page)
+
+
+@router.get("/{ticket_id}/suggestions")
+async def suggest_for_ticket(
+    ticket_id: int,
+    k: int | None = Query(None, ge=1, le=50),
+    tenant: str = Depends(current_tenant),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Earlier tickets and knowledge articles that look like this ticket's problem."""
+    result = await db.execute(
+        select(Ticket.title, Ticket.description).where(Ticket.id == ticket_id, Ticket.tenant == tenant)
+    )
+    row = result.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return json_response(await suggester.suggest(
+        tenant, f"{row.title} {row.description or ''}", k, exclude_ticket=ticket_id,
+    ))
 
 
 @router.get("/{ticket_id}")
-async def get_ticket(ticket_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
+async def get_ticket(ticket_id: int, tenant: str = Depends(current_tenant),
+                     db: AsyncSession = Depends(get_read_db)):
+    result = await db.execute(select(Ticket).where(Ticket.id == ticket_id, Ticket.tenant == tenant))
     ticket = result.scalar_one_or_none()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
@@ -123,13 +275,16 @@ async def get_ticket(ticket_id: int, db: AsyncSession = Depends(get_db)):
 
 
 @router.put("/{ticket_id}")
-async def update_ticket(ticket_id: int, data: TicketUpdate, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
+async def update_ticket(ticket_id: int, data: TicketUpdate, db: AsyncSession = Depends(get_db),
+                        actor: str | None = Depends(current_actor), tenant: str = Depends(current_tenant)):
+    result = await db.execute(select(Ticket).where(Ticket.id == ticket_id, Ticket.tenant == tenant))
     ticket = result.scalar_one_or_none()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
     old_status = ticket.status
+    old_priority = ticket.priority
+    before = ticket_history.snapshot(ticket)
     update_data = data.model_dump(exclude_unset=True)
 
     for key, value in update_data.items():
@@ -143,25 +298,33 @@ async def update_ticket(ticket_id: int, data: TicketUpdate, db: AsyncSession = D
         ticket.resolved_at = None
 
     ticket.updated_at = datetime.utcnow()
+    ticket_sla.apply_timers(ticket, ticket.updated_at, priority_changed=ticket.priority != old_priority)
+    ticket_history.record(db, ticket, "updated", ticket_history.diff(before, ticket), actor, ticket.updated_at)
 
     if new_status and new_status != old_status:
         await create_log(
             db, "INFO", "ticket-system",
-            f"Ticket #{ticket.id} status changed: {old_status} -> {new_status}.",
+            f"Ticket #{ticket.id} status changed: {old_status} -> {new_status}.", tenant=tenant,
         )
 
     await db.commit()
     await db.refresh(ticket)
+    ticket_sla.scheduler.schedule(ticket.id, ticket.next_due_at)
+    suggester.index_ticket(ticket)
     return ticket.to_dict()
 
 
 @router.delete("/{ticket_id}")
-async def delete_ticket(ticket_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
+async def delete_ticket(ticket_id: int, db: AsyncSession = Depends(get_db),
+                        actor: str | None = Depends(current_actor), tenant: str = Depends(current_tenant)):
+    result = await db.execute(select(Ticket).where(Ticket.id == ticket_id, Ticket.tenant == tenant))
     ticket = result.scalar_one_or_none()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
+    ticket_history.record(db, ticket, "deleted", {}, actor)
     await db.delete(ticket)
     await db.commit()
+    ticket_sla.scheduler.forget(ticket_id)
+    suggester.forget_ticket(tenant, ticket_id)
     return {"message": "Ticket deleted"}
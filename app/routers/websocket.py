@@ -1,37 +1,65 @@
 """WebSocket real-time event feed."""
 
 import json
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+
+from app.services import metrics
+from app.tenancy import DEFAULT_TENANT, resolve_tenant
 
 router = APIRouter()
 
-connected_clients: list[WebSocket] = []
+# tenant -> its connected clients; events only reach the tenant they belong to
+connected_clients: dict[str, list[WebSocket]] = {}
+
+
+def _client_count() -> int:
+    return sum(len(clients) for clients in connected_clients.values())
+
+
+def _remove(tenant: str, websocket: WebSocket):
+    clients = connected_clients.get(tenant, [])
+    if websocket in clients:
+        clients.remove(websocket)
+    if not clients:
+        connected_clients.pop(tenant, None)
 
 
 @router.websocket("/ws/live-feed")
 async def websocket_endpoint(websocket: WebSocket):
+    # Behind the proxy the upgrade request carries X-Tenant like any API call
+    try:
+        tenant = resolve_tenant(websocket.headers.get("x-tenant"), websocket.headers.get("x-tenant-proxy-token"))
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+        return
     await websocket.accept()
-    connected_clients.append(websocket)
+    connected_clients.setdefault(tenant, []).append(websocket)
+    metrics.websocket_clients.set(_client_count())
     try:
         while True:
             # Keep connection alive, listen for any client messages
             await websocket.receive_text()
     except WebSocketDisconnect:
-        connected_clients.remove(websocket)
+        _remove(tenant, websocket)
     except Exception:
-        if websocket in connected_clients:
-            connected_clients.remove(websocket)
+        _remove(tenant, websocket)
+    metrics.websocket_clients.set(_client_count())
 
 
-async def broadcast_event(event: dict):
-    """Broadcast an event to all connected WebSocket clients."""
+async def broadcast_event(event: dict, tenant: str = DEFAULT_TENANT):
+    """Broadcast an event to the tenant's connected WebSocket clients."""
     message = json.dumps(event)
     disconnected = []
-    for client in connected_clients:
+    clients = list(connected_clients.get(tenant, ()))
+    metrics.websocket_send_queue_depth.inc(len(clients))
+    for client in clients:
         try:
             await client.send_text(message)
+            metrics.websocket_messages_sent.inc()
         except Exception:
             disconnected.append(client)
+        finally:
+            metrics.websocket_send_queue_depth.dec()
     for client in disconnected:
-        if client in connected_clients:
-            connected_clients.remove(client)
+        _remove(tenant, client)
+    metrics.websocket_clients.set(_client_count())
@@ -0,0 +1,50 @@
+"""Request authentication dependencies."""
+
+import hashlib
+import hmac
+
+from fastapi import Depends, Header, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db
+from app.models.agent import ProbeAgent
+
+
+async def require_admin(x_admin_token: str | None = Header(default=None)):
+    """Allow the request only if it carries the configured admin token."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+async def require_probe_token(authorization: str | None = Header(default=None)):
+    """Allow vantage probe requests carrying `Bearer <PROBE_VANTAGE_TOKEN>`."""
+    if not settings.PROBE_VANTAGE_TOKEN:
+        raise HTTPException(status_code=403, detail="Probe endpoint is disabled")
+    scheme, _, token = (authorization or "").partition(" ")
+    # Compared as bytes: compare_digest rejects str with non-ASCII characters
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.PROBE_VANTAGE_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid probe token")
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def require_agent(
+    authorization: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+) -> ProbeAgent:
+    """The active probe agent whose token the request carries as `Bearer <token>`."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Invalid agent token")
+    # Looked up by hash, so there is no token comparison to time
+    result = await db.execute(select(ProbeAgent).where(ProbeAgent.token_hash == hash_token(token)))
+    agent = result.scalar_one_or_none()
+    if agent is None or not agent.is_active:
+        raise HTTPException(status_code=401, detail="Invalid agent token")
+    return agent
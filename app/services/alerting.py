@@ -0,0 +1,324 @@
+"""Alert rules evaluated incrementally on the health-check result stream.
+
+Each rule keeps a small per-service state that is updated in O(1) per result,
+so evaluation never goes back to the database. Alerts are deduplicated (a rule
+only notifies when it starts or stops firing) and grouped into one incident per
+service. An incident opens with its first alert and resolves once every alert in
+it has cleared. Notifications about incidents fan out to the configured sinks.
+"""
+
+import asyncio
+import itertools
+import smtplib
+from collections import deque
+from datetime import datetime
+from email.message import EmailMessage
+
+from app.config import settings
+from app.services import metrics
+from app.services.incident_tickets import TicketSink
+from app.tenancy import DEFAULT_TENANT
+
+
+class ConsecutiveFailures:
+    """Fires after `threshold` offline results in a row."""
+
+    def __init__(self, threshold: int = 3):
+        self.name = "consecutive_failures"
+        self.threshold = threshold
+
+    def new_state(self) -> list:
+        return [0]
+
+    def update(self, state: list, status: str, response_time_ms: float | None) -> bool:
+        state[0] = state[0] + 1 if status == "offline" else 0
+        return state[0] >= self.threshold
+
+    def describe(self, state: list) -> str:
+        return f"{state[0]} consecutive failed checks"
+
+
+class LatencyQuantile:
+    """Fires when the `quantile` of the last `window` response times exceeds `threshold_ms`.
+
+    The quantile is above the threshold exactly when more than (1 - quantile)
+    of the samples are, so a running count of samples over the threshold is all
+    the state needed besides the ring buffer used to evict old samples.
+    """
+
+    def __init__(self, threshold_ms: float = 1000.0, window: int = 20, quantile: float = 0.95,
+                 min_samples: int = 5):
+        self.name = f"latency_p{round(quantile * 100)}"
+        self.threshold_ms = threshold_ms
+        self.window = window
+        self.quantile = quantile
+        self.min_samples = min_samples
+
+    def new_state(self) -> dict:
+        return {"samples": deque(maxlen=self.window), "over": 0}
+
+    def update(self, state: dict, status: str, response_time_ms: float | None) -> bool:
+        if response_time_ms is None:
+            # Failed checks carry no latency; keep the current verdict
+            return self._firing(state)
+        samples = state["samples"]
+        if len(samples) == self.window and samples[0] > self.threshold_ms:
+            state["over"] -= 1
+        samples.append(response_time_ms)
+        if response_time_ms > self.threshold_ms:
+            state["over"] += 1
+        return self._firing(state)
+
+    def _firing(self, state: dict) -> bool:
+        count = len(state["samples"])
+        return count >= self.min_samples and state["over"] > count * (1 - self.quantile)
+
+    def describe(self, state: dict) -> str:
+        return (f"p{round(self.quantile * 100)} latency above {self.threshold_ms:g}ms "
+                f"({state['over']}/{len(state['samples'])} recent checks)")
+
+
+class Flapping:
+    """Fires when the status changed at least `transitions` times in the last `window` results."""
+
+    def __init__(self, transitions: int = 4, window: int = 10):
+        self.name = "flapping"
+        self.transitions = transitions
+        self.window = window
+
+    def new_state(self) -> dict:
+        return {"changes": deque(maxlen=self.window), "count": 0, "last": None}
+
+    def update(self, state: dict, status: str, response_time_ms: float | None) -> bool:
+        changes = state["changes"]
+        changed = state["last"] is not None and status != state["last"]
+        state["last"] = status
+        if len(changes) == self.window and changes[0]:
+            state["count"] -= 1
+        changes.append(changed)
+        state["count"] += changed
+        return state["count"] >= self.transitions
+
+    def describe(self, state: dict) -> str:
+        return f"{state['count']} status changes in the last {len(state['changes'])} checks"
+
+
+def service_fingerprint(service_id: int) -> str:
+    """Key that ties a service's incidents to its incident ticket."""
+    return f"service:{service_id}"
+
+
+class Incident:
+    _ids = itertools.count(1)
+
+    def __init__(self, service_id: int, service_name: str, tenant: str = DEFAULT_TENANT):
+        self.id = next(self._ids)
+        self.service_id = service_id
+        self.service_name = service_name
+        self.tenant = tenant
+        self.opened_at = datetime.utcnow()
+        self.resolved_at: datetime | None = None
+        # Currently firing alerts: rule name -> description
+        self.alerts: dict[str, str] = {}
+        # Every rule that fired during the incident, in order
+        self.history: list[str] = []
+        self.ticket_id: int | None = None
+        # Offline results seen while the incident was open
+        self.failures = 0
+
+    @property
+    def fingerprint(self) -> str:
+        return service_fingerprint(self.service_id)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "fingerprint": self.fingerprint,
+            "service_id": self.service_id,
+            "service_name": self.service_name,
+            "tenant": self.tenant,
+            "opened_at": self.opened_at.isoformat(),
+            "resolved_at": self.resolved_at.isoformat() if self.resolved_at else None,
+            "alerts": dict(self.alerts),
+            "history": list(self.history),
+            "ticket_id": self.ticket_id,
+            "failures": self.failures,
+        }
+
+
+class Notification:
+    def __init__(self, kind: str, incident: Incident, rule: str | None = None):
+        self.kind = kind  # opened, updated, failed or resolved
+        self.incident = incident
+        self.rule = rule
+        self.timestamp = datetime.utcnow()
+        # Snapshot, so later changes to the incident don't leak into this notification
+        self.snapshot = incident.to_dict()
+
+    @property
+    def summary(self) -> str:
+        if self.kind == "resolved":
+            return f"[RESOLVED] {self.incident.service_name}: all alerts cleared"
+        if self.kind == "failed":
+            failures = self.snapshot["failures"]
+            return f"[FAILED] {self.incident.service_name}: still offline ({failures} failed checks)"
+        alerts = "; ".join(self.snapshot["alerts"].values())
+        return f"[{self.kind.upper()}] {self.incident.service_name}: {alerts}"
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "rule": self.rule,
+            "timestamp": self.timestamp.isoformat() + "Z",
+            "summary": self.summary,
+            "incident": self.snapshot,
+        }
+
+
+class AlertManager:
+    def __init__(self, rules: list, sinks: list | None = None, recent_limit: int = 100):
+        self.rules = rules
+        self.sinks = sinks or []
+        # service_id -> [rule states], parallel to self.rules
+        self._states: dict[int, list] = {}
+        self._firing: dict[int, set[str]] = {}
+        self.open_incidents: dict[int, Incident] = {}
+        self.recent_incidents: deque[Incident] = deque(maxlen=recent_limit)
+
+    def observe(self, service_id: int, service_name: str, status: str,
+                response_time_ms: float | None, tenant: str = DEFAULT_TENANT) -> list[Notification]:
+        """Feed one check result through every rule; return notifications for state changes.
+
+        While an incident is open, an offline result that changes no alert
+        produces a "failed" notification, which only sinks tracking every
+        failure (tickets) subscribe to.
+        """
+        states = self._states.get(service_id)
+        if states is None:
+            states = self._states[service_id] = [rule.new_state() for rule in self.rules]
+        firing = self._firing.setdefault(service_id, set())
+
+        notifications = []
+        for rule, state in zip(self.rules, states):
+            is_firing = rule.update(state, status, response_time_ms)
+            if is_firing == (rule.name in firing):
+                continue
+            incident = self.open_incidents.get(service_id)
+            if is_firing:
+                firing.add(rule.name)
+                metrics.alerts_fired.labels(rule.name).inc()
+                kind = "updated"
+                if incident is None:
+                    incident = self.open_incidents[service_id] = Incident(service_id, service_name, tenant)
+                    kind = "opened"
+                incident.alerts[rule.name] = rule.describe(state)
+                incident.history.append(rule.name)
+                notifications.append(Notification(kind, incident, rule.name))
+            else:
+                firing.discard(rule.name)
+                if incident is None:
+                    continue
+                incident.alerts.pop(rule.name, None)
+                if not firing:
+                    incident.resolved_at = datetime.utcnow()
+                    del self.open_incidents[service_id]
+                    self.recent_incidents.appendleft(incident)
+                    notifications.append(Notification("resolved", incident, rule.name))
+
+        incident = self.open_incidents.get(service_id)
+        if incident is not None and status == "offline":
+            incident.failures += 1
+            if not notifications:
+                notifications.append(Notification("failed", incident))
+        return notifications
+
+    def forget(self, service_id: int):
+        self._states.pop(service_id, None)
+        self._firing.pop(service_id, None)
+        self.open_incidents.pop(service_id, None)
+        for sink in self.sinks:
+            if hasattr(sink, "forget"):
+                sink.forget(service_fingerprint(service_id))
+
+    async def deliver(self, notifications: list[Notification]):
+        """Hand a batch of notifications to every sink; one failing sink doesn't block the others."""
+        batches = [(sink, [n for n in notifications if n.kind in sink.kinds]) for sink in self.sinks]
+        batches = [(sink, batch) for sink, batch in batches if batch]
+        results = await asyncio.gather(*(sink.send(batch) for sink, batch in batches), return_exceptions=True)
+        for (sink, _), result in zip(batches, results):
+            if isinstance(result, Exception):
+                metrics.alert_delivery_errors.labels(sink.name).inc()
+                print(f"Alert delivery via {sink.name} failed: {result}")
+
+
+class WebhookSink:
+    """POST each batch of notifications as JSON to a URL."""
+
+    name = "webhook"
+    kinds = frozenset({"opened", "updated", "resolved"})
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def send(self, notifications: list[Notification]):
+        import httpx
+
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.post(self.url, json={
+                "notifications": [n.to_dict() for n in notifications],
+            })
+            response.raise_for_status()
+
+
+class EmailSink:
+    """Send one plain-text email per batch through an SMTP relay."""
+
+    name = "email"
+    kinds = frozenset({"opened", "updated", "resolved"})
+
+    def __init__(self, host: str, port: int, sender: str, recipients: list[str], timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+        self.timeout = timeout
+
+    def _send_sync(self, message: EmailMessage):
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.send_message(message)
+
+    async def send(self, notifications: list[Notification]):
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = ", ".join(self.recipients)
+        lines = [n.summary for n in notifications]
+        message["Subject"] = lines[0] if len(lines) == 1 else f"{len(lines)} monitoring notifications"
+        message.set_content("\n".join(lines) + "\n")
+        # smtplib is blocking; keep it off the event loop
+        await asyncio.to_thread(self._send_sync, message)
+
+
+def default_rules() -> list:
+    return [
+        ConsecutiveFailures(settings.ALERT_CONSECUTIVE_FAILURES),
+        LatencyQuantile(settings.ALERT_LATENCY_P95_MS, settings.ALERT_LATENCY_WINDOW),
+        Flapping(settings.ALERT_FLAP_TRANSITIONS, settings.ALERT_FLAP_WINDOW),
+    ]
+
+
+def configured_sinks() -> list:
+    sinks = []
+    if settings.ALERT_WEBHOOK_URL:
+        sinks.append(WebhookSink(settings.ALERT_WEBHOOK_URL))
+    if settings.ALERT_SMTP_HOST and settings.ALERT_EMAIL_TO:
+        sinks.append(EmailSink(
+            settings.ALERT_SMTP_HOST, settings.ALERT_SMTP_PORT, settings.ALERT_EMAIL_FROM,
+            [addr.strip() for addr in settings.ALERT_EMAIL_TO.split(",") if addr.strip()],
+        ))
+    if settings.ALERT_CREATE_TICKETS:
+        sinks.append(TicketSink(settings.INCIDENT_UPDATE_INTERVAL))
+    return sinks
+
+
+alert_manager = AlertManager(default_rules(), configured_sinks())
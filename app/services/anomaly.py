@@ -0,0 +1,266 @@
+"""Adaptive per-service latency baselines and anomaly detection.
+
+Each check result updates its service's baseline in O(1): an exponentially
+weighted mean and variance, plus a ring buffer of the last ANOMALY_WINDOW
+response times. Every ANOMALY_RECOMPUTE_SECONDS the median and MAD of every
+buffer are recomputed in one vectorized batch on a worker thread. Once a
+service has them they replace the EWMA as its baseline, since they aren't
+dragged along by the outliers we are looking for.
+
+Latency often follows the time of day (backups at night, load during office
+hours), and a window of a few hours can't see that. So each result is also
+kept in one of 24 hourly ring buffers of ANOMALY_SEASONAL_SAMPLES, by UTC
+hour. The recompute derives a median/MAD per service and hour from them. Once
+an hour has enough samples, results in that hour are scored against that
+hour's baseline: the most recent results from the same hour of the day.
+
+A result is anomalous when it is both ANOMALY_THRESHOLD deviations and
+ANOMALY_MIN_DELTA_MS above the baseline. ANOMALY_CONSECUTIVE anomalous results
+in a row start an anomaly; the first normal result clears it.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from app.config import settings
+
+# Scales a MAD to a standard deviation for normally distributed samples
+MAD_SCALE = 1.4826
+# Deviation floor in ms, so a service answering in exactly 20ms every time
+# doesn't flag a 21ms result
+MIN_SPREAD_MS = 1.0
+
+
+class Baseline:
+    __slots__ = (
+        "mean", "var", "count", "samples", "median", "spread", "hourly", "hourly_count", "hourly_stats",
+        "hour", "streak", "since", "last", "score",
+    )
+
+    def __init__(self, window: int, seasonal_samples: int = 0):
+        self.mean: float | None = None
+        self.var = 0.0
+        self.count = 0
+        self.samples: deque[float] = deque(maxlen=window)
+        # Set by the batch recompute
+        self.median: float | None = None
+        self.spread: float | None = None
+        # Ring buffer per UTC hour, NaN until filled, and its (median, spread) per hour
+        self.hourly = np.full((24, seasonal_samples), np.nan, dtype=np.float32) if seasonal_samples else None
+        self.hourly_count = [0] * 24 if seasonal_samples else None
+        self.hourly_stats: np.ndarray | None = None
+        # UTC hour of the latest result, which picks the seasonal baseline
+        self.hour = 0
+        self.streak = 0
+        # When the current anomaly started, None while normal
+        self.since: datetime | None = None
+        self.last: float | None = None
+        self.score = 0.0
+
+    def method(self) -> str:
+        if self.hourly_stats is not None and not np.isnan(self.hourly_stats[self.hour, 0]):
+            return "seasonal"
+        return "median" if self.median is not None else "ewma"
+
+    def center(self) -> tuple[float, float]:
+        """The expected response time and its spread at the current hour, in ms."""
+        method = self.method()
+        if method == "seasonal":
+            median, spread = self.hourly_stats[self.hour]
+            return float(median), max(float(spread), MIN_SPREAD_MS)
+        if method == "median":
+            return self.median, max(self.spread, MIN_SPREAD_MS)
+        return self.mean, max(math.sqrt(self.var), MIN_SPREAD_MS)
+
+    def add_seasonal(self, value: float):
+        if self.hourly is not None:
+            self.hourly[self.hour, self.hourly_count[self.hour] % self.hourly.shape[1]] = value
+            self.hourly_count[self.hour] += 1
+
+    def to_dict(self) -> dict:
+        center, spread = self.center() if self.mean is not None else (None, None)
+        return {
+            "baseline_ms": round(center, 1) if center is not None else None,
+            "spread_ms": round(spread, 1) if spread is not None else None,
+            "method": self.method(),
+            "samples": self.count,
+            "last_ms": self.last,
+            "score": round(self.score, 2),
+            "anomalous": self.since is not None,
+            "since": self.since.isoformat() if self.since else None,
+        }
+
+
+def robust_rows(samples: np.ndarray) -> np.ndarray:
+    """Median and MAD-based standard deviation of every row, ignoring NaN padding.
+
+    Every row needs at least one sample. Returns an array of (median, spread) rows.
+    """
+    # nanmedian is several times slower, and full buffers (the usual case) have no padding
+    median_of = np.nanmedian if np.isnan(samples).any() else np.median
+    median = median_of(samples, axis=1)
+    mad = median_of(np.abs(samples - median[:, None]), axis=1)
+    return np.column_stack((median, MAD_SCALE * mad))
+
+
+def robust_stats(series: dict[int, list[float]]) -> dict[int, tuple[float, float]]:
+    """Median and MAD-based standard deviation of each series, in one batch."""
+    if not series:
+        return {}
+    # Shorter series are padded with NaN, so all of them go through one array
+    padded = np.full((len(series), max(map(len, series.values()))), np.nan)
+    for row, samples in enumerate(series.values()):
+        padded[row, :len(samples)] = samples
+    return {sid: (float(m), float(s)) for sid, (m, s) in zip(series, robust_rows(padded))}
+
+
+def seasonal_stats(hourly: np.ndarray, counts: np.ndarray, min_samples: int) -> np.ndarray:
+    """(median, spread) per service and hour from stacked hourly buffers.
+
+    `hourly` is (services, 24, samples); hours with fewer than `min_samples`
+    results get NaN.
+    """
+    stats = np.full(hourly.shape[:2] + (2,), np.nan)
+    ready = counts >= min_samples
+    if ready.any():
+        stats[ready] = robust_rows(hourly[ready])
+    return stats
+
+
+class LatencyAnomalyDetector:
+    def __init__(self, window: int = 240, min_samples: int = 20, threshold: float = 5.0,
+                 min_delta_ms: float = 50.0, consecutive: int = 2, alpha: float = 0.05,
+                 seasonal_samples: int = 0):
+        self.window = window
+        self.seasonal_samples = seasonal_samples
+        self.min_samples = min_samples
+        self.threshold = threshold
+        self.min_delta_ms = min_delta_ms
+        self.consecutive = consecutive
+        self.alpha = alpha
+        self._baselines: dict[int, Baseline] = {}
+        self._recomputed_at = 0.0
+
+    def observe(self, service_id: int, response_time_ms: float | None,
+                now: datetime | None = None) -> str | None:
+        """Score a result against the baseline, then fold it in.
+
+        Returns "started" or "cleared" when the service's anomaly state changes.
+        """
+        if response_time_ms is None:
+            return None
+        b = self._baselines.get(service_id)
+        if b is None:
+            b = self._baselines[service_id] = Baseline(self.window, self.seasonal_samples)
+        now = now or datetime.utcnow()
+        b.hour = now.hour
+
+        change = None
+        value = response_time_ms
+        if b.count >= self.min_samples:
+            center, spread = b.center()
+            # The EWMA takes outliers clipped to the threshold, so one spike
+            # can't inflate the variance enough to hide the next
+            value = min(response_time_ms, center + self.threshold * spread)
+            b.score = (response_time_ms - center) / spread
+            if b.score >= self.threshold and response_time_ms - center >= self.min_delta_ms:
+                b.streak += 1
+                if b.streak >= self.consecutive and b.since is None:
+                    b.since = now
+                    change = "started"
+            else:
+                b.streak = 0
+                if b.since is not None:
+                    b.since = None
+                    change = "cleared"
+
+        # Anomalous samples are kept too, so a lasting shift becomes the new normal
+        b.count += 1
+        b.last = response_time_ms
+        b.samples.append(response_time_ms)
+        b.add_seasonal(response_time_ms)
+        if b.mean is None:
+            b.mean = value
+        else:
+            diff = value - b.mean
+            b.mean += self.alpha * diff
+            b.var = (1 - self.alpha) * (b.var + self.alpha * diff * diff)
+        return change
+
+    def is_anomalous(self, service_id: int) -> bool:
+        b = self._baselines.get(service_id)
+        return b is not None and b.since is not None
+
+    def baseline(self, service_id: int) -> Baseline | None:
+        return self._baselines.get(service_id)
+
+    def describe(self, service_id: int) -> str:
+        b = self._baselines[service_id]
+        return f"latency anomaly: {b.last:.0f}ms vs baseline {b.center()[0]:.0f}ms"
+
+    def active(self) -> dict[int, Baseline]:
+        return {sid: b for sid, b in self._baselines.items() if b.since is not None}
+
+    def snapshot(self) -> dict[int, Baseline]:
+        return dict(self._baselines)
+
+    def forget(self, service_id: int):
+        self._baselines.pop(service_id, None)
+
+    async def recompute(self):
+        """Refresh every median/MAD baseline in one batch, off the event loop."""
+        series = {sid: list(b.samples) for sid, b in self._baselines.items() if len(b.samples) >= self.min_samples}
+        stats = await asyncio.to_thread(robust_stats, series)
+        for service_id, (median, spread) in stats.items():
+            b = self._baselines.get(service_id)
+            if b is not None:
+                b.median, b.spread = median, spread
+
+        if self.seasonal_samples:
+            # Copied here: checks keep writing into the live buffers meanwhile
+            ids = [sid for sid, b in self._baselines.items() if max(b.hourly_count) >= self.min_samples]
+            if ids:
+                hourly = np.stack([self._baselines[sid].hourly for sid in ids])
+                counts = np.array([self._baselines[sid].hourly_count for sid in ids])
+                by_hour = await asyncio.to_thread(
+                    seasonal_stats, hourly, counts, min(self.min_samples, self.seasonal_samples),
+                )
+                for service_id, hour_stats in zip(ids, by_hour):
+                    b = self._baselines.get(service_id)
+                    if b is not None:
+                        b.hourly_stats = hour_stats
+        self._recomputed_at = time.monotonic()
+
+    async def maybe_recompute(self, interval: float):
+        if time.monotonic() - self._recomputed_at >= interval:
+            await self.recompute()
+
+
+detector = LatencyAnomalyDetector(
+    settings.ANOMALY_WINDOW, settings.ANOMALY_MIN_SAMPLES, settings.ANOMALY_THRESHOLD,
+    settings.ANOMALY_MIN_DELTA_MS, settings.ANOMALY_CONSECUTIVE,
+    seasonal_samples=settings.ANOMALY_SEASONAL_SAMPLES,
+)
+
+
+def event_for(service, change: str) -> dict:
+    """The WebSocket event announcing an anomaly starting or clearing."""
+    b = detector.baseline(service.id)
+    center = b.center()[0] if b is not None and b.mean is not None else None
+    return {
+        "type": "latency_anomaly",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "data": {
+            "service_id": service.id,
+            "service_name": service.name,
+            "state": change,
+            "response_time_ms": service.response_time_ms,
+            "baseline_ms": round(center, 1) if center is not None else None,
+            "score": round(b.score, 2) if b is not None else None,
+        },
+    }
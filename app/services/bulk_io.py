@@ -0,0 +1,267 @@
+"""Streaming bulk import/export for tickets, services and knowledge articles."""
+
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Iterable
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database
+from app.config import settings
+from app.database import async_session
+from app.models.knowledge import KnowledgeArticle
+from app.models.service import MonitoredService
+from app.models.ticket import Ticket
+from app.services.suggestions import suggester
+from app.services.ticket_sla import apply_timers, scheduler
+from app.tenancy import DEFAULT_TENANT
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+FORMATS = ("ndjson", "csv")
+TIMER_FIELDS = ("response_due_at", "resolution_due_at", "responded_at", "next_due_at")
+
+
+class TicketRecord(BaseModel):
+    title: str
+    description: str | None = None
+    priority: str = "medium"
+    status: str = "open"
+    category: str | None = None
+    assigned_to: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    resolved_at: datetime | None = None
+
+
+class ServiceRecord(BaseModel):
+    name: str
+    url: str
+    check_type: str = "http"
+    expected_status: int = 200
+    status: str = "unknown"
+    is_active: bool = True
+    group_name: str | None = None
+    tags: str | None = None
+    created_at: datetime | None = None
+
+
+class ArticleRecord(BaseModel):
+    title: str
+    content: str
+    category: str | None = None
+    tags: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+ENTITIES: dict[str, tuple[type, type[BaseModel]]] = {
+    "tickets": (Ticket, TicketRecord),
+    "services": (MonitoredService, ServiceRecord),
+    "knowledge": (KnowledgeArticle, ArticleRecord),
+}
+
+
+def _to_row(model, record: BaseModel, now: datetime, tenant: str) -> dict:
+    """Dump a validated record, filling the tenant, timestamps and defaults the ORM would normally set."""
+    row = record.model_dump()
+    row["tenant"] = tenant
+    # COPY writes only the columns it is given and skips Python-side defaults
+    for column in model.__table__.columns:
+        if column.key not in row and column.default is not None and column.default.is_scalar:
+            row[column.key] = column.default.arg
+    for key in ("created_at", "updated_at"):
+        if key in row and row[key] is None:
+            row[key] = now
+    if isinstance(record, TicketRecord):
+        # Start the SLA timers the way the tickets router does on create
+        ticket = Ticket(**row)
+        apply_timers(ticket, now)
+        row.update({key: getattr(ticket, key) for key in TIMER_FIELDS})
+    return row
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield buffer.rstrip("\r")
+
+
+async def _iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    line_no = 0
+    async for line in _iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, data, None
+
+
+async def _iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    header: list[str] | None = None
+    pending = ""
+    line_no = 0
+    record_start = 0
+    async for line in _iter_lines(chunks):
+        line_no += 1
+        if not pending:
+            record_start = line_no
+        pending = f"{pending}\n{line}" if pending else line
+        # A quoted field may span several physical lines; wait until quotes balance.
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        if len(values) != len(header):
+            yield record_start, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty CSV cells mean "not provided" so model defaults apply.
+        yield record_start, {k: v for k, v in zip(header, values) if v != ""}, None
+    if pending:
+        yield record_start, None, "Unterminated quoted field"
+
+
+async def _insert_batch(session: AsyncSession, model, rows: list[dict]):
+    """Insert a batch with COPY on PostgreSQL, multi-row INSERT elsewhere."""
+    table = model.__table__
+    if session.bind.dialect.name == "postgresql":
+        conn = await session.connection()
+        raw = await conn.get_raw_connection()
+        columns = list(rows[0].keys())
+        await raw.driver_connection.copy_records_to_table(
+            table.name,
+            records=[tuple(row[c] for c in columns) for row in rows],
+            columns=columns,
+        )
+    else:
+        await session.execute(insert(table).values(rows))
+
+
+async def import_records(
+    entity: str,
+    chunks: AsyncIterator[bytes],
+    fmt: str = "ndjson",
+    tenant: str = DEFAULT_TENANT,
+    batch_size: int = BATCH_SIZE,
+) -> dict:
+    """Validate and insert streamed records in batches, committing each batch.
+
+    Invalid rows are skipped and reported with their line numbers, as are
+    services beyond the tenant's TENANT_MAX_SERVICES quota.
+    """
+    model, record_cls = ENTITIES[entity]
+    parser = _iter_csv if fmt == "csv" else _iter_ndjson
+    inserted = 0
+    error_count = 0
+    errors: list[dict] = []
+    batch: list[dict] = []
+    now = datetime.utcnow()
+
+    def record_error(line: int, message: str):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "error": message})
+
+    async with async_session() as session:
+        allowance = None
+        if model is MonitoredService and settings.TENANT_MAX_SERVICES:
+            count = (await session.execute(
+                select(func.count()).select_from(MonitoredService).where(MonitoredService.tenant == tenant)
+            )).scalar_one()
+            allowance = settings.TENANT_MAX_SERVICES - count
+        async for line_no, data, error in parser(chunks):
+            if error:
+                record_error(line_no, error)
+                continue
+            try:
+                record = record_cls.model_validate(data)
+            except ValidationError as e:
+                first = e.errors()[0]
+                field = ".".join(str(p) for p in first["loc"])
+                record_error(line_no, f"{field}: {first['msg']}" if field else first["msg"])
+                continue
+            if allowance is not None:
+                if allowance <= 0:
+                    record_error(line_no, "Service quota exceeded")
+                    continue
+                allowance -= 1
+            batch.append(_to_row(model, record, now, tenant))
+            if len(batch) >= batch_size:
+                await _insert_batch(session, model, batch)
+                await session.commit()
+                inserted += len(batch)
+                batch = []
+        if batch:
+            await _insert_batch(session, model, batch)
+            await session.commit()
+            inserted += len(batch)
+
+    if model is not MonitoredService:
+        suggester.invalidate()
+    if model is Ticket and inserted:
+        scheduler.invalidate()
+
+    return {"entity": entity, "inserted": inserted, "error_count": error_count, "errors": errors}
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_partition(columns: list[str], rows: Iterable, fmt: str) -> str:
+    if fmt == "csv":
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        for row in rows:
+            writer.writerow(["" if v is None else _encode_value(v) for v in row])
+        return out.getvalue()
+    return "".join(
+        json.dumps({c: _encode_value(v) for c, v in zip(columns, row)}) + "\n" for row in rows
+    )
+
+
+async def export_records(entity: str, tenant: str = DEFAULT_TENANT, fmt: str = "ndjson",
+                         batch_size: int = BATCH_SIZE) -> AsyncIterator[str]:
+    """Stream a tenant's rows through a server-side cursor, one partition at a time."""
+    model, _ = ENTITIES[entity]
+    table = model.__table__
+    columns = [c.name for c in table.columns]
+    if fmt == "csv":
+        yield _encode_partition(columns, [columns], "csv")
+
+    # Exports are pure reads, so they go to the replica when one is configured.
+    async with database.replica_session() as session:
+        result = await session.stream(
+            select(table).where(table.c.tenant == tenant).order_by(table.c.id).execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions(batch_size):
+            yield _encode_partition(columns, partition, fmt)
@@ -0,0 +1,59 @@
+"""Read the expiry date out of a DER-encoded X.509 certificate.
+
+Health checks run with verification off, and then `SSLObject.getpeercert()`
+returns an empty dict. The raw DER is still available, and `notAfter` sits at a
+fixed position in it (Certificate -> tbsCertificate -> validity), so walking a
+handful of ASN.1 headers is enough without pulling in a crypto library.
+"""
+
+from datetime import datetime
+
+_SEQUENCE = 0x30
+_UTC_TIME = 0x17
+_GENERALIZED_TIME = 0x18
+
+
+def _header(der: bytes, pos: int) -> tuple[int, int, int]:
+    """Return (tag, content start, content end) of the element at `pos`."""
+    tag = der[pos]
+    length = der[pos + 1]
+    pos += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(der[pos:pos + size], "big")
+        pos += size
+    return tag, pos, pos + length
+
+
+def _parse_time(tag: int, value: bytes) -> datetime:
+    text = value.decode("ascii").rstrip("Z")
+    if tag == _UTC_TIME:
+        # Two-digit years: 50-99 are 19xx, 00-49 are 20xx (RFC 5280)
+        year = int(text[:2])
+        text = f"{1900 + year if year >= 50 else 2000 + year}{text[2:]}"
+    return datetime.strptime(text[:14], "%Y%m%d%H%M%S")
+
+
+def not_after(der: bytes) -> datetime:
+    """Expiry (naive UTC) of the certificate; raises ValueError on malformed input."""
+    try:
+        tag, start, _ = _header(der, 0)  # Certificate
+        tag, pos, _ = _header(der, start)  # tbsCertificate
+        if tag != _SEQUENCE:
+            raise ValueError("not a certificate")
+        tag, _, end = _header(der, pos)
+        if tag == 0xA0:  # explicit [0] version
+            pos = end
+        # serialNumber, signature algorithm, issuer, then validity
+        for _ in range(3):
+            _, _, pos = _header(der, pos)
+        tag, pos, _ = _header(der, pos)
+        if tag != _SEQUENCE:
+            raise ValueError("validity not found")
+        _, _, pos = _header(der, pos)  # notBefore
+        tag, start, end = _header(der, pos)
+        if tag not in (_UTC_TIME, _GENERALIZED_TIME):
+            raise ValueError("notAfter is not a time")
+        return _parse_time(tag, der[start:end])
+    except (IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"malformed certificate: {e}") from e
@@ -0,0 +1,135 @@
+"""Confirmation re-probes, per-service circuit breaker and per-cycle probe budget.
+
+A single failed probe is not enough to mark a service offline. When a check
+fails on a service that isn't already offline, it is re-probed a few times with
+exponential backoff and, if configured, once from a second vantage worker. Only
+a failure that survives all of that changes the state. Re-probes draw from a
+per-cycle budget, so a mass outage can't multiply the probe load. Once the
+budget is spent, failures are accepted unconfirmed.
+
+Services that stay down trip a circuit breaker, which skips their checks for a
+cooldown that doubles on every failed trial probe.
+"""
+
+import asyncio
+import time
+
+from app.config import settings
+from app.services import metrics
+
+
+class ProbeBudget:
+    def __init__(self, retries: int):
+        self.retries_left = retries
+        self.probes = 0
+        self.retries = 0
+        self.vantage = 0
+        self.exhausted = 0
+
+    def take(self) -> bool:
+        if self.retries_left <= 0:
+            self.exhausted += 1
+            return False
+        self.retries_left -= 1
+        return True
+
+    def report(self) -> dict:
+        return {
+            "probes": self.probes,
+            "retries": self.retries,
+            "vantage_probes": self.vantage,
+            "retry_budget_left": self.retries_left,
+            "unconfirmed_failures": self.exhausted,
+        }
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = 5, base_cooldown: float = 120.0, max_cooldown: float = 1800.0):
+        self.threshold = threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        # service_id -> [consecutive failures, open until (monotonic), current cooldown]
+        self._state: dict[int, list] = {}
+
+    def allow(self, service_id: int, now: float | None = None) -> bool:
+        state = self._state.get(service_id)
+        return state is None or (time.monotonic() if now is None else now) >= state[1]
+
+    def record(self, service_id: int, ok: bool, now: float | None = None):
+        if ok:
+            self._state.pop(service_id, None)
+            return
+        state = self._state.setdefault(service_id, [0, 0.0, 0.0])
+        state[0] += 1
+        if state[0] >= self.threshold:
+            # First trip waits base_cooldown; every failed trial after it doubles the wait
+            state[2] = min(state[2] * 2, self.max_cooldown) if state[2] else self.base_cooldown
+            state[1] = (time.monotonic() if now is None else now) + state[2]
+
+    def open_circuits(self) -> dict[int, float]:
+        """Service id -> seconds until the next trial probe, for circuits that are open."""
+        now = time.monotonic()
+        return {sid: round(s[1] - now, 1) for sid, s in self._state.items() if s[1] > now}
+
+    def forget(self, service_id: int):
+        self._state.pop(service_id, None)
+
+
+# Check configuration forwarded to the vantage worker
+VANTAGE_FIELDS = (
+    "url", "check_type", "expected_status", "http_method", "http_headers",
+    "degraded_after_ms", "body_contains", "body_regex", "max_body_bytes",
+)
+
+
+async def probe_from_vantage(service) -> dict:
+    """Ask the vantage worker to check the service; raises if it couldn't answer."""
+    import httpx
+
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        response = await client.post(
+            settings.PROBE_VANTAGE_URL.rstrip("/") + "/api/probe",
+            json={field: getattr(service, field) for field in VANTAGE_FIELDS},
+            headers={"Authorization": f"Bearer {settings.PROBE_VANTAGE_TOKEN}"},
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+async def confirmed_check(service, probe, budget: ProbeBudget) -> dict:
+    """Run `probe(service)` and re-probe failures before believing them."""
+    result = await probe(service)
+    budget.probes += 1
+    metrics.health_check_probes.labels("initial").inc()
+    # Already known to be down: one failure is consistent, nothing to confirm
+    if result["status"] != "offline" or service.status == "offline":
+        return result
+
+    for attempt in range(settings.CHECK_CONFIRM_RETRIES):
+        if not budget.take():
+            return result
+        await asyncio.sleep(settings.CHECK_RETRY_BACKOFF_MS / 1000 * 2 ** attempt)
+        result = await probe(service)
+        budget.probes += 1
+        budget.retries += 1
+        metrics.health_check_probes.labels("retry").inc()
+        if result["status"] != "offline":
+            return result
+
+    if settings.PROBE_VANTAGE_URL and budget.take():
+        budget.vantage += 1
+        metrics.health_check_probes.labels("vantage").inc()
+        try:
+            remote = await probe_from_vantage(service)
+        except Exception as e:
+            # The local result stands; apply_result logs the failure
+            return {**result, "vantage_error": str(e) or type(e).__name__}
+        if remote.get("status") != "offline":
+            # Reachable from elsewhere: a local network problem, not an outage
+            return {"status": remote["status"], "response_time_ms": remote.get("response_time_ms")}
+    return result
+
+
+breaker = CircuitBreaker(
+    settings.BREAKER_FAILURE_THRESHOLD, settings.BREAKER_BASE_COOLDOWN, settings.BREAKER_MAX_COOLDOWN,
+)
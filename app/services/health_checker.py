@@ -1,40 +1,134 @@
 """Background service health checks using HTTP, ping, and TCP."""
 
 import asyncio
+import contextlib
+import re
 import time
 import subprocess
 import platform
+from datetime import datetime
 
-import httpx
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import async_session
 from app.models.service import MonitoredService
 from app.models.log_entry import LogEntry
+from app.services import anomaly, certificates, metrics, sla, topology
+from app.services.alerting import alert_manager
+from app.services.check_policy import ProbeBudget, breaker, confirmed_check
 
 
-async def check_http(url: str, expected_status: int = 200, timeout: float = 5.0) -> dict:
-    """Perform an HTTP health check and return status + response time."""
+_http_clients: dict = {}
+
+
+def _http_client():
+    """One pooled client per event loop, so checks reuse connections and TLS sessions."""
+    import httpx  # Deferred: only needed once checks run
+
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _http_clients[loop] = httpx.AsyncClient(
+            verify=False, follow_redirects=True,
+            limits=httpx.Limits(max_connections=settings.HEALTH_CHECK_CONCURRENCY * 2),
+        )
+    return client
+
+
+async def close_http_client():
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _peer_cert_expiry(response) -> datetime | None:
+    stream = response.extensions.get("network_stream")
+    ssl_object = stream.get_extra_info("ssl_object") if stream is not None else None
+    if ssl_object is None:
+        return None
+    # Verification is off, so only the binary form is populated
+    der = ssl_object.getpeercert(binary_form=True)
     try:
-        async with httpx.AsyncClient(verify=False, follow_redirects=True) as client:
-            start = time.monotonic()
-            response = await client.get(url, timeout=timeout)
+        return certificates.not_after(der) if der else None
+    except ValueError:
+        return None
+
+
+async def _read_capped(response, limit: int, needle: bytes | None, need_full: bool) -> bytes:
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body += chunk
+        if len(body) >= limit:
+            return bytes(body[:limit])
+        if needle is not None and not need_full and needle in body:
+            break
+    return bytes(body)
+
+
+async def check_http(
+    url: str,
+    expected_status: int = 200,
+    timeout: float = 5.0,
+    method: str = "GET",
+    headers: dict | None = None,
+    degraded_after_ms: float | None = None,
+    body_contains: str | None = None,
+    body_regex: str | None = None,
+    max_body_bytes: int | None = None,
+) -> dict:
+    """Perform an HTTP health check and return status + response time.
+
+    Response time is measured to the response headers. The body is only read
+    when there is something to assert on, and never past `max_body_bytes`. For
+    HTTPS targets the certificate expiry is read from the same connection.
+    """
+    # None means unset; 0 is a real setting (always degraded, read no body)
+    if degraded_after_ms is None:
+        degraded_after_ms = settings.CHECK_DEGRADED_MS
+    if max_body_bytes is None:
+        max_body_bytes = settings.HTTP_MAX_BODY_BYTES
+    try:
+        start = time.monotonic()
+        async with _http_client().stream(method, url, headers=headers, timeout=timeout) as response:
             elapsed_ms = (time.monotonic() - start) * 1000
+            tls_expires_at = _peer_cert_expiry(response)
 
-            if response.status_code == expected_status:
-                if elapsed_ms < 200:
-                    status = "online"
-                elif elapsed_ms < 1000:
-                    status = "degraded"
-                else:
-                    status = "degraded"
-            else:
-                status = "degraded"
+            problems = []
+            if response.status_code != expected_status:
+                problems.append(f"expected HTTP {expected_status}, got {response.status_code}")
+            elif body_contains or body_regex:
+                needle = body_contains.encode() if body_contains else None
+                body = await _read_capped(response, max_body_bytes, needle, need_full=bool(body_regex))
+                if needle is not None and needle not in body:
+                    problems.append(f"body does not contain {body_contains!r}")
+                if body_regex and not re.search(body_regex, body.decode(response.encoding or "utf-8", "replace")):
+                    problems.append(f"body does not match /{body_regex}/")
+    except Exception as e:
+        return {"status": "offline", "response_time_ms": None, "detail": f"{type(e).__name__}: {e}"[:300]}
 
-            return {"status": status, "response_time_ms": round(elapsed_ms, 2)}
-    except Exception:
-        return {"status": "offline", "response_time_ms": None}
+    status = "online" if elapsed_ms < degraded_after_ms else "degraded"
+    if elapsed_ms >= degraded_after_ms:
+        problems.append(f"response took {elapsed_ms:.0f}ms (threshold {degraded_after_ms:g}ms)")
+    if problems:
+        status = "degraded"
+
+    if tls_expires_at is not None:
+        days_left = (tls_expires_at - datetime.utcnow()).total_seconds() / 86400
+        if days_left < 0:
+            status = "offline"
+            problems.append(f"TLS certificate expired on {tls_expires_at:%Y-%m-%d}")
+        elif days_left < settings.TLS_EXPIRY_WARN_DAYS:
+            status = "degraded"
+            problems.append(f"TLS certificate expires in {days_left:.0f} days")
+
+    return {
+        "status": status,
+        "response_time_ms": round(elapsed_ms, 2),
+        "detail": "; ".join(problems)[:300] or None,
+        "tls_expires_at": tls_expires_at,
+    }
 
 
 async def check_ping(host: str, timeout: float = 2.0) -> dict:
@@ -65,7 +159,7 @@ async def check_ping(host: str, timeout: float = 2.0) -> dict:
                     break
 
             if ms is not None:
-                status = "online" if ms < 200 else "degraded"
+                status = "online" if ms < settings.CHECK_DEGRADED_MS else "degraded"
                 return {"status": status, "response_time_ms": round(ms, 2)}
             return {"status": "online", "response_time_ms": None}
         else:
@@ -86,7 +180,7 @@ async def check_tcp(host: str, port: int = 80, timeout: float = 2.0) -> dict:
         writer.close()
         await writer.wait_closed()
 
-        status = "online" if elapsed_ms < 200 else "degraded"
+        status = "online" if elapsed_ms < settings.CHECK_DEGRADED_MS else "degraded"
         return {"status": status, "response_time_ms": round(elapsed_ms, 2)}
     except Exception:
         return {"status": "offline", "response_time_ms": None}
@@ -94,6 +188,15 @@ async def check_tcp(host: str, port: int = 80, timeout: float = 2.0) -> dict:
 
 async def check_service(service: MonitoredService) -> dict:
     """Run the appropriate health check for a service."""
+    start = time.perf_counter()
+    result = await _dispatch_check(service)
+    metrics.health_check_duration.labels(service.check_type, result["status"]).observe(
+        time.perf_counter() - start
+    )
+    return result
+
+
+async def _dispatch_check(service: MonitoredService) -> dict:
     if service.check_type == "ping":
         # Extract host from URL
         host = service.url.replace("https://", "").replace("http://", "").split("/")[0].split(":")[0]
@@ -105,58 +208,232 @@ async def check_service(service: MonitoredService) -> dict:
         port = int(parts[1]) if len(parts) > 1 else 80
         return await check_tcp(hostname, port)
     else:
-        return await check_http(service.url, service.expected_status)
+        return await check_http(
+            service.url, service.expected_status,
+            method=service.http_method or "GET",
+            headers=service.http_headers,
+            degraded_after_ms=service.degraded_after_ms,
+            body_contains=service.body_contains,
+            body_regex=service.body_regex,
+            max_body_bytes=service.max_body_bytes,
+        )
+
+
+def tenant_slot(semaphores: dict[str, asyncio.Semaphore], tenant: str):
+    """Cap one tenant's concurrent checks at TENANT_CHECK_CONCURRENCY.
+
+    Taken before the global semaphore, so a tenant with thousands of services
+    queues behind its own limit instead of holding every global slot.
+    """
+    if not settings.TENANT_CHECK_CONCURRENCY:
+        return contextlib.nullcontext()
+    if tenant not in semaphores:
+        semaphores[tenant] = asyncio.Semaphore(settings.TENANT_CHECK_CONCURRENCY)
+    return semaphores[tenant]
+
+
+_check_limits: dict = {}
+
+
+def _limits() -> tuple[asyncio.Semaphore, dict[str, asyncio.Semaphore]]:
+    """The global and per-tenant check semaphores, one set per event loop.
+
+    Shared by the background cycle and bulk checks, so running both at once
+    still keeps HEALTH_CHECK_CONCURRENCY probes in flight at most.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _check_limits:
+        _check_limits[loop] = (asyncio.Semaphore(settings.HEALTH_CHECK_CONCURRENCY), {})
+    return _check_limits[loop]
+
+
+async def limited_check(service: MonitoredService, budget: ProbeBudget) -> dict:
+    """Check a service under the shared concurrency limits, confirming failures.
+
+    Each probe takes its own slot, so a service waiting out a re-probe backoff
+    doesn't keep other services from being checked.
+    """
+    semaphore, tenants = _limits()
+
+    async def probe(service: MonitoredService) -> dict:
+        async with tenant_slot(tenants, service.tenant), semaphore:
+            return await check_service(service)
+
+    return await confirmed_check(service, probe, budget)
+
+
+async def check_each(services: list[MonitoredService], budget: ProbeBudget | None = None):
+    """Check services concurrently, yielding (service, result) pairs as each finishes."""
+    budget = budget if budget is not None else ProbeBudget(settings.CHECK_RETRY_BUDGET)
+
+    async def run(service: MonitoredService):
+        return service, await limited_check(service, budget)
+
+    tasks = [asyncio.create_task(run(service)) for service in services]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # The consumer went away (e.g. a client disconnected mid-stream)
+        for task in tasks:
+            task.cancel()
+
+
+def store_result(service: MonitoredService, check_result: dict):
+    service.status = check_result["status"]
+    service.response_time_ms = check_result["response_time_ms"]
+    service.last_checked = datetime.utcnow()
+    service.check_detail = check_result.get("detail")
+    if check_result.get("tls_expires_at") is not None:
+        service.tls_expires_at = check_result["tls_expires_at"]
+
+
+async def apply_result(session: AsyncSession, service: MonitoredService, check_result: dict) -> list:
+    """Store a check result on the service, log and broadcast status changes.
+
+    Returns the alert notifications the result produced; the caller delivers
+    them once the session is committed.
+    """
+    old_status = service.status
+    store_result(service, check_result)
+    latency_change = None
+    if settings.ANOMALY_DETECTION and service.status != "unreachable":
+        latency_change = anomaly.detector.observe(service.id, service.response_time_ms)
+        if anomaly.detector.is_anomalous(service.id) and service.status == "online":
+            service.status = "degraded"
+            service.check_detail = anomaly.detector.describe(service.id)
+    # Unreachable services weren't probed; the parent's incident covers them
+    notifications = [] if service.status == "unreachable" else alert_manager.observe(
+        service.id, service.name, service.status, service.response_time_ms, service.tenant,
+    )
+
+    if check_result.get("vantage_error"):
+        session.add(LogEntry(
+            level="WARNING",
+            source="health-checker",
+            message=f"Vantage probe for '{service.name}' failed: {check_result['vantage_error']}.",
+            tenant=service.tenant,
+        ))
+
+    # Log status changes
+    if old_status != service.status and old_status != "unknown":
+        level = "CRITICAL" if service.status == "offline" else "INFO" if service.status == "online" else "WARNING"
+        log = LogEntry(
+            level=level,
+            source="health-checker",
+            message=f"Service '{service.name}' changed status: {old_status} -> {service.status}.",
+            tenant=service.tenant,
+        )
+        session.add(log)
+
+        # Notify WebSocket clients
+        from app.routers.websocket import broadcast_event
+        await broadcast_event({
+            "type": "service_status_change",
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "data": {
+                "service_name": service.name,
+                "old_status": old_status,
+                "new_status": service.status,
+                "response_time_ms": service.response_time_ms,
+            },
+        }, service.tenant)
+    if latency_change:
+        if latency_change == "started":
+            metrics.latency_anomalies.inc()
+        from app.routers.websocket import broadcast_event
+        await broadcast_event(anomaly.event_for(service, latency_change), service.tenant)
+    return notifications
+
+
+# Summary of the most recent cycle, served by /api/services/check-cycle
+last_cycle: dict = {}
 
 
 async def run_health_checks():
-    """Run health checks for all active services and update the database."""
-    from datetime import datetime
+    """Run health checks for all active services and update the database.
+
+    Services are checked one dependency level at a time, so a parent's result
+    is known before its dependents are probed.
+    """
+    cycle_start = time.perf_counter()
+    budget = ProbeBudget(settings.CHECK_RETRY_BUDGET)
 
     async with async_session() as session:
         result = await session.execute(
             select(MonitoredService).where(MonitoredService.is_active == True)
         )
         services = result.scalars().all()
-
-        for service in services:
-            old_status = service.status
-            check_result = await check_service(service)
-
-            service.status = check_result["status"]
-            service.response_time_ms = check_result["response_time_ms"]
-            service.last_checked = datetime.utcnow()
-
-            # Log status changes
-            if old_status != service.status and old_status != "unknown":
-                level = "CRITICAL" if service.status == "offline" else "WARNING" if service.status == "degraded" else "INFO"
-                log = LogEntry(
-                    level=level,
+        by_id = {service.id: service for service in services}
+        previous = {service.id: service.status for service in services}
+        graph = topology.graph_for({s.id: s.parent_id for s in services}, scope="active")
+        if graph.cyclic and not graph.cycles_logged:
+            graph.cycles_logged = True
+            by_tenant: dict[str, list[int]] = {}
+            for sid in sorted(graph.cyclic):
+                by_tenant.setdefault(by_id[sid].tenant, []).append(sid)
+            for tenant, ids in by_tenant.items():
+                session.add(LogEntry(
+                    level="WARNING",
                     source="health-checker",
-                    message=f"Service '{service.name}' changed status: {old_status} -> {service.status}.",
-                )
-                session.add(log)
-
-                # Notify WebSocket clients
-                from app.routers.websocket import broadcast_event
-                await broadcast_event({
-                    "type": "service_status_change",
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "data": {
-                        "service_name": service.name,
-                        "old_status": old_status,
-                        "new_status": service.status,
-                        "response_time_ms": service.response_time_ms,
-                    },
-                })
+                    message=f"Service dependency cycle involving {ids}; checking them ungated.",
+                    tenant=tenant,
+                ))
 
+        notifications = []
+        checked = skipped = suppressed = remote = 0
+        for level in graph.levels:
+            due = []
+            for service in (by_id[sid] for sid in level):
+                if service.agent_id is not None:
+                    # Checked by its probe agent; its last reported status still gates dependents
+                    remote += 1
+                    continue
+                parent = by_id.get(service.parent_id) if service.id not in graph.cyclic else None
+                if parent is not None and parent.status in topology.BLOCKING_STATUSES:
+                    suppressed += 1
+                    notifications += await apply_result(session, service, topology.unreachable_result(parent))
+                elif breaker.allow(service.id):
+                    due.append(service)
+                else:
+                    skipped += 1
+            results = await asyncio.gather(*(limited_check(service, budget) for service in due))
+            for service, check_result in zip(due, results):
+                breaker.record(service.id, check_result["status"] != "offline")
+                notifications += await apply_result(session, service, check_result)
+            checked += len(due)
+
+        await sla.record_statuses(session, {s.id: s.status for s in services}, previous)
         await session.commit()
 
+    metrics.health_cycle_duration.observe(time.perf_counter() - cycle_start)
+    metrics.health_cycle_services.set(checked)
+    metrics.health_checks_skipped.inc(skipped)
+    metrics.health_checks_suppressed.inc(suppressed)
+    last_cycle.clear()
+    last_cycle.update({
+        "finished_at": datetime.utcnow().isoformat(),
+        "duration_s": round(time.perf_counter() - cycle_start, 3),
+        "services": len(services),
+        "checked": checked,
+        "skipped_by_breaker": skipped,
+        "unreachable": suppressed,
+        "remote": remote,
+        "dependency_levels": len(graph.levels),
+        **budget.report(),
+    })
+    await alert_manager.deliver(notifications)
+
 
 async def health_check_loop():
     """Background loop that runs health checks every 60 seconds."""
     while True:
         try:
             await run_health_checks()
+            await sla.summarize_last_month()
+            if settings.ANOMALY_DETECTION:
+                await anomaly.detector.maybe_recompute(settings.ANOMALY_RECOMPUTE_SECONDS)
         except Exception as e:
+            metrics.health_check_errors.inc()
             print(f"Health check error: {e}")
         await asyncio.sleep(60)
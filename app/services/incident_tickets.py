@@ -0,0 +1,134 @@
+"""Keep one ticket per incident in sync with alert notifications.
+
+Tickets opened here carry the incident fingerprint ("service:<id>"), which is
+indexed, so finding the open ticket for a batch of incidents is a single IN
+query instead of a scan. The fingerprint also survives restarts: an incident
+for a service that still has an open ticket is appended to it rather than
+opening a duplicate. Every notification batch from a health-check cycle is
+applied in one transaction, however many services it touches.
+"""
+
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session
+from app.models.ticket import Ticket
+from app.services import ticket_history, ticket_sla
+from app.services.suggestions import suggester
+
+CLOSED_STATUSES = ("resolved", "closed")
+# Recorded as the actor of incident ticket changes in the ticket history
+ACTOR = "system:alerting"
+# Keeps the IN list under every backend's bound-parameter limit
+LOOKUP_CHUNK = 500
+
+
+async def find_open_tickets(session: AsyncSession, fingerprints: set[str]) -> dict[str, Ticket]:
+    found = {}
+    fingerprints = sorted(fingerprints)
+    for i in range(0, len(fingerprints), LOOKUP_CHUNK):
+        result = await session.execute(
+            select(Ticket)
+            .where(Ticket.fingerprint.in_(fingerprints[i:i + LOOKUP_CHUNK]))
+            .where(Ticket.status.not_in(CLOSED_STATUSES))
+            .order_by(Ticket.created_at)
+        )
+        for ticket in result.scalars():
+            found.setdefault(ticket.fingerprint, ticket)
+    return found
+
+
+def _append(ticket: Ticket, now: datetime, line: str):
+    ticket.description = f"{ticket.description or ''}\n[{now:%Y-%m-%d %H:%M} UTC] {line}".lstrip("\n")
+
+
+class TicketSink:
+    """Open, update and auto-resolve incident tickets.
+
+    "failed" notifications (the service is still down) are appended at most
+    once per `update_interval` seconds per ticket, so a long outage doesn't
+    grow the ticket by one line per check.
+    """
+
+    name = "ticket"
+    kinds = frozenset({"opened", "updated", "failed", "resolved"})
+
+    def __init__(self, update_interval: float = 900.0):
+        self.update_interval = update_interval
+        self._last_failure_update: dict[str, float] = {}
+
+    def forget(self, fingerprint: str):
+        self._last_failure_update.pop(fingerprint, None)
+
+    async def send(self, notifications: list):
+        async with async_session() as session:
+            tickets = await self.apply(session, notifications)
+            await session.commit()
+        for ticket in tickets.values():
+            ticket_sla.scheduler.schedule(ticket.id, ticket.next_due_at)
+            suggester.index_ticket(ticket)
+        for notification in notifications:
+            ticket = tickets.get(notification.incident.fingerprint)
+            if ticket is not None:
+                notification.incident.ticket_id = ticket.id
+
+    async def apply(self, session: AsyncSession, notifications: list) -> dict[str, Ticket]:
+        now = datetime.utcnow()
+        tickets = await find_open_tickets(session, {n.incident.fingerprint for n in notifications})
+        created: list[Ticket] = []
+        # Fingerprint -> tracked fields of an existing ticket before this batch touched it
+        before: dict[str, dict] = {}
+
+        for notification in notifications:
+            incident = notification.incident
+            fingerprint = incident.fingerprint
+            ticket = tickets.get(fingerprint)
+
+            if ticket is None:
+                # No open ticket, so any throttle state belongs to one that's gone
+                self._last_failure_update.pop(fingerprint, None)
+                # Nothing to update or resolve if the ticket was closed by hand
+                if notification.kind not in ("opened", "updated"):
+                    continue
+                ticket = Ticket(
+                    title=f"Incident: {incident.service_name}"[:200],
+                    description="",
+                    priority="critical" if "consecutive_failures" in notification.snapshot["alerts"] else "high",
+                    category="monitoring",
+                    fingerprint=fingerprint,
+                    tenant=incident.tenant,
+                )
+                ticket_sla.apply_timers(ticket, now)
+                session.add(ticket)
+                tickets[fingerprint] = ticket
+                created.append(ticket)
+                _append(ticket, now, notification.summary)
+                continue
+
+            if notification.kind == "failed":
+                last = self._last_failure_update.get(fingerprint)
+                if last is not None and time.monotonic() - last < self.update_interval:
+                    continue
+                self._last_failure_update[fingerprint] = time.monotonic()
+            if ticket not in created:
+                before.setdefault(fingerprint, ticket_history.snapshot(ticket))
+            _append(ticket, now, notification.summary)
+
+            if notification.kind == "resolved":
+                ticket.status = "resolved"
+                ticket.resolved_at = now
+                ticket_sla.apply_timers(ticket, now)
+                self._last_failure_update.pop(fingerprint, None)
+
+        if created or before:
+            # New tickets need their ids before their history can reference them
+            await session.flush()
+            for ticket in created:
+                ticket_history.record_created(session, ticket, ACTOR, now)
+            for fingerprint, fields in before.items():
+                ticket = tickets[fingerprint]
+                ticket_history.record(session, ticket, "updated", ticket_history.diff(fields, ticket), ACTOR, now)
+        return tickets
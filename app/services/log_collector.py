@@ -5,11 +5,14 @@ from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.log_entry import LogEntry
+from app.tenancy import DEFAULT_TENANT
 
 
-async def create_log(session: AsyncSession, level: str, source: str, message: str, metadata_json: str | None = None):
+async def create_log(session: AsyncSession, level: str, source: str, message: str, metadata_json: str | None = None,
+                     tenant: str = DEFAULT_TENANT):
     """Create a new log entry in the database."""
     log = LogEntry(
+        tenant=tenant,
         level=level,
         source=source,
         message=message,
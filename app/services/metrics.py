@@ -0,0 +1,275 @@
+"""In-process metrics collected on hot paths and rendered in Prometheus text format."""
+
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CYCLE_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple, object] = {}
+        if not labelnames:
+            self.labels()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {c.value}" for k, c in self._children.items()]
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _samples(self):
+        lines = []
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {child.sum}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {child.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                  buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status"),
+)
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being served.")
+
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "Database statement execution time.", ("engine", "operation"),
+)
+db_pool_size = registry.gauge("db_pool_size", "Configured connection pool size.", ("engine",))
+db_pool_checked_out = registry.gauge(
+    "db_pool_checked_out", "Database connections currently checked out.", ("engine",),
+)
+db_pool_checkouts = registry.counter("db_pool_checkouts_total", "Database connection checkouts.", ("engine",))
+db_pool_connects = registry.counter("db_pool_connects_total", "New DBAPI connections opened.", ("engine",))
+
+health_cycle_duration = registry.histogram(
+    "health_check_cycle_duration_seconds", "Duration of a full health-check cycle.", buckets=CYCLE_BUCKETS,
+)
+health_cycle_services = registry.gauge("health_check_cycle_services", "Services checked in the last cycle.")
+health_check_duration = registry.histogram(
+    "health_check_duration_seconds", "Latency of a single service check.", ("check_type", "status"),
+)
+health_check_probes = registry.counter(
+    "health_check_probes_total", "Probes sent, by kind (initial, retry, vantage).", ("kind",),
+)
+health_checks_skipped = registry.counter(
+    "health_checks_skipped_total", "Checks skipped because the service's circuit breaker was open.",
+)
+health_checks_suppressed = registry.counter(
+    "health_checks_suppressed_total", "Checks skipped because a parent service was down.",
+)
+latency_anomalies = registry.counter(
+    "latency_anomalies_total", "Response-time anomalies detected against a service's baseline.",
+)
+agent_results = registry.counter(
+    "agent_results_total", "Check results accepted from remote probe agents.", ("agent",),
+)
+ticket_sla_timers = registry.gauge("ticket_sla_timers", "Tickets with a pending SLA deadline.")
+ticket_sla_breaches = registry.counter(
+    "ticket_sla_breaches_total", "Ticket SLA breaches escalated, by first breached timer.", ("timer",),
+)
+health_check_errors = registry.counter("health_check_loop_errors_total", "Unhandled errors in the health-check loop.")
+
+alerts_fired = registry.counter("alerts_fired_total", "Alert rules that started firing.", ("rule",))
+alert_delivery_errors = registry.counter(
+    "alert_delivery_errors_total", "Notification batches a sink failed to deliver.", ("sink",),
+)
+
+websocket_clients = registry.gauge("websocket_clients", "Connected WebSocket clients.")
+websocket_send_queue_depth = registry.gauge(
+    "websocket_send_queue_depth", "WebSocket messages accepted for delivery but not yet sent.",
+)
+websocket_messages_sent = registry.counter("websocket_messages_sent_total", "WebSocket messages delivered.")
+
+event_loop_lag = registry.gauge("event_loop_lag_seconds", "Most recent event-loop scheduling lag.")
+event_loop_lag_histogram = registry.histogram(
+    "event_loop_lag_distribution_seconds", "Event-loop scheduling lag samples.",
+)
+event_loop_stalls = registry.counter("event_loop_stalls_total", "Callbacks that blocked the loop past the threshold.")
+
+rate_limit_allowed = registry.counter(
+    "rate_limit_allowed_total", "Requests to rate-limited endpoints let through.", ("route",),
+)
+rate_limit_rejected = registry.counter(
+    "rate_limit_rejected_total", "Requests rejected with 429, by exhausted budget (client, total, in_flight).",
+    ("route", "reason"),
+)
+rate_limit_in_flight = registry.gauge(
+    "rate_limit_in_flight", "Requests currently holding a rate-limited endpoint's in-flight slot.", ("route",),
+)
+rate_limit_buckets = registry.gauge("rate_limit_buckets", "Token buckets held by the in-memory rate-limit store.")
+
+startup_phase_duration = registry.gauge(
+    "startup_phase_seconds", "Duration of each application startup phase.", ("phase",),
+)
+
+
+def instrument_engine(engine: AsyncEngine, name: str = "primary"):
+    """Attach statement timing and pool-usage hooks to an engine."""
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+    checked_out = db_pool_checked_out.labels(name)
+    checkouts = db_pool_checkouts.labels(name)
+    connects = db_pool_connects.labels(name)
+    if hasattr(pool, "size"):
+        db_pool_size.labels(name).set(pool.size())
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        operation = statement.lstrip()[:6].upper()
+        if operation not in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+            operation = "OTHER"
+        db_query_duration.labels(name, operation).observe(elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(context):
+        conn = context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        connects.inc()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkouts.inc()
+        checked_out.inc()
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
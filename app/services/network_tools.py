@@ -3,18 +3,20 @@
 import asyncio
 import socket
 
-import dns.resolver
-import dns.reversename
-import httpx
+# dnspython and httpx are imported inside the functions using them to keep
+# them off the startup path (see app/services/startup.py)
 
 
 async def dns_lookup(domain: str, record_type: str = "A") -> dict:
     """Perform a DNS lookup for the given domain and record type."""
+    import dns.asyncresolver
+    import dns.resolver
+
     try:
-        resolver = dns.resolver.Resolver()
+        resolver = dns.asyncresolver.Resolver()
         resolver.timeout = 5
         resolver.lifetime = 5
-        answers = resolver.resolve(domain, record_type)
+        answers = await resolver.resolve(domain, record_type)
         records = [str(rdata) for rdata in answers]
         return {
             "domain": domain,
@@ -34,6 +36,8 @@ async def dns_lookup(domain: str, record_type: str = "A") -> dict:
 
 async def geoip_lookup(ip: str) -> dict:
     """Look up geolocation data for an IP address using ip-api.com."""
+    import httpx
+
     try:
         async with httpx.AsyncClient() as client:
             response = await client.get(
@@ -95,12 +99,16 @@ async def port_scan(host: str, ports: list[int] | None = None, timeout: float =
 
 async def reverse_dns_lookup(ip: str) -> dict:
     """Perform a reverse DNS lookup on an IP address."""
+    import dns.asyncresolver
+    import dns.resolver
+    import dns.reversename
+
     try:
         rev_name = dns.reversename.from_address(ip)
-        resolver = dns.resolver.Resolver()
+        resolver = dns.asyncresolver.Resolver()
         resolver.timeout = 5
         resolver.lifetime = 5
-        answers = resolver.resolve(rev_name, "PTR")
+        answers = await resolver.resolve(rev_name, "PTR")
         hostnames = [str(rdata) for rdata in answers]
         return {
             "ip": ip,
@@ -0,0 +1,57 @@
+"""Sampling profiler producing flamegraph-ready collapsed stacks."""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_DEPTH = 128
+
+_lock = asyncio.Lock()
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{frame.f_lineno})"
+
+
+def _sample(duration: float, interval: float) -> tuple[Counter, int]:
+    """Sample every other thread's stack until `duration` elapses."""
+    own_id = threading.get_ident()
+    names = {t.ident: t.name for t in threading.enumerate()}
+    stacks: Counter = Counter()
+    samples = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_DEPTH:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(thread_id, f"thread-{thread_id}"))
+            stacks[";".join(reversed(labels))] += 1
+        samples += 1
+        time.sleep(interval)
+    return stacks, samples
+
+
+async def profile(duration: float, interval: float = 0.005) -> tuple[str, int]:
+    """Profile all threads for `duration` seconds from a background thread.
+
+    Returns the collapsed-stack text (one "frame;frame;frame count" line per
+    unique stack, as consumed by flamegraph.pl or speedscope) and the number
+    of sampling passes taken.
+    """
+    if _lock.locked():
+        raise ProfilerBusy()
+    async with _lock:
+        stacks, samples = await asyncio.to_thread(_sample, duration, interval)
+    text = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+    return text + "\n", samples
@@ -0,0 +1,208 @@
+"""Rate limits and in-flight caps for endpoints that do real outbound work.
+
+Each limited endpoint has a budget from RATE_LIMITS: requests per minute for
+one client, requests per minute for all clients together, and how many may be
+in flight at once. The per-minute budgets are token buckets whose burst size
+is the full minute's allowance. Over budget, or with every in-flight slot
+taken, the request gets 429 with a Retry-After header. It is never queued,
+so a flood can't pile up waiting sockets.
+
+Buckets are stored GCRA-style: one timestamp per key, the moment the bucket
+would be full again. That keeps the state small enough for a shared store.
+The limiter talks to its store only through `take()`, so a Redis-backed store
+can replace MemoryStore when several instances must share one budget.
+In-flight caps always stay per process, because they protect this process's
+sockets and event loop.
+
+A dependency's teardown runs before a StreamingResponse sends its body, so
+streaming endpoints return `Slot.response(body)`. The slot is then released
+when the response ends, not when the endpoint returns. That includes a client
+that disconnects before the body is ever iterated.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.config import settings
+from app.services import metrics
+
+# Idle buckets are pruned once the store holds this many keys
+MAX_BUCKETS = 10000
+
+
+@dataclass(frozen=True)
+class Budget:
+    client_per_minute: int
+    total_per_minute: int
+    max_in_flight: int
+
+
+def parse_budgets(spec: str) -> dict[str, Budget]:
+    """Parse "name:client/total/in_flight,..."; 0 disables that part of a budget."""
+    budgets = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, values = part.partition(":")
+        client, total, in_flight = (int(v) for v in values.split("/"))
+        budgets[name.strip()] = Budget(client, total, in_flight)
+    return budgets
+
+
+class MemoryStore:
+    """Token buckets held in this process."""
+
+    def __init__(self):
+        # key -> time at which the bucket is full again
+        self._full_at: dict[str, float] = {}
+
+    async def take(self, buckets: list[tuple[str, int]], now: float) -> list[float]:
+        """Take one token from every (key, per_minute) bucket, or from none.
+
+        Returns each bucket's wait in seconds; tokens were taken only if all
+        of them are 0.
+        """
+        waits = []
+        updates = {}
+        for key, per_minute in buckets:
+            full_at = max(self._full_at.get(key, now), now) + 60.0 / per_minute
+            # A full bucket holds a minute's worth of tokens
+            waits.append(max(0.0, full_at - now - 60.0))
+            updates[key] = full_at
+        if any(waits):
+            return waits
+        if len(self._full_at) >= MAX_BUCKETS:
+            self._full_at = {k: t for k, t in self._full_at.items() if t > now}
+        self._full_at.update(updates)
+        metrics.rate_limit_buckets.set(len(self._full_at))
+        return waits
+
+
+class RateLimiter:
+    def __init__(self, budgets: dict[str, Budget], store=None):
+        self.budgets = budgets
+        self.store = store if store is not None else MemoryStore()
+        self._in_flight: dict[str, int] = {}
+
+    def _reject(self, name: str, reason: str, retry_after: float):
+        metrics.rate_limit_rejected.labels(name, reason).inc()
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, try again later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    async def check(self, name: str, client: str):
+        """Spend one request from the client's and the endpoint's budget."""
+        budget = self.budgets.get(name)
+        if budget is None:
+            return
+        buckets = {}
+        if budget.client_per_minute:
+            buckets["client"] = (f"{name}:{client}", budget.client_per_minute)
+        if budget.total_per_minute:
+            buckets["total"] = (name, budget.total_per_minute)
+        if buckets:
+            waits = dict(zip(buckets, await self.store.take(list(buckets.values()), time.time())))
+            reason = max(waits, key=waits.get)
+            if waits[reason] > 0:
+                self._reject(name, reason, waits[reason])
+        metrics.rate_limit_allowed.labels(name).inc()
+
+    def acquire(self, name: str) -> "Slot":
+        """Take one of the endpoint's in-flight slots; release it through the returned Slot."""
+        budget = self.budgets.get(name)
+        limit = budget.max_in_flight if budget else 0
+        if limit and self._in_flight.get(name, 0) >= limit:
+            self._reject(name, "in_flight", 1)
+        self._in_flight[name] = self._in_flight.get(name, 0) + 1
+        metrics.rate_limit_in_flight.labels(name).inc()
+        return Slot(self, name)
+
+    def in_flight(self, name: str) -> int:
+        return self._in_flight.get(name, 0)
+
+    def _release(self, name: str):
+        self._in_flight[name] -= 1
+        metrics.rate_limit_in_flight.labels(name).dec()
+
+
+class Slot:
+    """An in-flight slot; released once, by the dependency or by the response it was handed to."""
+
+    def __init__(self, limiter: RateLimiter | None, name: str):
+        self._limiter = limiter
+        self._name = name
+        self.streaming = False
+
+    def release(self):
+        """Give the slot back; later calls do nothing."""
+        if self._limiter is not None:
+            self._limiter._release(self._name)
+            self._limiter = None
+
+    def response(self, body: AsyncIterator[bytes], **kwargs) -> StreamingResponse:
+        """A StreamingResponse for `body` that holds the slot until the response is finished."""
+        return _SlotResponse(self, self.stream(body), **kwargs)
+
+    def stream(self, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Hold the slot until `body` is exhausted or the client goes away."""
+        # Set now, not on first iteration: the dependency's teardown runs before the body is sent
+        self.streaming = True
+        return self._held(body)
+
+    async def _held(self, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            self.release()
+
+
+class _SlotResponse(StreamingResponse):
+    def __init__(self, slot: Slot, content: AsyncIterator[bytes], **kwargs):
+        super().__init__(content, **kwargs)
+        self._slot = slot
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # An async generator that never started runs no finally block of its own
+            self._slot.release()
+
+
+limiter = RateLimiter(parse_budgets(settings.RATE_LIMITS))
+
+
+def client_key(request: Request) -> str:
+    """The caller's address; behind a trusted proxy, the first X-Forwarded-For hop."""
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limited(name: str):
+    """Route dependency that applies the `name` budget from RATE_LIMITS and yields the held Slot."""
+
+    async def dependency(request: Request):
+        if not settings.RATE_LIMIT_ENABLED:
+            yield Slot(None, name)
+            return
+        await limiter.check(name, client_key(request))
+        slot = limiter.acquire(name)
+        try:
+            yield slot
+        finally:
+            if not slot.streaming:
+                slot.release()
+
+    return Depends(dependency)
@@ -0,0 +1,371 @@
+"""Uptime, MTBF and MTTR from run-length encoded status history.
+
+Check results aren't stored as samples. The health checker closes a service's
+open ServiceStatusInterval and opens a new one only when its status changes, so
+a stable service costs one row per month however often it is checked. Open
+intervals are rolled over at each month boundary, so no interval spans two
+months. A scan of any range then only reads rows that started in the range's
+first month or later, which keeps it on the started_at index. The clipping and
+summing happen in SQL, so no per-interval rows come back to Python.
+Rollovers are serialised in-process, and a unique (service_id, started_at)
+index turns a concurrent rollover from another process into a no-op.
+
+Closed calendar months never change again, so their per-service totals are
+computed once, for every service in a single pass, and kept in
+sla_monthly_summaries. A yearly report sums twelve months of summaries in SQL and
+scans raw intervals only for the partial months at either end.
+
+Online and degraded count as up, offline and unreachable as down; unknown time
+isn't observed. A failure is a transition into a down status; the interval that
+starts it is flagged when recorded, and it belongs to the month it started in.
+MTBF is up time per failure, MTTR down time per failure.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import Float, case, delete, event, func, insert, literal, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.database import async_session
+from app.models.sla import ServiceStatusInterval, SlaMonth, SlaMonthlySummary
+
+UP_STATUSES = ("online", "degraded")
+DOWN_STATUSES = ("offline", "unreachable")
+# Keeps IN lists under every backend's bound-parameter limit
+ID_CHUNK = 500
+
+
+class Totals:
+    __slots__ = ("observed", "up", "down", "failures")
+
+    def __init__(self, observed: float = 0.0, up: float = 0.0, down: float = 0.0, failures: int = 0):
+        self.observed = observed
+        self.up = up
+        self.down = down
+        self.failures = failures
+
+    def add(self, other: "Totals"):
+        self.observed += other.observed
+        self.up += other.up
+        self.down += other.down
+        self.failures += other.failures
+
+    def to_dict(self) -> dict:
+        return {
+            "uptime_pct": round(self.up / self.observed * 100, 4) if self.observed else None,
+            "observed_seconds": round(self.observed),
+            "downtime_seconds": round(self.down),
+            "failures": self.failures,
+            "mtbf_seconds": round(self.up / self.failures) if self.failures else None,
+            "mttr_seconds": round(self.down / self.failures) if self.failures else None,
+        }
+
+
+def month_start(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+
+
+class epoch_seconds(FunctionElement):
+    """A timestamp as seconds since an arbitrary, backend-specific origin; only differences are meaningful."""
+
+    type = Float()
+    inherit_cache = True
+
+
+@compiles(epoch_seconds)
+def _epoch_default(element, compiler, **kw):
+    return f"EXTRACT(EPOCH FROM {compiler.process(element.clauses, **kw)})"
+
+
+@compiles(epoch_seconds, "sqlite")
+def _epoch_sqlite(element, compiler, **kw):
+    return f"(julianday({compiler.process(element.clauses, **kw)}) * 86400.0)"
+
+
+def _chunks(ids: list[int]):
+    for i in range(0, len(ids), ID_CHUNK):
+        yield ids[i:i + ID_CHUNK]
+
+
+# Services known to have an open interval in this process
+_open: set[int] = set()
+# Month whose boundary open intervals have been rolled over
+_rolled_through: datetime | None = None
+# The health checker and report requests both roll over at a boundary
+_roll_lock = asyncio.Lock()
+
+
+def _undo_unless_committed(session: AsyncSession, undo):
+    """Run `undo` if the session's transaction ends in a rollback or close instead of a commit.
+
+    _open and _rolled_through are updated before the caller commits; this
+    takes the update back when the rows it describes never reach the database.
+    """
+    sync = session.sync_session
+    sync.info.setdefault("sla_undo", []).append(undo)
+    if not sync.info.get("sla_hooks"):
+        sync.info["sla_hooks"] = True
+        event.listen(sync, "after_commit", lambda s: s.info.pop("sla_undo", None))
+        event.listen(sync, "after_transaction_end", _transaction_ended)
+
+
+def _transaction_ended(sync_session, transaction):
+    if transaction.parent is None:
+        for undo in sync_session.info.pop("sla_undo", []):
+            undo()
+
+
+def _mark_open(session: AsyncSession, service_ids):
+    added = [sid for sid in service_ids if sid not in _open]
+    if added:
+        _open.update(added)
+        _undo_unless_committed(session, lambda: _open.difference_update(added))
+
+
+def _forget_roll_over():
+    global _rolled_through
+    _rolled_through = None
+
+
+def split_by_month(service_id: int, status: str, start: datetime, end: datetime,
+                   failure: bool = False) -> list[dict]:
+    """Interval rows for [start, end), cut at every month boundary in between."""
+    rows = []
+    boundary = next_month(month_start(start))
+    while boundary < end:
+        rows.append({"service_id": service_id, "status": status, "started_at": start,
+                     "ended_at": boundary, "failure": failure})
+        start, boundary, failure = boundary, next_month(boundary), False
+    rows.append({"service_id": service_id, "status": status, "started_at": start,
+                 "ended_at": end, "failure": failure})
+    return rows
+
+
+def _insert_intervals(session: AsyncSession, replace: bool = False):
+    """INSERT of interval rows that tolerates an existing row with the same service and start.
+
+    Another process may have rolled the same interval over already; its rows
+    are kept. With `replace`, the new row overwrites it instead.
+    """
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(ServiceStatusInterval)
+    keys = [ServiceStatusInterval.service_id, ServiceStatusInterval.started_at]
+    if not replace:
+        return statement.on_conflict_do_nothing(index_elements=keys)
+    return statement.on_conflict_do_update(index_elements=keys, set_={
+        "status": statement.excluded.status, "failure": statement.excluded.failure, "ended_at": None,
+    })
+
+
+async def roll_over(session: AsyncSession, month: datetime):
+    """Cut intervals still open from before `month` at each month boundary up to it."""
+    async with _roll_lock:
+        await _roll_over(session, month)
+
+
+async def _roll_over(session: AsyncSession, month: datetime):
+    global _rolled_through
+    if _rolled_through == month:
+        return
+    result = await session.execute(
+        select(ServiceStatusInterval.id, ServiceStatusInterval.service_id, ServiceStatusInterval.status,
+               ServiceStatusInterval.started_at, ServiceStatusInterval.failure)
+        .where(ServiceStatusInterval.ended_at.is_(None))
+        .where(ServiceStatusInterval.started_at < month)
+    )
+    stale = result.all()
+    for chunk in _chunks([row.id for row in stale]):
+        await session.execute(delete(ServiceStatusInterval).where(ServiceStatusInterval.id.in_(chunk)))
+    rows = []
+    for row in stale:
+        rows += split_by_month(row.service_id, row.status, row.started_at, month, row.failure)
+        rows.append({"service_id": row.service_id, "status": row.status, "started_at": month,
+                     "ended_at": None, "failure": False})
+    if rows:
+        await session.execute(_insert_intervals(session), rows)
+    _rolled_through = month
+    _undo_unless_committed(session, _forget_roll_over)
+
+
+async def record_statuses(session: AsyncSession, statuses: dict[int, str], previous: dict[int, str],
+                          at: datetime | None = None):
+    """Close and reopen intervals for services whose status changed (or that have none open)."""
+    at = at or datetime.utcnow()
+    await roll_over(session, month_start(at))
+    untracked = sorted(sid for sid in statuses if sid not in _open)
+    for chunk in _chunks(untracked):
+        result = await session.execute(
+            select(ServiceStatusInterval.service_id)
+            .where(ServiceStatusInterval.service_id.in_(chunk))
+            .where(ServiceStatusInterval.ended_at.is_(None))
+        )
+        _mark_open(session, result.scalars())
+
+    changed = sorted(sid for sid, status in statuses.items() if status != previous.get(sid) or sid not in _open)
+    if not changed:
+        return
+    for chunk in _chunks([sid for sid in changed if sid in _open]):
+        await session.execute(
+            update(ServiceStatusInterval)
+            .where(ServiceStatusInterval.service_id.in_(chunk))
+            .where(ServiceStatusInterval.ended_at.is_(None))
+            .values(ended_at=at)
+        )
+    # Replaces the zero-length interval left when a change lands exactly on a month boundary
+    await session.execute(_insert_intervals(session, replace=True), [
+        {"service_id": sid, "status": statuses[sid], "started_at": at,
+         "failure": statuses[sid] in DOWN_STATUSES and previous.get(sid) not in DOWN_STATUSES}
+        for sid in changed
+    ])
+    _mark_open(session, changed)
+
+
+async def forget_service(session: AsyncSession, service_id: int):
+    await forget_services(session, [service_id])
+
+
+async def forget_services(session: AsyncSession, service_ids: list[int]):
+    for chunk in _chunks(service_ids):
+        await session.execute(delete(ServiceStatusInterval).where(ServiceStatusInterval.service_id.in_(chunk)))
+        await session.execute(delete(SlaMonthlySummary).where(SlaMonthlySummary.service_id.in_(chunk)))
+    _open.difference_update(service_ids)
+
+
+async def scan_intervals(session: AsyncSession, start: datetime, end: datetime,
+                         service_id: int | None = None) -> dict[int, Totals]:
+    """Totals per service over [start, end) straight from the intervals."""
+    end = min(end, datetime.utcnow())
+    if end <= start:
+        return {}
+    i = ServiceStatusInterval
+    start_param, end_param = literal(start, i.started_at.type), literal(end, i.started_at.type)
+    # Each interval clipped to [start, end); open intervals run to `end`
+    until = func.coalesce(i.ended_at, end_param)
+    seconds = (
+        epoch_seconds(case((until < end_param, until), else_=end_param))
+        - epoch_seconds(case((i.started_at > start_param, i.started_at), else_=start_param))
+    )
+    query = (
+        select(
+            i.service_id,
+            func.sum(case((i.status.in_(UP_STATUSES), seconds), else_=0.0)),
+            func.sum(case((i.status.in_(DOWN_STATUSES), seconds), else_=0.0)),
+            func.sum(case((i.failure & (i.started_at >= start_param), 1), else_=0)),
+        )
+        # No interval crosses a month boundary, so nothing overlapping the range started earlier
+        .where(i.started_at >= month_start(start))
+        .where(i.started_at < end)
+        .where(or_(i.ended_at.is_(None), i.ended_at > start))
+        .group_by(i.service_id)
+    )
+    if service_id is not None:
+        query = query.where(i.service_id == service_id)
+    return {
+        sid: Totals((up or 0.0) + (down or 0.0), up or 0.0, down or 0.0, failures or 0)
+        for sid, up, down, failures in await session.execute(query)
+    }
+
+
+_summarize_lock = asyncio.Lock()
+
+
+async def ensure_summaries(months: list[datetime]):
+    """Compute and store summaries for closed months that don't have them yet."""
+    async with _summarize_lock, async_session() as session:
+        result = await session.execute(select(SlaMonth.month).where(SlaMonth.month.in_(months)))
+        done = set(result.scalars())
+        for month in months:
+            if month in done:
+                continue
+            totals = await scan_intervals(session, month, next_month(month))
+            rows = [
+                {"month": month, "service_id": sid, "observed_seconds": t.observed,
+                 "up_seconds": t.up, "down_seconds": t.down, "failures": t.failures}
+                for sid, t in totals.items()
+            ]
+            if rows:
+                await session.execute(insert(SlaMonthlySummary), rows)
+            session.add(SlaMonth(month=month))
+            try:
+                await session.commit()
+            except IntegrityError:
+                # Another process summarised the same month first
+                await session.rollback()
+
+
+_summarized_through: datetime | None = None
+
+
+async def summarize_last_month():
+    """Summarise the month that just closed, so the first report after the boundary is warm."""
+    global _summarized_through
+    previous = month_start(month_start(datetime.utcnow()) - timedelta(days=1))
+    if _summarized_through != previous:
+        await ensure_summaries([previous])
+        _summarized_through = previous
+
+
+async def summary_totals(session: AsyncSession, months: list[datetime],
+                         service_id: int | None = None) -> dict[int, Totals]:
+    query = (
+        select(SlaMonthlySummary.service_id, func.sum(SlaMonthlySummary.observed_seconds),
+               func.sum(SlaMonthlySummary.up_seconds), func.sum(SlaMonthlySummary.down_seconds),
+               func.sum(SlaMonthlySummary.failures))
+        .where(SlaMonthlySummary.month.in_(months))
+        .group_by(SlaMonthlySummary.service_id)
+    )
+    if service_id is not None:
+        query = query.where(SlaMonthlySummary.service_id == service_id)
+    return {
+        sid: Totals(observed, up, down, failures)
+        for sid, observed, up, down, failures in await session.execute(query)
+    }
+
+
+async def _read(query, *args):
+    async with async_session() as session:
+        return await query(session, *args)
+
+
+async def compute(start: datetime, end: datetime, service_id: int | None = None) -> dict[int, Totals]:
+    """Totals per service over [start, end): cached closed months plus scanned partial ends.
+
+    The summary lookup and the two edge scans are independent reads, so they
+    run concurrently on separate connections.
+    """
+    now = datetime.utcnow()
+    end = min(end, now)
+    first = start if start == month_start(start) else next_month(month_start(start))
+    months = []
+    month = first
+    while next_month(month) <= end:
+        months.append(month)
+        month = next_month(month)
+    if _rolled_through != month_start(now):
+        # Normally done by the health checker within a minute of the boundary
+        async with async_session() as writer:
+            await roll_over(writer, month_start(now))
+            await writer.commit()
+    if not months:
+        return await _read(scan_intervals, start, end, service_id)
+
+    await ensure_summaries(months)
+    parts = await asyncio.gather(
+        _read(summary_totals, months, service_id),
+        _read(scan_intervals, start, months[0], service_id),
+        _read(scan_intervals, next_month(months[-1]), end, service_id),
+    )
+    totals = parts[0]
+    for edge in parts[1:]:
+        for sid, t in edge.items():
+            totals.setdefault(sid, Totals()).add(t)
+    return totals
@@ -0,0 +1,79 @@
+"""Startup phase timing, connection pool warm-up and deferred module imports.
+
+`app.main` imports this module first so the "import" phase covers loading the
+application itself. Modules only needed by network tools and health checks are
+imported lazily where they are used; `prewarm_imports` loads them in a worker
+thread once the app is serving, so neither startup nor the event loop pays
+for them.
+"""
+
+import asyncio
+import importlib
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services import metrics
+
+DEFERRED_MODULES = ("httpx", "dns.asyncresolver", "dns.reversename")
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.ready_seconds: float | None = None
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = round(seconds, 4)
+        metrics.startup_phase_duration.labels(name).set(seconds)
+
+    def ready(self):
+        self.ready_seconds = round(self.elapsed(), 4)
+        self.record("total", self.ready_seconds)
+        breakdown = ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in self.phases.items())
+        print(f"Startup complete: {breakdown}")
+
+    def to_dict(self) -> dict:
+        return {"ready_seconds": self.ready_seconds, "phases": self.phases}
+
+
+timer = StartupTimer()
+
+
+async def warm_pool(engine: AsyncEngine, connections: int):
+    """Open `connections` pool connections concurrently so first requests don't pay for connecting."""
+    conns = [engine.connect() for _ in range(connections)]
+    try:
+        results = await asyncio.gather(*(conn.start() for conn in conns), return_exceptions=True)
+        await asyncio.gather(*(
+            conn.execute(text("SELECT 1")) for conn, result in zip(conns, results)
+            if not isinstance(result, BaseException)
+        ))
+    finally:
+        for conn in conns:
+            await conn.close()
+
+
+def _import_deferred():
+    for name in DEFERRED_MODULES:
+        importlib.import_module(name)
+
+
+async def prewarm_imports():
+    start = time.perf_counter()
+    await asyncio.to_thread(_import_deferred)
+    timer.record("deferred_imports", time.perf_counter() - start)
@@ -0,0 +1,218 @@
+"""Similar-ticket and knowledge-article suggestions from an in-memory text index.
+
+Each tenant's tickets (title + description) and articles (title + content +
+tags) get their own inverted index: term -> {doc id: term frequency}, scored
+with BM25, so a query only ever touches the asking tenant's documents. A query
+only visits the postings of its own terms. Terms that occur in more than
+MAX_DF_RATIO of the documents are skipped: they add almost nothing to the
+score but would make every query walk most of the corpus.
+
+The index is built from the database on first use, off the event loop. After
+that it is kept current by the write paths: the ticket and knowledge routers
+and incident tickets. Bulk imports invalidate it, so the next query rebuilds.
+It is also rebuilt in the background every SUGGESTION_REFRESH_SECONDS to pick
+up writes made by other processes.
+"""
+
+import asyncio
+import heapq
+import math
+import re
+import time
+from collections import Counter
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import async_session
+from app.models.knowledge import KnowledgeArticle
+from app.models.ticket import Ticket
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its not of on or that the "
+    "this to was were will with can cannot after before when while into out up".split()
+)
+# Only the start of long texts is indexed; incident tickets keep appending to
+# their description and the first lines say what the problem is
+MAX_TEXT_CHARS = 2000
+# Query terms beyond this many are ignored
+MAX_QUERY_TERMS = 32
+MAX_DF_RATIO = 0.25
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(text[:MAX_TEXT_CHARS].lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+class TextIndex:
+    def __init__(self):
+        self._postings: dict[str, dict[int, int]] = {}
+        self._lengths: dict[int, int] = {}
+        self._terms: dict[int, tuple[str, ...]] = {}
+        self._total_length = 0
+        # doc id -> the fields returned with a suggestion
+        self.meta: dict[int, dict] = {}
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def add(self, doc_id: int, text: str, meta: dict):
+        self.remove(doc_id)
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        for term, count in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+        self._terms[doc_id] = tuple(counts)
+        self._lengths[doc_id] = len(tokens)
+        self._total_length += len(tokens)
+        self.meta[doc_id] = meta
+
+    def remove(self, doc_id: int):
+        terms = self._terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+        del self.meta[doc_id]
+
+    def search(self, terms: list[str], k: int, exclude: int | None = None) -> list[tuple[int, float]]:
+        n = len(self._lengths)
+        if not n:
+            return []
+        avg_length = self._total_length / n or 1.0
+        scores: dict[int, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings or (n > 20 and len(postings) > n * MAX_DF_RATIO):
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = K1 * (1 - B + B * self._lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        scores.pop(exclude, None)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+def _ticket_text(ticket) -> str:
+    return f"{ticket.title} {ticket.title} {(ticket.description or '')[:MAX_TEXT_CHARS]}"
+
+
+def _ticket_meta(ticket) -> dict:
+    return {"title": ticket.title, "status": ticket.status, "priority": ticket.priority}
+
+
+def _article_text(article) -> str:
+    return f"{article.title} {article.title} {article.tags or ''} {article.content[:MAX_TEXT_CHARS]}"
+
+
+def _article_meta(article) -> dict:
+    return {"title": article.title, "category": article.category}
+
+
+def _build(ticket_rows, article_rows) -> dict[tuple[str, str], TextIndex]:
+    indexes: dict[tuple[str, str], TextIndex] = {}
+    for row in ticket_rows:
+        indexes.setdefault(("tickets", row.tenant), TextIndex()).add(row.id, _ticket_text(row), _ticket_meta(row))
+    for row in article_rows:
+        indexes.setdefault(("articles", row.tenant), TextIndex()).add(row.id, _article_text(row), _article_meta(row))
+    return indexes
+
+
+class SuggestionEngine:
+    def __init__(self):
+        # ("tickets" | "articles", tenant) -> index
+        self._indexes: dict[tuple[str, str], TextIndex] = {}
+        self._loaded_at: float | None = None
+        self._generation = 0
+        self._load_task: asyncio.Task | None = None
+        # Writes that arrive while a rebuild is reading the tables, replayed onto the new index
+        self._pending: list[tuple] | None = None
+
+    def index(self, kind: str, tenant: str) -> TextIndex:
+        return self._indexes.get((kind, tenant)) or TextIndex()
+
+    def _apply(self, op: tuple):
+        kind, tenant, method, *args = op
+        getattr(self._indexes.setdefault((kind, tenant), TextIndex()), method)(*args)
+        if self._pending is not None:
+            self._pending.append(op)
+
+    def index_ticket(self, ticket: Ticket):
+        self._apply(("tickets", ticket.tenant, "add", ticket.id, _ticket_text(ticket), _ticket_meta(ticket)))
+
+    def forget_ticket(self, tenant: str, ticket_id: int):
+        self._apply(("tickets", tenant, "remove", ticket_id))
+
+    def index_article(self, article: KnowledgeArticle):
+        self._apply(("articles", article.tenant, "add", article.id, _article_text(article), _article_meta(article)))
+
+    def forget_article(self, tenant: str, article_id: int):
+        self._apply(("articles", tenant, "remove", article_id))
+
+    def invalidate(self):
+        """Rebuild on next use, e.g. after rows were written behind the index's back."""
+        self._loaded_at = None
+        self._generation += 1
+
+    async def _load(self):
+        generation = self._generation
+        self._pending = []
+        try:
+            async with async_session() as session:
+                ticket_rows = (await session.execute(
+                    select(Ticket.id, Ticket.tenant, Ticket.title, Ticket.description, Ticket.status, Ticket.priority)
+                )).all()
+                article_rows = (await session.execute(
+                    select(KnowledgeArticle.id, KnowledgeArticle.tenant, KnowledgeArticle.title,
+                           KnowledgeArticle.content, KnowledgeArticle.tags, KnowledgeArticle.category)
+                )).all()
+            indexes = await asyncio.to_thread(_build, ticket_rows, article_rows)
+            pending, self._pending = self._pending, None
+            self._indexes = indexes
+            for op in pending:
+                self._apply(op)
+            if generation == self._generation:
+                self._loaded_at = time.monotonic()
+        except Exception as e:
+            print(f"Suggestion index build failed: {e}")
+        finally:
+            self._pending = None
+            self._load_task = None
+
+    async def ensure_loaded(self):
+        """Build the index if it has never been built; refresh a stale one in the background."""
+        stale = self._loaded_at is not None \
+            and time.monotonic() - self._loaded_at >= settings.SUGGESTION_REFRESH_SECONDS
+        if self._loaded_at is not None and not stale:
+            return
+        if self._load_task is None:
+            self._load_task = asyncio.create_task(self._load())
+        if self._loaded_at is None:
+            await asyncio.shield(self._load_task)
+
+    async def suggest(self, tenant: str, text: str, k: int | None = None, exclude_ticket: int | None = None) -> dict:
+        await self.ensure_loaded()
+        k = k or settings.SUGGESTION_TOP_K
+        terms = list(dict.fromkeys(tokenize(text)))[:MAX_QUERY_TERMS]
+        tickets, articles = self.index("tickets", tenant), self.index("articles", tenant)
+        return {
+            "tickets": [
+                {"id": doc_id, **tickets.meta[doc_id], "score": round(score, 3)}
+                for doc_id, score in tickets.search(terms, k, exclude=exclude_ticket)
+            ],
+            "articles": [
+                {"id": doc_id, **articles.meta[doc_id], "score": round(score, 3)}
+                for doc_id, score in articles.search(terms, k)
+            ],
+        }
+
+
+suggester = SuggestionEngine()
@@ -0,0 +1,23 @@
+"""Per-table change counters used to derive ETags and cache keys.
+
+The counters live in the table_versions table and are bumped by triggers on
+every tracked table (app.models.table_version), inside the transaction that
+wrote. They commit and replicate together with the rows, so every worker sees
+the same version. Callers read the version on the session they then read the
+rows with, before the rows. A lagging replica therefore reports the old
+version along with its old rows. It can never pair a new version with stale
+data.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.table_version import TableVersion
+
+
+async def version(session: AsyncSession, *tables: str) -> str:
+    result = await session.execute(
+        select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(tables))
+    )
+    versions = dict(result.all())
+    return ".".join(str(versions.get(t, 0)) for t in tables)
@@ -0,0 +1,88 @@
+"""Field-level ticket history, written in the same transaction as the change.
+
+Callers take a snapshot of the tracked fields before changing a ticket and
+record the diff afterwards; no-op updates write nothing. Long text values are
+truncated in the history so an incident ticket whose description keeps growing
+doesn't store the whole description twice per update.
+
+Reads use keyset pagination on the event id: a page is "id < cursor ORDER BY
+id DESC LIMIT n", served from the (tenant, id), (tenant, actor, id) or
+(ticket_id, id) indexes, so deep pages cost the same as the first.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ticket import Ticket, TicketEvent
+
+TRACKED_FIELDS = ("title", "description", "priority", "status", "category", "assigned_to")
+MAX_VALUE_CHARS = 500
+
+
+def snapshot(ticket: Ticket) -> dict:
+    return {field: getattr(ticket, field) for field in TRACKED_FIELDS}
+
+
+def _clip(value):
+    if isinstance(value, str) and len(value) > MAX_VALUE_CHARS:
+        return value[:MAX_VALUE_CHARS] + "…"
+    return value
+
+
+def diff(before: dict, ticket: Ticket) -> dict:
+    changes = {}
+    for field, old in before.items():
+        new = getattr(ticket, field)
+        if new != old:
+            changes[field] = [_clip(old), _clip(new)]
+    return changes
+
+
+def record(session: AsyncSession, ticket: Ticket, kind: str, changes: dict,
+           actor: str | None = None, at: datetime | None = None) -> TicketEvent | None:
+    """Add an event for `ticket` to the session; the ticket must already have an id."""
+    if not changes and kind == "updated":
+        return None
+    event = TicketEvent(ticket_id=ticket.id, tenant=ticket.tenant, kind=kind, actor=actor, changes=changes,
+                        created_at=at or datetime.utcnow())
+    session.add(event)
+    return event
+
+
+def record_created(session: AsyncSession, ticket: Ticket, actor: str | None = None,
+                   at: datetime | None = None) -> TicketEvent:
+    changes = {field: [None, _clip(value)] for field, value in snapshot(ticket).items() if value is not None}
+    return record(session, ticket, "created", changes, actor, at)
+
+
+async def page(session: AsyncSession, tenant: str, ticket_id: int | None = None, actor: str | None = None,
+               kind: str | None = None, before: int | None = None, limit: int = 50) -> dict:
+    """One page of a tenant's events, newest first, and the cursor for the next page."""
+    e = TicketEvent
+    query = (
+        select(e.id, e.ticket_id, e.created_at, e.kind, e.actor, e.changes)
+        .where(e.tenant == tenant)
+        .order_by(e.id.desc())
+        .limit(limit + 1)
+    )
+    if ticket_id is not None:
+        query = query.where(e.ticket_id == ticket_id)
+    if actor is not None:
+        query = query.where(e.actor == actor)
+    if kind is not None:
+        query = query.where(e.kind == kind)
+    if before is not None:
+        query = query.where(e.id < before)
+    rows = (await session.execute(query)).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "events": [
+            {"id": r.id, "ticket_id": r.ticket_id, "created_at": r.created_at, "kind": r.kind,
+             "actor": r.actor, "changes": r.changes}
+            for r in rows
+        ],
+        "next_before": rows[-1].id if more else None,
+    }
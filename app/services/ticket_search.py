@@ -0,0 +1,122 @@
+"""Full-text ticket search with facet counts.
+
+Text matching uses the database's own full-text index: the tickets_fts FTS5
+table on SQLite, or the GIN tsvector index on PostgreSQL (see
+app.models.ticket). Every word of the query must match, and the last word also
+matches as a prefix so results can update while the user types.
+
+The facets and the date histogram are computed over the full set of matching
+tickets, not just the returned page. They come from one statement: the
+matching rows go into a CTE, and that CTE is grouped once per facet, with the
+groups joined by UNION ALL. The database scans the matches once, and the whole
+thing is a single round trip.
+"""
+
+import re
+from datetime import datetime
+
+from sqlalchemy import String, cast, column, desc, func, literal, literal_column, select, table, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ticket import TICKET_TSVECTOR, Ticket
+
+FACETS = ("status", "priority", "category", "assigned_to")
+INTERVALS = ("day", "week", "month")
+# Most values returned per facet, largest counts first
+FACET_LIMIT = 20
+MAX_QUERY_TERMS = 16
+
+WORD_RE = re.compile(r"\w+")
+_fts = table("tickets_fts", column("rowid"), column("rank"))
+
+
+def query_terms(q: str) -> list[str]:
+    return WORD_RE.findall(q.lower())[:MAX_QUERY_TERMS]
+
+
+def _text_match(query, dialect: str, terms: list[str]):
+    """Restrict `query` to tickets matching every term; returns (query, rank expression, ascending)."""
+    if dialect == "sqlite":
+        # Quoted, so user input can't inject FTS5 operators
+        match = " ".join(f'"{t}"' for t in terms) + "*"
+        # Materialized so the MATCH runs once. Joined directly, SQLite may
+        # drive the query from another index (e.g. assigned_to) and re-run
+        # the full-text query for every candidate row
+        hits = (
+            select(_fts.c.rowid.label("id"), _fts.c.rank)
+            .where(text("tickets_fts MATCH :fts_query").bindparams(fts_query=match))
+            .cte("hits").prefix_with("MATERIALIZED")
+        )
+        return query.join(hits, hits.c.id == Ticket.id), hits.c.rank, True
+    document = literal_column(TICKET_TSVECTOR)
+    tsquery = func.to_tsquery("english", " & ".join(terms) + ":*")
+    return query.where(document.op("@@")(tsquery)), func.ts_rank(document, tsquery), False
+
+
+def _bucket(dialect: str, interval: str):
+    if dialect == "sqlite":
+        if interval == "week":
+            # Monday of the week
+            return func.date(Ticket.created_at, "weekday 0", "-6 days")
+        return func.strftime("%Y-%m-01" if interval == "month" else "%Y-%m-%d", Ticket.created_at)
+    return func.to_char(func.date_trunc(interval, Ticket.created_at), "YYYY-MM-DD")
+
+
+def _filtered(query, filters: dict, created_from: datetime | None, created_to: datetime | None):
+    for field, value in filters.items():
+        if value is not None:
+            query = query.where(getattr(Ticket, field) == value)
+    if created_from is not None:
+        query = query.where(Ticket.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(Ticket.created_at < created_to)
+    return query
+
+
+async def search(
+    session: AsyncSession,
+    q: str | None = None,
+    filters: dict | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    interval: str = "day",
+    limit: int = 50,
+    offset: int = 0,
+) -> dict:
+    dialect = session.bind.dialect.name
+    terms = query_terms(q or "")
+    filters = filters or {}
+
+    page = _filtered(select(*Ticket.__table__.c), filters, created_from, created_to)
+    matches = _filtered(
+        select(*(getattr(Ticket, f) for f in FACETS), _bucket(dialect, interval).label("created")),
+        filters, created_from, created_to,
+    )
+    if terms:
+        page, rank, ascending = _text_match(page, dialect, terms)
+        matches, _, _ = _text_match(matches, dialect, terms)
+        page = page.order_by(rank if ascending else desc(rank), desc(Ticket.id))
+    else:
+        page = page.order_by(desc(Ticket.created_at), desc(Ticket.id))
+
+    m = matches.cte("matches").prefix_with("MATERIALIZED")
+    counts = union_all(*(
+        select(literal(facet).label("facet"), cast(m.c[facet], String).label("value"), func.count().label("n"))
+        .group_by(m.c[facet])
+        for facet in FACETS + ("created",)
+    ))
+
+    rows = (await session.execute(page.limit(limit).offset(offset))).mappings().all()
+    facets: dict[str, list] = {facet: [] for facet in FACETS + ("created",)}
+    for facet, value, n in await session.execute(counts):
+        facets[facet].append({"value": value, "count": n})
+
+    for facet in FACETS:
+        facets[facet] = sorted(facets[facet], key=lambda v: -v["count"])[:FACET_LIMIT]
+    histogram = sorted(facets.pop("created"), key=lambda v: v["value"] or "")
+    return {
+        "total": sum(v["count"] for v in histogram),
+        "results": [dict(row) for row in rows],
+        "facets": facets,
+        "histogram": {"interval": interval, "buckets": histogram},
+    }
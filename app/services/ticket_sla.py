@@ -0,0 +1,254 @@
+"""Per-priority response and resolution timers for tickets, and their escalations.
+
+Each ticket gets two deadlines from TICKET_SLA_TARGETS when it is opened. By
+the response deadline it must have left "open"; by the resolution deadline it
+must be resolved or closed. The earliest deadline still pending is kept in the
+indexed next_due_at column.
+
+One scheduler keeps those deadlines in a min-heap and sleeps until the earliest
+one. The heap is loaded from the next_due_at index once at startup. After that
+the routers push new deadlines as tickets change, and bulk imports, which write
+rows behind the heap's back, invalidate it so it is reloaded once. The ticket
+table is never polled. A heap entry is only a hint. When it comes due the
+ticket is re-read, and it is escalated only if its stored deadline really has
+passed.
+
+A breach escalates the ticket: its priority goes up one level, it is reassigned
+along TICKET_ESCALATION_CHAIN, and a log entry and a ticket_sla_breach
+WebSocket event are emitted.
+"""
+
+import asyncio
+import heapq
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models.ticket import Ticket
+from app.services import metrics, ticket_history
+from app.services.log_collector import create_log
+
+PRIORITIES = ("low", "medium", "high", "critical")
+# Recorded as the actor of escalations in the ticket history
+ACTOR = "system:sla"
+CLOSED_STATUSES = ("resolved", "closed")
+# Keeps the IN list under every backend's bound-parameter limit
+LOOKUP_CHUNK = 500
+# Most escalations per transaction; a backlog of breaches is worked off in
+# successive batches so no single transaction grows without bound
+FIRE_BATCH = 1000
+# Longest the scheduler sleeps without checking
+MAX_SLEEP = 60.0
+
+
+def parse_targets(spec: str) -> dict[str, tuple[timedelta, timedelta]]:
+    """Parse "high:60/480,..." into {"high": (response, resolution)}."""
+    targets = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        priority, _, minutes = part.partition(":")
+        response, _, resolution = minutes.partition("/")
+        targets[priority.strip()] = (timedelta(minutes=float(response)), timedelta(minutes=float(resolution)))
+    return targets
+
+
+TARGETS = parse_targets(settings.TICKET_SLA_TARGETS)
+ESCALATION_CHAIN = [name.strip() for name in settings.TICKET_ESCALATION_CHAIN.split(",") if name.strip()]
+
+
+def pending_timer(ticket) -> str | None:
+    """Which timer next_due_at belongs to: "response", "resolution" or None."""
+    if ticket.status in CLOSED_STATUSES:
+        return None
+    if ticket.responded_at is None and not ticket.response_breached and ticket.response_due_at is not None:
+        if ticket.resolution_breached or ticket.resolution_due_at is None \
+                or ticket.response_due_at <= ticket.resolution_due_at:
+            return "response"
+    if not ticket.resolution_breached and ticket.resolution_due_at is not None:
+        return "resolution"
+    return None
+
+
+def _next_due(ticket) -> datetime | None:
+    timer = pending_timer(ticket)
+    return ticket.response_due_at if timer == "response" else ticket.resolution_due_at if timer else None
+
+
+def apply_timers(ticket: Ticket, now: datetime | None = None, priority_changed: bool = False):
+    """Start, stop or re-target a ticket's timers after it was created or edited by hand.
+
+    Deadlines count from the ticket's creation; changing its priority moves
+    the deadlines that haven't been breached yet.
+    """
+    now = now or datetime.utcnow()
+    target = TARGETS.get(ticket.priority)
+    opened = ticket.created_at or now
+    if target and (priority_changed or (ticket.response_due_at is None and ticket.resolution_due_at is None)):
+        if not ticket.response_breached:
+            ticket.response_due_at = opened + target[0]
+        if not ticket.resolution_breached:
+            ticket.resolution_due_at = opened + target[1]
+    if ticket.responded_at is None and ticket.status not in (None, "open"):
+        ticket.responded_at = now
+    ticket.next_due_at = _next_due(ticket)
+
+
+def escalate(ticket: Ticket, now: datetime) -> list[str]:
+    """Mark every timer that has run out as breached and escalate once; returns the breached timers."""
+    breached = []
+    if ticket.status not in CLOSED_STATUSES:
+        if ticket.responded_at is None and not ticket.response_breached \
+                and ticket.response_due_at is not None and ticket.response_due_at <= now:
+            ticket.response_breached = True
+            breached.append("response")
+        if not ticket.resolution_breached and ticket.resolution_due_at is not None \
+                and ticket.resolution_due_at <= now:
+            ticket.resolution_breached = True
+            breached.append("resolution")
+    if breached:
+        ticket.escalation_level = (ticket.escalation_level or 0) + 1
+        if ticket.priority in PRIORITIES:
+            ticket.priority = PRIORITIES[min(PRIORITIES.index(ticket.priority) + 1, len(PRIORITIES) - 1)]
+        if ESCALATION_CHAIN:
+            ticket.assigned_to = ESCALATION_CHAIN[min(ticket.escalation_level, len(ESCALATION_CHAIN)) - 1]
+        ticket.updated_at = now
+    ticket.next_due_at = _next_due(ticket)
+    return breached
+
+
+class SlaScheduler:
+    def __init__(self):
+        self._heap: list[tuple[datetime, int]] = []
+        # ticket id -> its current deadline; heap entries that don't match are stale
+        self._due: dict[int, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._stale = True
+
+    def schedule(self, ticket_id: int, due_at: datetime | None):
+        if due_at is None:
+            self._due.pop(ticket_id, None)
+        elif self._due.get(ticket_id) != due_at:
+            self._due[ticket_id] = due_at
+            heapq.heappush(self._heap, (due_at, ticket_id))
+            if self._heap[0] == (due_at, ticket_id):
+                # Earlier than what the scheduler is sleeping towards
+                self._wakeup.set()
+        metrics.ticket_sla_timers.set(len(self._due))
+
+    def forget(self, ticket_id: int):
+        self.schedule(ticket_id, None)
+
+    def invalidate(self):
+        """Reload the heap before the next wait, e.g. after rows were written behind its back."""
+        self._stale = True
+        self._wakeup.set()
+
+    def next_due(self) -> datetime | None:
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime, limit: int = FIRE_BATCH) -> list[int]:
+        ids = []
+        while len(ids) < limit and (due := self.next_due()) is not None and due <= now:
+            _, ticket_id = heapq.heappop(self._heap)
+            del self._due[ticket_id]
+            ids.append(ticket_id)
+        return ids
+
+    async def load(self, session: AsyncSession):
+        """Rebuild the heap from the next_due_at index."""
+        # Cleared before the read, so an invalidate() during it triggers another load
+        self._stale = False
+        try:
+            result = await session.execute(
+                select(Ticket.id, Ticket.next_due_at).where(Ticket.next_due_at.is_not(None))
+            )
+        except Exception:
+            self._stale = True
+            raise
+        self._due = dict(result.all())
+        self._heap = [(due, ticket_id) for ticket_id, due in self._due.items()]
+        heapq.heapify(self._heap)
+        metrics.ticket_sla_timers.set(len(self._due))
+
+    async def fire_due(self, now: datetime | None = None) -> list[dict]:
+        """Escalate up to FIRE_BATCH tickets whose deadline has passed, in one transaction."""
+        now = now or datetime.utcnow()
+        ids = self.pop_due(now)
+        if not ids:
+            return []
+        events = []
+        try:
+            async with async_session() as session:
+                tickets = []
+                for i in range(0, len(ids), LOOKUP_CHUNK):
+                    result = await session.execute(select(Ticket).where(Ticket.id.in_(ids[i:i + LOOKUP_CHUNK])))
+                    tickets += result.scalars().all()
+                for ticket in tickets:
+                    if ticket.next_due_at is None or ticket.next_due_at > now:
+                        continue
+                    before = ticket_history.snapshot(ticket)
+                    breached = escalate(ticket, now)
+                    if not breached:
+                        continue
+                    changes = ticket_history.diff(before, ticket)
+                    changes["breached"] = [None, breached]
+                    ticket_history.record(session, ticket, "escalated", changes, ACTOR, now)
+                    metrics.ticket_sla_breaches.labels(breached[0]).inc()
+                    message = (f"Ticket #{ticket.id} breached its {' and '.join(breached)} SLA; "
+                               f"escalated to {ticket.priority}.")
+                    if ESCALATION_CHAIN:
+                        message += f" Reassigned to {ticket.assigned_to}."
+                    await create_log(session, "WARNING", "ticket-sla", message, tenant=ticket.tenant)
+                    events.append((ticket.tenant, {
+                        "type": "ticket_sla_breach",
+                        "timestamp": now.isoformat() + "Z",
+                        "data": {
+                            "id": ticket.id,
+                            "title": ticket.title,
+                            "timers": breached,
+                            "priority": ticket.priority,
+                            "assigned_to": ticket.assigned_to,
+                            "escalation_level": ticket.escalation_level,
+                        },
+                    }))
+                await session.commit()
+        except Exception:
+            # The popped deadlines were not escalated; reload them from the index
+            self.invalidate()
+            raise
+        for ticket in tickets:
+            self.schedule(ticket.id, ticket.next_due_at)
+
+        from app.routers.websocket import broadcast_event
+        for tenant, event in events:
+            await broadcast_event(event, tenant)
+        return [event for _, event in events]
+
+    async def run(self):
+        """Sleep until the earliest deadline (or an earlier one is scheduled), then escalate."""
+        while True:
+            try:
+                if self._stale:
+                    async with async_session() as session:
+                        await self.load(session)
+                self._wakeup.clear()
+                due = self.next_due()
+                timeout = MAX_SLEEP if due is None else (due - datetime.utcnow()).total_seconds()
+                if timeout > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), min(timeout, MAX_SLEEP))
+                    except asyncio.TimeoutError:
+                        pass
+                await self.fire_due()
+            except Exception as e:
+                print(f"Ticket SLA scheduler error: {e}")
+                await asyncio.sleep(MAX_SLEEP)
+
+
+scheduler = SlaScheduler()
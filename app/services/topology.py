@@ -0,0 +1,111 @@
+"""Service dependency graph: check ordering, outage suppression and impact radius.
+
+A service may name the parent it depends on (a core router, a DNS server, a
+load balancer). Checks run one depth level at a time, roots first. A service
+whose parent is offline or unreachable is marked "unreachable" without being
+probed, so one dead router costs one timeout rather than one per dependent.
+
+The graph only changes when parents are edited, so it is built once from the
+(id, parent_id) pairs and kept in memory until those pairs change. Parent
+cycles are rejected by the API; any that reach the table anyway (imports, manual
+SQL) are detected here, and their members are checked without gating.
+"""
+
+from collections import deque
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.service import MonitoredService
+from app.services import table_versions
+
+# A parent in one of these states makes its dependents unreachable
+BLOCKING_STATUSES = ("offline", "unreachable")
+
+
+class ServiceGraph:
+    def __init__(self, parents: dict[int, int | None]):
+        # service id -> parent id; parents outside the map (deleted, inactive) count as none
+        self.parents = parents
+        self.children: dict[int, list[int]] = {}
+        for service_id, parent_id in parents.items():
+            if parent_id is not None and parent_id in parents:
+                self.children.setdefault(parent_id, []).append(service_id)
+        self.levels, self.cyclic = self._levels()
+        # Set once the health checker has logged this graph's cycles
+        self.cycles_logged = False
+
+    def _levels(self) -> tuple[list[list[int]], set[int]]:
+        """Breadth-first from the roots; whatever is never reached sits on or below a cycle."""
+        frontier = [sid for sid, parent in self.parents.items() if parent is None or parent not in self.parents]
+        levels = []
+        while frontier:
+            levels.append(frontier)
+            frontier = [child for sid in frontier for child in self.children.get(sid, ())]
+        reached = {sid for level in levels for sid in level}
+        cyclic = set(self.parents) - reached
+        if cyclic:
+            # Check them ungated rather than never
+            if levels:
+                levels[0] = levels[0] + sorted(cyclic)
+            else:
+                levels.append(sorted(cyclic))
+        return levels, cyclic
+
+    def ancestors(self, service_id: int) -> list[int]:
+        """Parent chain, nearest first; stops at a cycle."""
+        chain, seen = [], {service_id}
+        parent = self.parents.get(service_id)
+        while parent is not None and parent in self.parents and parent not in seen:
+            chain.append(parent)
+            seen.add(parent)
+            parent = self.parents.get(parent)
+        return chain
+
+    def descendants(self, service_id: int) -> list[tuple[int, int]]:
+        """(service id, depth below `service_id`) for everything that depends on it."""
+        found, seen = [], {service_id}
+        queue = deque((child, 1) for child in self.children.get(service_id, ()))
+        while queue:
+            sid, depth = queue.popleft()
+            if sid in seen:
+                continue
+            seen.add(sid)
+            found.append((sid, depth))
+            queue.extend((child, depth + 1) for child in self.children.get(sid, ()))
+        return found
+
+    def would_cycle(self, service_id: int, parent_id: int) -> bool:
+        return parent_id == service_id or service_id in self.ancestors(parent_id)
+
+
+# Graphs by scope ("all" services, "active" ones for the check loop)
+_graphs: dict[str, ServiceGraph] = {}
+_loaded_version: str | None = None
+
+
+def graph_for(parents: dict[int, int | None], scope: str = "all") -> ServiceGraph:
+    """Cached graph for these edges, rebuilt only when an edge changed."""
+    graph = _graphs.get(scope)
+    if graph is None or graph.parents != parents:
+        graph = _graphs[scope] = ServiceGraph(parents)
+    return graph
+
+
+async def load_graph(session: AsyncSession) -> ServiceGraph:
+    """Graph of every service, reloaded only after the services table changed."""
+    global _loaded_version
+    current = await table_versions.version(session, MonitoredService.__tablename__)
+    if "all" not in _graphs or current != _loaded_version:
+        result = await session.execute(select(MonitoredService.id, MonitoredService.parent_id))
+        graph_for(dict(result.all()))
+        _loaded_version = current
+    return _graphs["all"]
+
+
+def unreachable_result(parent: MonitoredService) -> dict:
+    return {
+        "status": "unreachable",
+        "response_time_ms": None,
+        "detail": f"depends on '{parent.name}', which is {parent.status}"[:300],
+    }
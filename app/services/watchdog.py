@@ -0,0 +1,117 @@
+"""Event-loop lag measurement and blocking-callback detection.
+
+A heartbeat coroutine ticks on the event loop while a daemon thread watches it.
+If the heartbeat goes quiet for longer than the threshold, the thread grabs the
+loop thread's current stack, which points straight at the blocking code.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from app.config import settings
+from app.services import metrics
+
+StallHandler = Callable[[dict], Awaitable[None]]
+
+
+class LoopWatchdog:
+    def __init__(
+        self,
+        threshold_ms: float = 250.0,
+        interval: float = 0.1,
+        on_stall: StallHandler | None = None,
+        min_report_interval: float = 10.0,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self.on_stall = on_stall or record_stall
+        self.min_report_interval = min_report_interval
+        self.recent_stalls: deque[dict] = deque(maxlen=50)
+        self.suppressed = 0
+        self._last_beat = time.monotonic()
+        self._captured: dict | None = None
+        self._captured_beat: float | None = None
+        self._last_report = 0.0
+        self._loop_thread_id: int | None = None
+        self._stop = threading.Event()
+
+    async def run(self):
+        """Heartbeat loop; also feeds the event-loop lag metrics."""
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        if self.threshold > 0:
+            threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+        try:
+            while True:
+                start = loop.time()
+                self._last_beat = time.monotonic()
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, loop.time() - start - self.interval)
+                metrics.event_loop_lag.set(lag)
+                metrics.event_loop_lag_histogram.observe(lag)
+
+                stall, self._captured = self._captured, None
+                if stall is not None:
+                    stall["blocked_ms"] = round(lag * 1000, 1)
+                    self._report(stall)
+        finally:
+            self._stop.set()
+
+    def _watch(self):
+        """Runs in a thread: capture the loop thread's stack while it is blocked."""
+        while not self._stop.wait(self.interval / 2):
+            beat = self._last_beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or self._captured_beat == beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._captured_beat = beat
+            self._captured = {
+                "detected_at": datetime.utcnow().isoformat() + "Z",
+                "stack": "".join(traceback.format_stack(frame)),
+            }
+
+    def _report(self, stall: dict):
+        self.recent_stalls.append(stall)
+        metrics.event_loop_stalls.inc()
+        now = time.monotonic()
+        if now - self._last_report < self.min_report_interval:
+            self.suppressed += 1
+            return
+        self._last_report = now
+        stall["suppressed_since_last"] = self.suppressed
+        self.suppressed = 0
+        asyncio.create_task(self._safe_handle(stall))
+
+    async def _safe_handle(self, stall: dict):
+        try:
+            await self.on_stall(stall)
+        except Exception as e:
+            print(f"Loop watchdog error: {e}")
+
+
+async def record_stall(stall: dict):
+    """Persist a stall as a LogEntry so it shows up in the log viewer."""
+    from app.database import async_session
+    from app.services.log_collector import create_log
+
+    async with async_session() as session:
+        await create_log(
+            session, "WARNING", "event-loop",
+            f"Event loop blocked for {stall['blocked_ms']:.0f}ms.",
+            metadata_json=json.dumps(stall),
+        )
+        await session.commit()
+
+
+loop_watchdog = LoopWatchdog(threshold_ms=settings.LOOP_BLOCK_THRESHOLD_MS)
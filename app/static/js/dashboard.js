@@ -45,10 +45,10 @@ function renderStatusChart(stats) {
     statusChart = new Chart(ctx, {
         type: 'doughnut',
         data: {
-            labels: ['Online', 'Degraded', 'Offline', 'Unknown'],
+            labels: ['Online', 'Degraded', 'Offline', 'Unreachable', 'Unknown'],
             datasets: [{
-                data: [stats.online, stats.degraded, stats.offline, stats.unknown],
-                backgroundColor: ['#34d399', '#fbbf24', '#f87171', '#64748b'],
+                data: [stats.online, stats.degraded, stats.offline, stats.unreachable, stats.unknown],
+                backgroundColor: ['#34d399', '#fbbf24', '#f87171', '#fb923c', '#64748b'],
                 borderWidth: 0,
             }]
         },
@@ -171,6 +171,7 @@ window.addEventListener('ws-event', (e) => {
         service_status_change: event.data?.new_status === 'offline' ? 'text-red-400' : 'text-yellow-400',
         ticket_created: 'text-blue-400',
         critical_log: 'text-red-500 font-bold',
+        latency_anomaly: event.data?.state === 'started' ? 'text-orange-400' : 'text-green-400',
     };
 
     let message = '';
@@ -178,6 +179,10 @@ window.addEventListener('ws-event', (e) => {
         message = `Service '${event.data.service_name}' changed: ${event.data.old_status} → ${event.data.new_status}`;
     } else if (event.type === 'ticket_created') {
         message = `New ticket: ${event.data.title} (${event.data.priority})`;
+    } else if (event.type === 'latency_anomaly') {
+        message = event.data.state === 'started'
+            ? `Latency anomaly on '${event.data.service_name}': ${event.data.response_time_ms}ms vs baseline ${event.data.baseline_ms}ms`
+            : `Latency on '${event.data.service_name}' back to normal`;
     }
 
     if (message) {
@@ -2,8 +2,19 @@
  * Shared utilities: fetch wrapper, toast notifications, helpers.
  */
 
+// API responses embedded in the page by the server; each is used once, for the first load
+const initialData = (() => {
+    const el = document.getElementById('initial-data');
+    return el ? JSON.parse(el.textContent) : {};
+})();
+
 // Fetch wrapper with error handling
 async function api(url, options = {}) {
+    if (!options.method && url in initialData) {
+        const data = initialData[url];
+        delete initialData[url];
+        return data;
+    }
     try {
         const response = await fetch(url, {
             headers: { 'Content-Type': 'application/json', ...options.headers },
@@ -72,6 +83,7 @@ function statusBadge(status) {
         online: 'bg-emerald-900 text-emerald-300',
         degraded: 'bg-yellow-900 text-yellow-300',
         offline: 'bg-red-900 text-red-300',
+        unreachable: 'bg-orange-900 text-orange-300',
         unknown: 'bg-slate-700 text-slate-300',
         open: 'bg-blue-900 text-blue-300',
         in_progress: 'bg-yellow-900 text-yellow-300',
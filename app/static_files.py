@@ -0,0 +1,58 @@
+"""Static files with content-hash ETags and long-lived caching for versioned URLs."""
+
+import hashlib
+import os
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+STATIC_DIR = "app/static"
+LONG_CACHE = "public, max-age=31536000, immutable"
+
+# (path, mtime, size) -> sha256 prefix, so each file is hashed once per change
+_hash_cache: dict[tuple[str, float, int], str] = {}
+
+
+def content_hash(path: str, stat_result: os.stat_result | None = None) -> str:
+    stat_result = stat_result or os.stat(path)
+    key = (path, stat_result.st_mtime, stat_result.st_size)
+    digest = _hash_cache.get(key)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        _hash_cache[key] = digest
+    return digest
+
+
+def static_url(path: str) -> str:
+    """URL for a file under app/static with its content hash as a cache-busting version."""
+    return f"/static/{path}?v={content_hash(os.path.join(STATIC_DIR, path))}"
+
+
+class CachedStaticFiles(StaticFiles):
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        digest = content_hash(str(full_path), stat_result)
+        response.headers["etag"] = f'"{digest}"'
+        # Versioned URLs change whenever the content does, so they can be cached forever
+        if b"v=" in scope.get("query_string", b""):
+            response.headers["cache-control"] = LONG_CACHE
+        else:
+            response.headers["cache-control"] = "no-cache"
+
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        # The compression middleware suffixes strong ETags with the encoding
+        client_tags = {
+            tag.strip().removeprefix("W/").strip('"').split("-")[0] for tag in if_none_match.split(",")
+        }
+        if digest in client_tags:
+            return NotModifiedResponse(response.headers)
+        return response
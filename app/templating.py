@@ -0,0 +1,131 @@
+"""Shared Jinja2 environment and pre-rendered page shells.
+
+Pages carry no per-request server state besides the highlighted nav link, so
+each one is rendered once into bytes and served from memory. Pages that list a
+`Snapshot` get the API responses their scripts would fetch on load embedded as
+JSON, cached until one of the underlying tables changes.
+"""
+
+import hashlib
+import os
+from typing import Awaitable, Callable
+
+import orjson
+from fastapi import Request
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.responses import html_response, not_modified
+from app.services import table_versions
+from app.static_files import static_url
+from app.tenancy import DEFAULT_TENANT
+
+TEMPLATE_DIR = "app/templates"
+# Replaced with the snapshot <script> tag at request time
+INITIAL_DATA_MARKER = "<!--initial-data-->"
+
+templates = Jinja2Templates(directory=TEMPLATE_DIR)
+templates.env.globals["static_url"] = static_url
+templates.env.auto_reload = settings.TEMPLATE_AUTO_RELOAD
+# Compiled template code survives restarts; None means Jinja's per-user temp dir
+templates.env.bytecode_cache = FileSystemBytecodeCache(settings.TEMPLATE_CACHE_DIR or None)
+
+# (template, active_path) -> (body, etag, templates fingerprint)
+_shells: dict[tuple[str, str | None], tuple[bytes, str, float | None]] = {}
+
+
+def _etag(*parts: bytes) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(part)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _templates_fingerprint() -> float | None:
+    if not templates.env.auto_reload:
+        return None
+    return max(entry.stat().st_mtime for entry in os.scandir(TEMPLATE_DIR))
+
+
+def get_shell(template: str, active_path: str | None = None) -> tuple[bytes, str]:
+    """Return the rendered page and its ETag, rendering on first use."""
+    fingerprint = _templates_fingerprint()
+    cached = _shells.get((template, active_path))
+    if cached is not None and cached[2] == fingerprint:
+        return cached[0], cached[1]
+
+    body = templates.get_template(template).render(
+        active_path=active_path, initial_data=INITIAL_DATA_MARKER,
+    ).encode()
+    etag = _etag(body)
+    _shells[(template, active_path)] = (body, etag, fingerprint)
+    return body, etag
+
+
+def prerender(pages: dict[str, str]):
+    """Render every {path: template} shell up front so first requests don't compile templates."""
+    for path, template in pages.items():
+        get_shell(template, path)
+
+
+Fetcher = Callable[[Request, AsyncSession, str], Awaitable]
+
+
+class Snapshot:
+    """API responses embedded in a page, keyed by the URL the page's script requests.
+
+    `sources` maps that URL to a coroutine producing the route's response, so
+    the embedded JSON is byte-for-byte what the API would have returned.
+    """
+
+    def __init__(self, tables: tuple[str, ...], sources: dict[str, Fetcher]):
+        self.tables = tables
+        self.sources = sources
+        # tenant -> (version, script)
+        self._scripts: dict[str, tuple[str, bytes]] = {}
+
+    async def version(self, db: AsyncSession) -> str:
+        return await table_versions.version(db, *self.tables)
+
+    async def script(self, db: AsyncSession, tenant: str, version: str) -> bytes:
+        # `version` was read before querying: a write racing the queries leaves
+        # the cache keyed to the older version, so the next request rebuilds it
+        cached = self._scripts.get(tenant)
+        if cached is None or cached[0] != version:
+            parts = []
+            for url, fetch in self.sources.items():
+                path, _, query = url.partition("?")
+                request = Request({
+                    "type": "http", "method": "GET", "path": path,
+                    "query_string": query.encode(), "headers": [],
+                })
+                response = await fetch(request, db, tenant)
+                parts.append(orjson.dumps(url) + b":" + response.body)
+            # Escape "<" so no value can close the script element early
+            data = (b"{" + b",".join(parts) + b"}").replace(b"<", b"\\u003c")
+            cached = self._scripts[tenant] = (
+                version, b'<script id="initial-data" type="application/json">' + data + b"</script>",
+            )
+        return cached[1]
+
+
+async def page_response(
+    request: Request,
+    template: str,
+    active_path: str | None = None,
+    snapshot: Snapshot | None = None,
+    db: AsyncSession | None = None,
+    tenant: str = DEFAULT_TENANT,
+):
+    body, etag = get_shell(template, active_path)
+    embed = snapshot is not None and settings.PAGE_INITIAL_DATA
+    if embed:
+        version = await snapshot.version(db)
+        etag = _etag(etag.encode(), version.encode(), tenant.encode())
+    if cached := not_modified(request, etag):
+        return cached
+
+    data = await snapshot.script(db, tenant, version) if embed else b""
+    return html_response(body.replace(INITIAL_DATA_MARKER.encode(), data, 1), etag)
@@ -0,0 +1,44 @@
+"""Which team's data a request reads and writes.
+
+Services, tickets, ticket history, logs and knowledge articles carry a
+`tenant` column, and every query and WebSocket broadcast is scoped to one
+tenant. The tenant comes from the X-Tenant header, and is only trusted from
+the authenticating reverse proxy. The proxy proves itself with
+X-Tenant-Proxy-Token, which must match TENANT_PROXY_TOKEN; it must also strip
+both headers from incoming requests. Without TENANT_PROXY_TOKEN, X-Tenant is
+rejected. Requests without the header belong to the default tenant. When
+TENANTS is set, every tenant must be in it, the default tenant included.
+"""
+
+import hmac
+import re
+
+from fastapi import Header, HTTPException
+
+from app.config import settings
+
+DEFAULT_TENANT = "default"
+TENANT_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,49}$")
+ALLOWED = {name.strip().lower() for name in settings.TENANTS.split(",") if name.strip()}
+
+
+def resolve_tenant(name: str | None, proxy_token: str | None = None) -> str:
+    if name is not None:
+        if not settings.TENANT_PROXY_TOKEN:
+            raise HTTPException(status_code=403, detail="X-Tenant is only accepted from a trusted proxy")
+        if not proxy_token or not hmac.compare_digest(proxy_token.encode(), settings.TENANT_PROXY_TOKEN.encode()):
+            raise HTTPException(status_code=401, detail="Invalid tenant proxy token")
+    tenant = (name or DEFAULT_TENANT).strip().lower()
+    if not TENANT_PATTERN.match(tenant):
+        raise HTTPException(status_code=400, detail="Invalid tenant name")
+    if ALLOWED and tenant not in ALLOWED:
+        raise HTTPException(status_code=403, detail="Unknown tenant")
+    return tenant
+
+
+def current_tenant(
+    x_tenant: str | None = Header(default=None, max_length=50),
+    x_tenant_proxy_token: str | None = Header(default=None),
+) -> str:
+    """The tenant the request is scoped to."""
+    return resolve_tenant(x_tenant, x_tenant_proxy_token)
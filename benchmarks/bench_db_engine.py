@@ -0,0 +1,96 @@
+"""Compare throughput of a default engine against the tuned `build_engine`.
+
+Runs a mixed read/write workload (API-style log reads racing health-checker
+style commits) against two scratch SQLite files, or against a PostgreSQL URL.
+
+Usage:
+    python -m benchmarks.bench_db_engine --workers 20 --ops 200 --write-ratio 0.2
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import desc, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.run import summarize
+
+
+async def _workload(engine, workers: int, ops: int, write_ratio: float, seed: int) -> dict:
+    from app.database import Base
+    from app.models import LogEntry
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(LogEntry.__table__).values([
+            {"timestamp": datetime.utcnow(), "level": "INFO", "source": "bench", "message": f"seed {i}"}
+            for i in range(1000)
+        ]))
+
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker(n: int):
+        nonlocal errors
+        rng = random.Random(seed + n)
+        for i in range(ops):
+            start = time.perf_counter()
+            try:
+                async with engine.connect() as conn:
+                    if rng.random() < write_ratio:
+                        await conn.execute(insert(LogEntry.__table__).values(
+                            timestamp=datetime.utcnow(), level="INFO", source="bench", message=f"w{n}-{i}",
+                        ))
+                        await conn.commit()
+                    else:
+                        await conn.execute(
+                            select(LogEntry.__table__).order_by(desc(LogEntry.timestamp)).limit(50)
+                        )
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(workers)))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return {"ops_per_second": round(workers * ops / elapsed, 1), "errors": errors, **summarize(latencies)}
+
+
+async def main_async(args):
+    from app.database import build_engine
+
+    results = {}
+    for name in ("default", "tuned"):
+        if args.database_url:
+            url = args.database_url
+        else:
+            path = Path(f"bench_engine_{name}.db")
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{path}{suffix}").unlink(missing_ok=True)
+            url = f"sqlite+aiosqlite:///./{path}"
+        engine = create_async_engine(url) if name == "default" else build_engine(url)
+        results[name] = await _workload(engine, args.workers, args.ops, args.write_ratio, args.seed)
+        r = results[name]
+        print(f"{name:8s} {r['ops_per_second']:9.1f} ops/s  p50={r['p50_ms']:.2f}ms "
+              f"p95={r['p95_ms']:.2f}ms p99={r['p99_ms']:.2f}ms errors={r['errors']}")
+    speedup = results["tuned"]["ops_per_second"] / max(results["default"]["ops_per_second"], 1e-9)
+    print(f"Tuned engine throughput: {speedup:.2f}x default")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--ops", type=int, default=200, help="Operations per worker")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None, help="Defaults to scratch SQLite files")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
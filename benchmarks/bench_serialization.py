@@ -0,0 +1,75 @@
+"""Compare bytes and microseconds per row for list-endpoint serialization paths.
+
+    orm        select(Model) -> to_dict() -> jsonable_encoder -> json.dumps (previous path)
+    tuples     select(*columns) -> dicts -> orjson (current `objects` format)
+    columnar   select(*columns) -> {"columns", "rows"} -> orjson (`format=columnar`)
+
+Usage:
+    python -m benchmarks.bench_serialization --rows 50000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+
+DEFAULT_DB = "bench_serialization.db"
+
+
+async def _time_path(session, model, path: str, repeat: int) -> tuple[float, int]:
+    from app.responses import rows_response
+
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if path == "orm":
+            result = await session.execute(select(model))
+            body = json.dumps(
+                jsonable_encoder([obj.to_dict() for obj in result.scalars().all()]),
+                ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+            ).encode("utf-8")
+            session.expunge_all()
+        else:
+            result = await session.execute(select(*model.__table__.c))
+            body = rows_response(result, "columnar" if path == "columnar" else "objects").body
+        best = min(best, time.perf_counter() - start)
+        size = len(body)
+    return best, size
+
+
+async def main_async(args):
+    from app.database import async_session
+    from app.models import LogEntry, Ticket
+    from benchmarks.dataset import generate_dataset
+
+    await generate_dataset(logs=args.rows, tickets=args.rows)
+    print(f"{'table':8s} {'path':9s} {'us/row':>8s} {'bytes/row':>10s} {'speedup':>8s}")
+    async with async_session() as session:
+        for name, model in (("logs", LogEntry), ("tickets", Ticket)):
+            baseline = None
+            for path in ("orm", "tuples", "columnar"):
+                seconds, size = await _time_path(session, model, path, args.repeat)
+                baseline = baseline or seconds
+                print(f"{name:8s} {path:9s} {seconds / args.rows * 1e6:8.2f} {size / args.rows:10.1f} "
+                      f"{baseline / seconds:7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Path(DEFAULT_DB).unlink(missing_ok=True)
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///./{DEFAULT_DB}"
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
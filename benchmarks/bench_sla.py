@@ -0,0 +1,88 @@
+"""Time the SLA report over a year of synthetic status history.
+
+Generates a year of run-length encoded intervals per service (long up runs,
+short outages), then requests `/api/reports/sla` for the last 365 days. The first
+request computes and stores the monthly summaries; the following ones are the
+steady-state cost.
+
+Usage:
+    python -m benchmarks.bench_sla --services 10000 --repeat 3
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert
+
+DEFAULT_DB = "bench_sla.db"
+
+
+def _history(rng: random.Random, service_id: int, start: datetime, now: datetime) -> list[dict]:
+    from app.services.sla import split_by_month
+
+    rows = []
+    t, status = start, "online"
+    while t < now:
+        if status == "online":
+            end = t + timedelta(hours=rng.uniform(24, 24 * 30))
+        else:
+            end = t + timedelta(minutes=rng.uniform(1, 120))
+        pieces = split_by_month(service_id, status, t, min(end, now), failure=status == "offline")
+        if end >= now:
+            pieces[-1]["ended_at"] = None
+        rows += pieces
+        t, status = end, "offline" if status == "online" else "online"
+    return rows
+
+
+async def main_async(args):
+    from httpx import ASGITransport, AsyncClient
+    from app.database import async_session, init_db
+    from app.main import app
+    from app.models import MonitoredService, ServiceStatusInterval
+
+    await init_db()
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    start = now - timedelta(days=365)
+    async with async_session() as session:
+        await session.execute(insert(MonitoredService), [
+            {"name": f"svc-{i:05d}", "url": "http://127.0.0.1:1", "check_type": "http"}
+            for i in range(args.services)
+        ])
+        rows = [row for sid in range(1, args.services + 1) for row in _history(rng, sid, start, now)]
+        for i in range(0, len(rows), 5000):
+            await session.execute(insert(ServiceStatusInterval), rows[i:i + 5000])
+        await session.commit()
+    print(f"{args.services} services, {len(rows)} intervals")
+
+    params = {"start": start.isoformat(), "group_by": "check_type"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for run in range(args.repeat + 1):
+            began = time.perf_counter()
+            response = await client.get("/api/reports/sla", params=params)
+            elapsed = time.perf_counter() - began
+            label = "cold (summarising months)" if run == 0 else "warm"
+            print(f"{label:26s} {elapsed * 1000:8.1f}ms  HTTP {response.status_code}  {len(response.content)} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--services", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{DEFAULT_DB}{suffix}").unlink(missing_ok=True)
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///./{DEFAULT_DB}"
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
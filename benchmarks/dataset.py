@@ -0,0 +1,171 @@
+"""Synthetic large-scale dataset generator.
+
+Usage:
+    python -m benchmarks.dataset --logs 1000000 --tickets 100000 --services 10000 \\
+        --http-target http://127.0.0.1:8081 --tcp-target 127.0.0.1:8082
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+LEVELS = ["INFO"] * 14 + ["WARNING"] * 4 + ["ERROR", "CRITICAL"]
+SOURCES = ["health-checker", "ticket-system", "system", "network", "security"]
+PRIORITIES = ["low", "medium", "medium", "high", "critical"]
+TICKET_STATUSES = ["open", "in_progress", "resolved", "closed", "closed"]
+CATEGORIES = ["network", "hardware", "software", "security", None]
+ASSIGNEES = ["Max Mueller", "Anna Schmidt", "Thomas Weber", "Lena Fischer", None]
+WORDS = (
+    "vpn dns printer backup server certificate outage latency firewall switch router "
+    "disk memory cpu login password email exchange patch update restart timeout "
+    "database replication cluster storage network proxy ssl license laptop"
+).split()
+
+# Keep each multi-row INSERT below SQLite's bound-parameter limit.
+BATCH_SIZE = 2000
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _log_rows(rng: random.Random, count: int, now: datetime):
+    span = 30 * 24 * 3600
+    for _ in range(count):
+        yield {
+            "timestamp": now - timedelta(seconds=rng.randint(0, span)),
+            "level": rng.choice(LEVELS),
+            "source": rng.choice(SOURCES),
+            "message": _sentence(rng, 8).capitalize() + ".",
+            "metadata_json": None,
+        }
+
+
+def _ticket_rows(rng: random.Random, count: int, now: datetime):
+    span = 365 * 24 * 3600
+    for i in range(count):
+        created = now - timedelta(seconds=rng.randint(0, span))
+        status = rng.choice(TICKET_STATUSES)
+        resolved = created + timedelta(hours=rng.randint(1, 96)) if status in ("resolved", "closed") else None
+        yield {
+            "title": f"{_sentence(rng, 4).capitalize()} #{i}",
+            "description": _sentence(rng, 30),
+            "priority": rng.choice(PRIORITIES),
+            "status": status,
+            "category": rng.choice(CATEGORIES),
+            "assigned_to": rng.choice(ASSIGNEES),
+            "created_at": created,
+            "updated_at": resolved or created,
+            "resolved_at": resolved,
+        }
+
+
+def _service_rows(rng: random.Random, count: int, now: datetime, http_target: str,
+                  tcp_target: str | None, dead_target: str | None, dead_rate: float):
+    for i in range(count):
+        if dead_target and rng.random() < dead_rate:
+            check_type, url = "tcp", dead_target
+        elif tcp_target and i % 4 == 3:
+            check_type, url = "tcp", tcp_target
+        else:
+            check_type, url = "http", f"{http_target}/svc/{i}"
+        yield {
+            "name": f"bench-service-{i:05d}",
+            "url": url,
+            "check_type": check_type,
+            "expected_status": 200,
+            "status": "unknown",
+            "response_time_ms": None,
+            "last_checked": None,
+            "created_at": now,
+            "is_active": True,
+        }
+
+
+def _article_rows(rng: random.Random, count: int, now: datetime):
+    for i in range(count):
+        yield {
+            "title": f"{_sentence(rng, 5).capitalize()} guide #{i}",
+            "content": "\n".join(_sentence(rng, 15) for _ in range(20)),
+            "category": rng.choice(CATEGORIES),
+            "tags": ",".join(rng.sample(WORDS, 4)),
+            "created_at": now,
+            "updated_at": now,
+        }
+
+
+async def _insert_all(session, table, rows, batch_size: int = BATCH_SIZE) -> int:
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            await session.execute(insert(table).values(batch))
+            await session.commit()
+            count += len(batch)
+            batch = []
+    if batch:
+        await session.execute(insert(table).values(batch))
+        await session.commit()
+        count += len(batch)
+    return count
+
+
+async def generate_dataset(
+    logs: int = 0,
+    tickets: int = 0,
+    services: int = 0,
+    articles: int = 0,
+    http_target: str = "http://127.0.0.1:8081",
+    tcp_target: str | None = None,
+    dead_target: str | None = None,
+    dead_rate: float = 0.0,
+    seed: int = 42,
+) -> dict:
+    """Insert a synthetic dataset and return per-table row counts and timings."""
+    from app.database import async_session, init_db
+    from app.models import KnowledgeArticle, LogEntry, MonitoredService, Ticket
+
+    await init_db()
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    plan = [
+        ("services", MonitoredService, _service_rows(rng, services, now, http_target, tcp_target, dead_target, dead_rate)),
+        ("tickets", Ticket, _ticket_rows(rng, tickets, now)),
+        ("logs", LogEntry, _log_rows(rng, logs, now)),
+        ("articles", KnowledgeArticle, _article_rows(rng, articles, now)),
+    ]
+    summary = {}
+    async with async_session() as session:
+        for name, model, rows in plan:
+            start = time.perf_counter()
+            count = await _insert_all(session, model.__table__, rows)
+            summary[name] = {"rows": count, "seconds": round(time.perf_counter() - start, 3)}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", type=int, default=1_000_000)
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--services", type=int, default=10_000)
+    parser.add_argument("--articles", type=int, default=1_000)
+    parser.add_argument("--http-target", default="http://127.0.0.1:8081")
+    parser.add_argument("--tcp-target", default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    summary = asyncio.run(generate_dataset(
+        logs=args.logs, tickets=args.tickets, services=args.services, articles=args.articles,
+        http_target=args.http_target, tcp_target=args.tcp_target, seed=args.seed,
+    ))
+    for name, info in summary.items():
+        print(f"Inserted {info['rows']} {name} in {info['seconds']}s.")
+
+
+if __name__ == "__main__":
+    main()
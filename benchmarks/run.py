@@ -0,0 +1,207 @@
+"""Load benchmark scenarios for the API routers and the health-check cycle.
+
+Builds a synthetic dataset in a scratch database, starts local stand-in targets
+and measures request latency percentiles and `run_health_checks` cycle duration.
+Results are written as JSON so later runs can be compared against a baseline.
+
+Usage:
+    python -m benchmarks.run --logs 100000 --tickets 10000 --services 500 \\
+        --latency-ms 20 --failure-rate 0.05 --output benchmarks/results/latest.json
+    python -m benchmarks.run --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+API_ENDPOINTS = [
+    "/api/services",
+    "/api/services/stats",
+    "/api/tickets",
+    "/api/tickets?status=open&priority=high",
+    "/api/tickets/stats",
+    "/api/logs?limit=50",
+    "/api/logs?limit=1000",
+    "/api/logs/sources",
+    "/api/knowledge",
+    "/api/knowledge?search=vpn",
+]
+
+DEFAULT_DB = "bench.db"
+
+
+def percentile(sorted_samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, int(round(pct / 100 * len(sorted_samples) + 0.5)) - 1))
+    return sorted_samples[rank]
+
+
+def summarize(samples_ms: list[float]) -> dict:
+    ordered = sorted(samples_ms)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p90_ms": round(percentile(ordered, 90), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+async def bench_api(requests: int, concurrency: int, warmup: int = 3) -> dict:
+    from httpx import ASGITransport, AsyncClient
+    from app.main import app
+
+    results = {}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for endpoint in API_ENDPOINTS:
+            for _ in range(warmup):
+                await client.get(endpoint)
+
+            samples: list[float] = []
+            errors = 0
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one():
+                nonlocal errors
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.get(endpoint)
+                    samples.append((time.perf_counter() - start) * 1000)
+                    if response.status_code >= 400:
+                        errors += 1
+
+            await asyncio.gather(*(one() for _ in range(requests)))
+            results[endpoint] = {**summarize(samples), "errors": errors}
+            print(f"  {endpoint:45s} p50={results[endpoint]['p50_ms']:8.2f}ms "
+                  f"p95={results[endpoint]['p95_ms']:8.2f}ms")
+    return results
+
+
+async def bench_health_cycle(cycles: int) -> dict:
+    from app.services.health_checker import run_health_checks
+
+    durations = []
+    for i in range(cycles):
+        start = time.perf_counter()
+        await run_health_checks()
+        durations.append((time.perf_counter() - start) * 1000)
+        print(f"  cycle {i + 1}: {durations[-1]:.0f}ms")
+    return summarize(durations)
+
+
+async def run_benchmarks(args) -> dict:
+    from benchmarks.dataset import generate_dataset
+    from benchmarks.targets import StandInHTTPServer, StandInTCPServer, closed_port
+
+    http = await StandInHTTPServer(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, failure_rate=args.failure_rate, seed=args.seed,
+    ).start()
+    tcp = await StandInTCPServer().start()
+    try:
+        print("Generating dataset...")
+        dataset = await generate_dataset(
+            logs=args.logs, tickets=args.tickets, services=args.services, articles=args.articles,
+            http_target=http.url, tcp_target=tcp.address,
+            dead_target=f"127.0.0.1:{closed_port()}", dead_rate=args.failure_rate, seed=args.seed,
+        )
+        results: dict = {"dataset": dataset}
+        if "api" in args.scenarios:
+            print("API latency:")
+            results["api"] = await bench_api(args.requests, args.concurrency)
+        if "health" in args.scenarios:
+            print("Health-check cycle:")
+            results["health_cycle"] = await bench_health_cycle(args.cycles)
+            results["health_cycle"]["http_target_requests"] = http.requests
+        return results
+    finally:
+        await http.stop()
+        await tcp.stop()
+
+
+def _p95_metrics(report: dict) -> dict[str, float]:
+    metrics = {f"api {k}": v["p95_ms"] for k, v in report.get("results", {}).get("api", {}).items()}
+    cycle = report.get("results", {}).get("health_cycle")
+    if cycle:
+        metrics["health_cycle"] = cycle["p95_ms"]
+    return metrics
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> bool:
+    """Print p95 deltas against a baseline. Returns False if anything regressed."""
+    ok = True
+    base = _p95_metrics(baseline)
+    for name, value in _p95_metrics(current).items():
+        if name not in base or base[name] == 0:
+            continue
+        delta = (value - base[name]) / base[name] * 100
+        flag = ""
+        if delta > tolerance:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"  {name:50s} {base[name]:9.2f} -> {value:9.2f}ms ({delta:+6.1f}%){flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", type=int, default=100_000)
+    parser.add_argument("--tickets", type=int, default=10_000)
+    parser.add_argument("--services", type=int, default=200)
+    parser.add_argument("--articles", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per API endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--cycles", type=int, default=3, help="Health-check cycles to time")
+    parser.add_argument("--scenarios", nargs="+", default=["api", "health"], choices=["api", "health"])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None, help=f"Defaults to a fresh SQLite file ({DEFAULT_DB})")
+    parser.add_argument("--output", default=None, help="Defaults to benchmarks/results/<timestamp>.json")
+    parser.add_argument("--compare", default=None, help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=20.0, help="Allowed p95 regression in percent")
+    args = parser.parse_args()
+
+    # Must happen before anything imports app.config.
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        Path(DEFAULT_DB).unlink(missing_ok=True)
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///./{DEFAULT_DB}"
+
+    results = asyncio.run(run_benchmarks(args))
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "results": results,
+    }
+
+    output = Path(args.output or f"benchmarks/results/{datetime.utcnow():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        print(f"Comparison against {args.compare}:")
+        baseline = json.loads(Path(args.compare).read_text())
+        if not compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
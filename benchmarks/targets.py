@@ -0,0 +1,181 @@
+"""Local stand-in HTTP, TCP and SMTP targets with controllable latency and failure rates."""
+
+import asyncio
+import random
+import socket
+
+
+class StandInHTTPServer:
+    """Minimal HTTP/1.1 server that answers every request after a configurable delay.
+
+    A `failure_rate` fraction of requests either get a 500 or have the connection
+    dropped (split evenly), which the health checker sees as degraded or offline.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, failure_rate: float = 0.0, seed: int | None = None,
+                 body: bytes = b"ok", ssl_context=None):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.body = body
+        self.ssl_context = ssl_context
+        self.requests = 0
+        # Most recent request bodies (e.g. webhook payloads), newest last
+        self.bodies: list[bytes] = []
+        self._random = random.Random(seed)
+        self._server: asyncio.base_events.Server | None = None
+
+    @property
+    def url(self) -> str:
+        scheme = "https" if self.ssl_context else "http"
+        return f"{scheme}://{self.host}:{self.port}"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                if not request:
+                    break
+                self.requests += 1
+                length = _content_length(request)
+                if length:
+                    self.bodies = self.bodies[-99:] + [await reader.readexactly(length)]
+                delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+                if delay > 0:
+                    await asyncio.sleep(delay / 1000)
+
+                if self._random.random() < self.failure_rate:
+                    if self._random.random() < 0.5:
+                        break  # drop the connection mid-request
+                    status, body = "500 Internal Server Error", b"error"
+                else:
+                    status, body = "200 OK", self.body
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Length: {len(body)}\r\n"
+                    f"Content-Type: text/plain\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, backlog=4096, ssl=self.ssl_context,
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+class StandInTCPServer:
+    """TCP listener that accepts connections and closes them after an optional delay.
+
+    Connect latency is decided by the kernel, so failures are modelled by pointing
+    a fraction of services at `closed_port()` instead.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, hold_ms: float = 0.0):
+        self.host = host
+        self.port = port
+        self.hold_ms = hold_ms
+        self.connections = 0
+        self._server: asyncio.base_events.Server | None = None
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        if self.hold_ms:
+            await asyncio.sleep(self.hold_ms / 1000)
+        writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=4096)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+class StandInSMTPServer:
+    """Just enough SMTP to accept mail from smtplib and keep it in `messages`."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        # (mail_from, [rcpt_to, ...], raw message bytes)
+        self.messages: list[tuple[str, list[str], bytes]] = []
+        self._server: asyncio.base_events.Server | None = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def reply(line: str):
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        mail_from, rcpt_to = "", []
+        try:
+            await reply("220 stand-in ESMTP")
+            while line := await reader.readline():
+                command = line.decode().strip()
+                verb = command[:4].upper()
+                if verb in ("HELO", "EHLO"):
+                    await reply("250 stand-in")
+                elif verb == "MAIL":
+                    mail_from, rcpt_to = command.split(":", 1)[1].strip(" <>"), []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    rcpt_to.append(command.split(":", 1)[1].strip(" <>"))
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = await reader.readuntil(b"\r\n.\r\n")
+                    self.messages.append((mail_from, rcpt_to, data[:-5]))
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("250 OK")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+def _content_length(head: bytes) -> int:
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            return int(value.strip())
+    return 0
+
+
+def closed_port(host: str = "127.0.0.1") -> int:
+    """Return a local port that currently has no listener (connections are refused)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
@@ -0,0 +1,78 @@
+"""Command-line bulk import/export for tickets, services and knowledge articles.
+
+Usage:
+    python bulk.py import tickets tickets.csv
+    python bulk.py export services --format csv > services.csv
+    python bulk.py import tickets tickets.ndjson --tenant acme
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.database import init_db
+from app.services.bulk_io import BATCH_SIZE, ENTITIES, FORMATS, export_records, import_records
+from app.tenancy import DEFAULT_TENANT, TENANT_PATTERN
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def _read_file(path: str):
+    with open(path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, CHUNK_SIZE):
+            yield chunk
+
+
+def _tenant(value: str) -> str:
+    tenant = value.strip().lower()
+    if not TENANT_PATTERN.match(tenant):
+        raise argparse.ArgumentTypeError(f"invalid tenant name: {value!r}")
+    return tenant
+
+
+async def run_import(entity: str, path: str, fmt: str | None, batch_size: int, tenant: str):
+    await init_db()
+    if fmt is None:
+        fmt = "csv" if path.endswith(".csv") else "ndjson"
+    summary = await import_records(entity, _read_file(path), fmt, tenant=tenant, batch_size=batch_size)
+    print(f"Imported {summary['inserted']} {entity} into tenant {tenant} ({summary['error_count']} rejected).")
+    for error in summary["errors"]:
+        print(f"  line {error['line']}: {error['error']}", file=sys.stderr)
+
+
+async def run_export(entity: str, fmt: str, output: str | None, tenant: str):
+    out = open(output, "w", newline="") if output else sys.stdout
+    try:
+        async for chunk in export_records(entity, tenant=tenant, fmt=fmt):
+            out.write(chunk)
+    finally:
+        if output:
+            out.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="Import records from a CSV or NDJSON file")
+    imp.add_argument("entity", choices=sorted(ENTITIES))
+    imp.add_argument("path")
+    imp.add_argument("--format", choices=FORMATS, default=None, help="Defaults to the file extension")
+    imp.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    imp.add_argument("--tenant", type=_tenant, default=DEFAULT_TENANT)
+
+    exp = sub.add_parser("export", help="Export records as CSV or NDJSON")
+    exp.add_argument("entity", choices=sorted(ENTITIES))
+    exp.add_argument("--format", choices=FORMATS, default="ndjson")
+    exp.add_argument("-o", "--output", default=None, help="Defaults to stdout")
+    exp.add_argument("--tenant", type=_tenant, default=DEFAULT_TENANT)
+
+    args = parser.parse_args()
+    if args.command == "import":
+        asyncio.run(run_import(args.entity, args.path, args.format, args.batch_size, args.tenant))
+    else:
+        asyncio.run(run_export(args.entity, args.format, args.output, args.tenant))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Idempotent schema operations for the migrations.
+
+Databases created before migrations existed got whatever create_all built for
+the release they first ran, so a revision may find its change already made.
+Each helper checks the live schema first, which lets `alembic upgrade head`
+bring any of those databases up to date.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+def dialect() -> str:
+    return op.get_bind().dialect.name
+
+
+def has_table(table: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def has_column(table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def has_index(table: str, index: str) -> bool:
+    return index in {i["name"] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def create_table(table: str, *columns, **kwargs):
+    if not has_table(table):
+        op.create_table(table, *columns, **kwargs)
+
+
+def add_columns(table: str, *columns: sa.Column):
+    missing = [c for c in columns if not has_column(table, c.name)]
+    if missing:
+        with op.batch_alter_table(table) as batch:
+            for column in missing:
+                batch.add_column(column)
+
+
+def create_index(index: str, table: str, columns: list, **kwargs):
+    if not has_index(table, index):
+        op.create_index(index, table, columns, **kwargs)
+
+
+def drop_index(index: str, table: str):
+    if has_index(table, index):
+        op.drop_index(index, table_name=table)
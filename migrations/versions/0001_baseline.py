@@ -0,0 +1,68 @@
+"""Baseline: the tables of the first release
+
+Revision ID: 0001
+Revises:
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    helpers.create_table(
+        "monitored_services",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("url", sa.String(500), nullable=False),
+        sa.Column("check_type", sa.String(20), nullable=False),
+        sa.Column("expected_status", sa.Integer, nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("response_time_ms", sa.Float, nullable=True),
+        sa.Column("last_checked", sa.DateTime, nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("is_active", sa.Boolean, nullable=False),
+    )
+    helpers.create_table(
+        "tickets",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("title", sa.String(200), nullable=False),
+        sa.Column("description", sa.Text, nullable=True),
+        sa.Column("priority", sa.String(20), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("category", sa.String(50), nullable=True),
+        sa.Column("assigned_to", sa.String(100), nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("updated_at", sa.DateTime, nullable=False),
+        sa.Column("resolved_at", sa.DateTime, nullable=True),
+    )
+    helpers.create_table(
+        "log_entries",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("timestamp", sa.DateTime, nullable=False),
+        sa.Column("level", sa.String(20), nullable=False),
+        sa.Column("source", sa.String(100), nullable=False),
+        sa.Column("message", sa.Text, nullable=False),
+        sa.Column("metadata_json", sa.Text, nullable=True),
+    )
+    helpers.create_table(
+        "knowledge_articles",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("title", sa.String(200), nullable=False),
+        sa.Column("content", sa.Text, nullable=False),
+        sa.Column("category", sa.String(50), nullable=True),
+        sa.Column("tags", sa.String(500), nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("updated_at", sa.DateTime, nullable=False),
+    )
+
+
+def downgrade():
+    for table in ("knowledge_articles", "log_entries", "tickets", "monitored_services"):
+        op.drop_table(table)
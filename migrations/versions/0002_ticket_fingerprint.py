@@ -0,0 +1,26 @@
+"""Incident tickets are found again by fingerprint (user-037)
+
+Revision ID: 0002
+Revises: 0001
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    helpers.add_columns("tickets", sa.Column("fingerprint", sa.String(100), nullable=True))
+    helpers.create_index("ix_tickets_fingerprint", "tickets", ["fingerprint"])
+
+
+def downgrade():
+    op.drop_index("ix_tickets_fingerprint", table_name="tickets")
+    with op.batch_alter_table("tickets") as batch:
+        batch.drop_column("fingerprint")
@@ -0,0 +1,40 @@
+"""Per-service HTTP check configuration and TLS expiry (user-039)
+
+Revision ID: 0003
+Revises: 0002
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    "http_method", "http_headers", "degraded_after_ms", "body_contains", "body_regex",
+    "max_body_bytes", "check_detail", "tls_expires_at",
+)
+
+
+def upgrade():
+    helpers.add_columns(
+        "monitored_services",
+        sa.Column("http_method", sa.String(10), server_default="GET", nullable=False),
+        sa.Column("http_headers", sa.JSON, nullable=True),
+        sa.Column("degraded_after_ms", sa.Float, nullable=True),
+        sa.Column("body_contains", sa.String(500), nullable=True),
+        sa.Column("body_regex", sa.String(500), nullable=True),
+        sa.Column("max_body_bytes", sa.Integer, nullable=True),
+        sa.Column("check_detail", sa.String(300), nullable=True),
+        sa.Column("tls_expires_at", sa.DateTime, nullable=True),
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("monitored_services") as batch:
+        for column in COLUMNS:
+            batch.drop_column(column)
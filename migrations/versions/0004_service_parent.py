@@ -0,0 +1,30 @@
+"""Service dependencies (user-040)
+
+Revision ID: 0004
+Revises: 0003
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    helpers.add_columns("monitored_services", sa.Column(
+        "parent_id", sa.Integer,
+        sa.ForeignKey("monitored_services.id", name="fk_monitored_services_parent_id", ondelete="SET NULL"),
+        nullable=True,
+    ))
+    helpers.create_index("ix_monitored_services_parent_id", "monitored_services", ["parent_id"])
+
+
+def downgrade():
+    op.drop_index("ix_monitored_services_parent_id", table_name="monitored_services")
+    with op.batch_alter_table("monitored_services") as batch:
+        batch.drop_column("parent_id")
@@ -0,0 +1,50 @@
+"""SLA status intervals and monthly summaries (user-041)
+
+Revision ID: 0005
+Revises: 0004
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    helpers.create_table(
+        "service_status_intervals",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("service_id", sa.Integer, nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("started_at", sa.DateTime, nullable=False),
+        sa.Column("ended_at", sa.DateTime, nullable=True),
+        sa.Column("failure", sa.Boolean, nullable=False),
+    )
+    helpers.create_index("ix_status_intervals_service_start", "service_status_intervals",
+                         ["service_id", "started_at"])
+    helpers.create_index("ix_service_status_intervals_started_at", "service_status_intervals", ["started_at"])
+    helpers.create_index("ix_service_status_intervals_ended_at", "service_status_intervals", ["ended_at"])
+    helpers.create_table(
+        "sla_monthly_summaries",
+        sa.Column("service_id", sa.Integer, primary_key=True),
+        sa.Column("month", sa.DateTime, primary_key=True),
+        sa.Column("observed_seconds", sa.Float, nullable=False),
+        sa.Column("up_seconds", sa.Float, nullable=False),
+        sa.Column("down_seconds", sa.Float, nullable=False),
+        sa.Column("failures", sa.Integer, nullable=False),
+    )
+    helpers.create_table(
+        "sla_months",
+        sa.Column("month", sa.DateTime, primary_key=True),
+        sa.Column("computed_at", sa.DateTime, nullable=False),
+    )
+
+
+def downgrade():
+    for table in ("sla_months", "sla_monthly_summaries", "service_status_intervals"):
+        op.drop_table(table)
@@ -0,0 +1,33 @@
+"""Service groups and tags (user-043)
+
+Revision ID: 0006
+Revises: 0005
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    helpers.add_columns(
+        "monitored_services",
+        sa.Column("group_name", sa.String(100), nullable=True),
+        sa.Column("tags", sa.String(500), nullable=True),
+    )
+    # Replaced by the tenant-leading index in 0011
+    if not helpers.has_column("monitored_services", "tenant"):
+        helpers.create_index("ix_monitored_services_group_name", "monitored_services", ["group_name"])
+
+
+def downgrade():
+    helpers.drop_index("ix_monitored_services_group_name", "monitored_services")
+    with op.batch_alter_table("monitored_services") as batch:
+        batch.drop_column("tags")
+        batch.drop_column("group_name")
@@ -0,0 +1,40 @@
+"""Remote probe agents (user-044)
+
+Revision ID: 0007
+Revises: 0006
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    helpers.create_table(
+        "probe_agents",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(100), nullable=False, unique=True),
+        sa.Column("token_hash", sa.String(64), nullable=False, unique=True),
+        sa.Column("is_active", sa.Boolean, nullable=False),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("last_seen_at", sa.DateTime, nullable=True),
+    )
+    helpers.add_columns("monitored_services", sa.Column(
+        "agent_id", sa.Integer,
+        sa.ForeignKey("probe_agents.id", name="fk_monitored_services_agent_id", ondelete="SET NULL"),
+        nullable=True,
+    ))
+    helpers.create_index("ix_monitored_services_agent_id", "monitored_services", ["agent_id"])
+
+
+def downgrade():
+    op.drop_index("ix_monitored_services_agent_id", table_name="monitored_services")
+    with op.batch_alter_table("monitored_services") as batch:
+        batch.drop_column("agent_id")
+    op.drop_table("probe_agents")
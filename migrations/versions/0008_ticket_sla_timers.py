@@ -0,0 +1,42 @@
+"""Ticket response and resolution timers (user-045)
+
+Revision ID: 0008
+Revises: 0007
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    "responded_at", "response_due_at", "resolution_due_at", "response_breached",
+    "resolution_breached", "next_due_at", "escalation_level",
+)
+
+
+def upgrade():
+    # Existing tickets get no deadlines: timers are only set on tickets opened from now on
+    helpers.add_columns(
+        "tickets",
+        sa.Column("responded_at", sa.DateTime, nullable=True),
+        sa.Column("response_due_at", sa.DateTime, nullable=True),
+        sa.Column("resolution_due_at", sa.DateTime, nullable=True),
+        sa.Column("response_breached", sa.Boolean, server_default=sa.false(), nullable=False),
+        sa.Column("resolution_breached", sa.Boolean, server_default=sa.false(), nullable=False),
+        sa.Column("next_due_at", sa.DateTime, nullable=True),
+        sa.Column("escalation_level", sa.Integer, server_default="0", nullable=False),
+    )
+    helpers.create_index("ix_tickets_next_due_at", "tickets", ["next_due_at"])
+
+
+def downgrade():
+    op.drop_index("ix_tickets_next_due_at", table_name="tickets")
+    with op.batch_alter_table("tickets") as batch:
+        for column in COLUMNS:
+            batch.drop_column(column)
@@ -0,0 +1,44 @@
+"""Ticket history (user-046)
+
+Revision ID: 0009
+Revises: 0008
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    helpers.create_table(
+        "ticket_events",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("ticket_id", sa.Integer, nullable=False),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("actor", sa.String(100), nullable=True),
+        sa.Column("changes", sa.JSON, nullable=False),
+    )
+    helpers.create_index("ix_ticket_events_ticket_id_id", "ticket_events", ["ticket_id", "id"])
+    # Replaced by the tenant-leading index in 0011
+    if not helpers.has_column("ticket_events", "tenant"):
+        helpers.create_index("ix_ticket_events_actor_id", "ticket_events", ["actor", "id"])
+
+    if helpers.dialect() == "sqlite":
+        # Without AUTOINCREMENT SQLite reuses the highest deleted id, and a new
+        # ticket would inherit the deleted one's history
+        sql = op.get_bind().execute(sa.text("SELECT sql FROM sqlite_master WHERE name = 'tickets'")).scalar()
+        if "AUTOINCREMENT" not in sql.upper():
+            with op.batch_alter_table("tickets", recreate="always",
+                                      table_kwargs={"sqlite_autoincrement": True}):
+                pass
+
+
+def downgrade():
+    op.drop_table("ticket_events")
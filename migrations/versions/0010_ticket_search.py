@@ -0,0 +1,57 @@
+"""Full-text ticket search (user-048)
+
+On SQLite an FTS5 table kept in sync by triggers; on PostgreSQL a GIN index
+over the same tsvector expression the search queries use.
+
+Revision ID: 0010
+Revises: 0009
+"""
+
+from alembic import op
+
+from migrations import helpers
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+TICKET_TSVECTOR = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+TICKETS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE tickets_fts USING fts5("
+    "title, description, content='tickets', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER tickets_fts_insert AFTER INSERT ON tickets BEGIN "
+    "INSERT INTO tickets_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER tickets_fts_delete AFTER DELETE ON tickets BEGIN "
+    "INSERT INTO tickets_fts(tickets_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER tickets_fts_update AFTER UPDATE OF title, description ON tickets BEGIN "
+    "INSERT INTO tickets_fts(tickets_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tickets_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+)
+
+
+def upgrade():
+    if helpers.dialect() == "sqlite":
+        if not helpers.has_table("tickets_fts"):
+            for statement in TICKETS_FTS_DDL:
+                op.execute(statement)
+            # Index the tickets that already exist
+            op.execute("INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')")
+    elif helpers.dialect() == "postgresql":
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_tickets_fulltext ON tickets USING gin ({TICKET_TSVECTOR})")
+    # Replaced by the tenant-leading index in 0011
+    if not helpers.has_column("tickets", "tenant"):
+        helpers.create_index("ix_tickets_assigned_to", "tickets", ["assigned_to"])
+
+
+def downgrade():
+    helpers.drop_index("ix_tickets_assigned_to", "tickets")
+    if helpers.dialect() == "sqlite":
+        for trigger in ("insert", "delete", "update"):
+            op.execute(f"DROP TRIGGER IF EXISTS tickets_fts_{trigger}")
+        op.execute("DROP TABLE IF EXISTS tickets_fts")
+    elif helpers.dialect() == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_tickets_fulltext")
@@ -0,0 +1,59 @@
+"""Tenant column on every tenant-scoped table (user-049)
+
+Existing rows belong to the default tenant.
+
+Revision ID: 0011
+Revises: 0010
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+TABLES = ("monitored_services", "tickets", "ticket_events", "log_entries", "knowledge_articles")
+
+# Single-column indexes superseded by the tenant-leading ones below
+REPLACED = (
+    ("ix_monitored_services_group_name", "monitored_services"),
+    ("ix_tickets_assigned_to", "tickets"),
+    ("ix_ticket_events_actor_id", "ticket_events"),
+)
+
+INDEXES = (
+    ("ix_monitored_services_tenant_name", "monitored_services", ["tenant", "name"]),
+    ("ix_monitored_services_tenant_group", "monitored_services", ["tenant", "group_name"]),
+    ("ix_tickets_tenant_created_at", "tickets", ["tenant", "created_at"]),
+    ("ix_tickets_tenant_status", "tickets", ["tenant", "status"]),
+    ("ix_tickets_tenant_assigned_to", "tickets", ["tenant", "assigned_to"]),
+    ("ix_ticket_events_tenant_id", "ticket_events", ["tenant", "id"]),
+    ("ix_ticket_events_tenant_actor_id", "ticket_events", ["tenant", "actor", "id"]),
+    ("ix_log_entries_tenant_timestamp", "log_entries", ["tenant", "timestamp"]),
+    ("ix_log_entries_tenant_source", "log_entries", ["tenant", "source"]),
+    ("ix_knowledge_articles_tenant_updated_at", "knowledge_articles", ["tenant", "updated_at"]),
+)
+
+
+def upgrade():
+    for table in TABLES:
+        helpers.add_columns(table, sa.Column("tenant", sa.String(50), nullable=False, server_default="default"))
+    for index, table in REPLACED:
+        helpers.drop_index(index, table)
+    for index, table, columns in INDEXES:
+        helpers.create_index(index, table, columns)
+
+
+def downgrade():
+    for index, table, _ in INDEXES:
+        op.drop_index(index, table_name=table)
+    op.create_index("ix_monitored_services_group_name", "monitored_services", ["group_name"])
+    op.create_index("ix_tickets_assigned_to", "tickets", ["assigned_to"])
+    op.create_index("ix_ticket_events_actor_id", "ticket_events", ["actor", "id"])
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("tenant")
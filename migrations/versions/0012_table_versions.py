@@ -0,0 +1,65 @@
+"""Trigger-maintained table versions for ETags (user-033)
+
+Revision ID: 0012
+Revises: 0011
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = ("monitored_services", "tickets", "knowledge_articles", "log_entries")
+
+BUMP = (
+    "INSERT INTO table_versions (name, version) VALUES ({name}, 1) "
+    "ON CONFLICT (name) DO UPDATE SET version = table_versions.version + 1"
+)
+
+BUMP_FUNCTION_DDL = f"""
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    {BUMP.format(name="TG_TABLE_NAME")};
+    RETURN NULL;
+END $$
+"""
+
+
+def upgrade():
+    helpers.create_table(
+        "table_versions",
+        sa.Column("name", sa.String(100), primary_key=True),
+        sa.Column("version", sa.Integer, nullable=False),
+    )
+    if helpers.dialect() == "postgresql":
+        op.execute(BUMP_FUNCTION_DDL)
+        for table in TRACKED_TABLES:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_version ON {table}")
+            op.execute(
+                f"CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+                f"ON {table} FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()"
+            )
+    elif helpers.dialect() == "sqlite":
+        for table in TRACKED_TABLES:
+            for statement in ("INSERT", "UPDATE", "DELETE"):
+                op.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {table}_version_{statement.lower()} AFTER {statement} "
+                    f"ON {table} BEGIN {BUMP.format(name=repr(table))}; END"
+                )
+
+
+def downgrade():
+    for table in TRACKED_TABLES:
+        if helpers.dialect() == "postgresql":
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_version ON {table}")
+        else:
+            for statement in ("insert", "update", "delete"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_version_{statement}")
+    if helpers.dialect() == "postgresql":
+        op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    op.drop_table("table_versions")
@@ -0,0 +1,37 @@
+"""One status interval per service and start time (user-041)
+
+Concurrent month-boundary rollovers could insert the same interval twice.
+Duplicates are removed, keeping the first copy, before the index is made unique.
+
+Revision ID: 0013
+Revises: 0012
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+INDEX = "ix_status_intervals_service_start"
+
+
+def upgrade():
+    indexes = {i["name"]: i for i in sa.inspect(op.get_bind()).get_indexes("service_status_intervals")}
+    if indexes.get(INDEX, {}).get("unique"):
+        return
+    helpers.drop_index(INDEX, "service_status_intervals")
+    op.execute(
+        "DELETE FROM service_status_intervals WHERE id NOT IN "
+        "(SELECT MIN(id) FROM service_status_intervals GROUP BY service_id, started_at)"
+    )
+    op.create_index(INDEX, "service_status_intervals", ["service_id", "started_at"], unique=True)
+
+
+def downgrade():
+    op.drop_index(INDEX, table_name="service_status_intervals")
+    op.create_index(INDEX, "service_status_intervals", ["service_id", "started_at"])
@@ -0,0 +1,126 @@
+"""Remote probe agent: checks the services assigned to it and reports to the dashboard.
+
+Run one inside each network segment the dashboard can't reach, or several to
+spread the probe load. Register the agent first (POST /api/agents with the
+admin token) and assign services to it with their `agent_id`.
+
+Every interval the agent fetches its assignments and checks them concurrently
+with the dashboard's own check functions. Results are pushed back in
+gzip-compressed batches as they finish. The agent needs no database.
+
+Usage:
+    AGENT_TOKEN=... python probe_agent.py --server http://dashboard:8000
+    python probe_agent.py --once    # a single round, e.g. from cron
+"""
+
+import argparse
+import asyncio
+import gzip
+import time
+from datetime import datetime
+
+import httpx
+import orjson
+
+from app.config import settings
+from app.models.service import MonitoredService
+from app.services.health_checker import check_each, close_http_client
+
+
+class AgentWorker:
+    def __init__(self, server_url: str, token: str, batch_size: int = 500, transport=None):
+        self.server_url = server_url.rstrip("/")
+        self.token = token
+        self.batch_size = batch_size
+        # Lets tests talk to the app in-process
+        self._transport = transport
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.server_url, transport=self._transport, timeout=30.0,
+            headers={"Authorization": f"Bearer {self.token}"},
+        )
+
+    async def assignments(self, client: httpx.AsyncClient) -> list[MonitoredService]:
+        response = await client.get("/api/agents/me/assignments")
+        response.raise_for_status()
+        # Transient instances, never added to a session
+        return [MonitoredService(**row) for row in response.json()]
+
+    async def push(self, client: httpx.AsyncClient, results: list[dict]) -> dict:
+        response = await client.post(
+            "/api/agents/me/results",
+            content=gzip.compress(orjson.dumps({"results": results}), compresslevel=5),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def run_once(self, client: httpx.AsyncClient) -> dict:
+        """Check every assigned service once; returns what the dashboard accepted."""
+        services = await self.assignments(client)
+        summary = {"checked": 0, "accepted": 0, "stale": 0, "rejected": 0}
+        batch: list[dict] = []
+
+        async def flush():
+            reply = await self.push(client, batch)
+            summary["accepted"] += reply["accepted"]
+            summary["stale"] += reply["stale"]
+            summary["rejected"] += len(reply["rejected"])
+            batch.clear()
+
+        async for service, result in check_each(services):
+            summary["checked"] += 1
+            batch.append({
+                "service_id": service.id,
+                "status": result["status"],
+                "response_time_ms": result["response_time_ms"],
+                "detail": result.get("detail"),
+                "tls_expires_at": result.get("tls_expires_at"),
+                "checked_at": datetime.utcnow(),
+            })
+            if len(batch) >= self.batch_size:
+                await flush()
+        if batch:
+            await flush()
+        return summary
+
+    async def run_forever(self, interval: float):
+        async with self.client() as client:
+            while True:
+                started = time.monotonic()
+                try:
+                    summary = await self.run_once(client)
+                    print(f"Checked {summary['checked']} services, {summary['accepted']} results accepted")
+                except Exception as e:
+                    print(f"Probe agent round failed: {e}")
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+async def run(args):
+    worker = AgentWorker(args.server, args.token, args.batch_size)
+    try:
+        if args.once:
+            async with worker.client() as client:
+                print(await worker.run_once(client))
+        else:
+            await worker.run_forever(args.interval)
+    finally:
+        await close_http_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default=settings.AGENT_SERVER_URL)
+    parser.add_argument("--token", default=settings.AGENT_TOKEN, help="Defaults to AGENT_TOKEN")
+    parser.add_argument("--interval", type=float, default=settings.AGENT_INTERVAL)
+    parser.add_argument("--batch-size", type=int, default=settings.AGENT_BATCH_SIZE)
+    parser.add_argument("--once", action="store_true", help="Run a single round and exit")
+    args = parser.parse_args()
+    if not args.token:
+        parser.error("an agent token is required (--token or AGENT_TOKEN)")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
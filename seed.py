@@ -1,6 +1,7 @@
 """Seed the database with sample data for demonstration."""
 
 import asyncio
+import sys
 from datetime import datetime, timedelta
 import random
 
@@ -213,9 +214,10 @@ Always test restore procedures regularly. A backup is only as good as your abili
 ]
 
 
-async def seed_database():
+async def seed_database(create_schema: bool = True):
     """Populate the database with sample data."""
-    await init_db()
+    if create_schema:
+        await init_db()
 
     async with async_session() as session:
         # Check if data already exists
@@ -263,4 +265,5 @@ async def seed_database():
 
 
 if __name__ == "__main__":
-    asyncio.run(seed_database())
+    # --schema-only creates the tables without demo data (for STARTUP_MODE=fast deployments)
+    asyncio.run(init_db() if "--schema-only" in sys.argv else seed_database())
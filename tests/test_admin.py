@@ -0,0 +1,76 @@
+"""Tests for the loop watchdog and admin profiling endpoints."""
+
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from app.config import settings
+from app.main import app
+from app.services.watchdog import LoopWatchdog
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "test-admin-token")
+    return "test-admin-token"
+
+
+def blocking_callback():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_watchdog_captures_blocking_stack():
+    reported = []
+
+    async def on_stall(stall):
+        reported.append(stall)
+
+    watchdog = LoopWatchdog(threshold_ms=100, interval=0.02, on_stall=on_stall)
+    task = asyncio.create_task(watchdog.run())
+    await asyncio.sleep(0.1)
+    blocking_callback()
+    await asyncio.sleep(0.1)
+    task.cancel()
+
+    assert len(reported) == 1
+    assert reported[0]["blocked_ms"] >= 200
+    assert "blocking_callback" in reported[0]["stack"]
+
+
+@pytest.mark.asyncio
+async def test_admin_endpoints_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+    response = await client.post("/api/admin/profile?seconds=0.1")
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_admin_endpoints_reject_bad_token(client, admin_token):
+    response = await client.post("/api/admin/profile?seconds=0.1", headers={"X-Admin-Token": "wrong"})
+    assert response.status_code == 401
+    response = await client.post("/api/admin/profile?seconds=0.1", headers={"X-Admin-Token": "tökén".encode()})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_profile_returns_collapsed_stacks(client, admin_token):
+    response = await client.post(
+        "/api/admin/profile?seconds=0.2&interval_ms=5",
+        headers={"X-Admin-Token": admin_token},
+    )
+    assert response.status_code == 200
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    first = response.text.splitlines()[0]
+    stack, count = first.rsplit(" ", 1)
+    assert ";" in stack
+    assert int(count) > 0
@@ -0,0 +1,134 @@
+"""Tests for remote probe agents: registration, assignments and result ingestion."""
+
+import asyncio
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+import uvicorn
+from httpx import AsyncClient, ASGITransport
+
+from app.config import settings
+from app.main import app
+from benchmarks.targets import StandInHTTPServer, closed_port
+from probe_agent import AgentWorker
+
+ADMIN = {"X-Admin-Token": "test-admin-token"}
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "test-admin-token")
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest_asyncio.fixture
+async def dashboard_url():
+    """The app served over real HTTP on localhost, without the background health loop."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, lifespan="off", log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    await task
+
+
+async def _register(client, name):
+    response = await client.post("/api/agents", json={"name": name}, headers=ADMIN)
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_agents_check_and_report_over_http(client, dashboard_url):
+    target = await StandInHTTPServer().start()
+    east, west = await _register(client, "agent-east"), await _register(client, "agent-west")
+    created = []
+    try:
+        for i in range(4):
+            created.append((await client.post("/api/services", json={
+                "name": f"agent-svc-{i}", "url": target.url, "agent_id": east["id"] if i < 3 else west["id"],
+            })).json())
+        created.append((await client.post("/api/services", json={
+            "name": "agent-svc-down", "url": f"http://127.0.0.1:{closed_port()}", "agent_id": west["id"],
+        })).json())
+
+        # Both agents run at once; batches of one force several compressed pushes each
+        workers = [AgentWorker(dashboard_url, agent["token"], batch_size=1) for agent in (east, west)]
+
+        async def round(worker):
+            async with worker.client() as http:
+                return await worker.run_once(http)
+
+        first, second = await asyncio.gather(*(round(worker) for worker in workers))
+        assert first == {"checked": 3, "accepted": 3, "stale": 0, "rejected": 0}
+        assert second == {"checked": 2, "accepted": 2, "stale": 0, "rejected": 0}
+
+        statuses = {s["name"]: s["status"] for s in (await client.get("/api/services")).json()}
+        assert [statuses[f"agent-svc-{i}"] for i in range(4)] == ["online"] * 4
+        assert statuses["agent-svc-down"] == "offline"
+
+        agents = {a["name"]: a for a in (await client.get("/api/agents")).json()}
+        assert agents["agent-east"]["services"] == 3
+        assert agents["agent-west"]["stale"] is False
+        assert "token" not in agents["agent-east"]
+    finally:
+        await target.stop()
+        for service in created:
+            await client.delete(f"/api/services/{service['id']}")
+        for agent in (east, west):
+            await client.delete(f"/api/agents/{agent['id']}", headers=ADMIN)
+
+
+@pytest.mark.asyncio
+async def test_ingestion_rejects_foreign_stale_and_oversized_batches(client, monkeypatch):
+    agent = await _register(client, "agent-ingest")
+    other = await _register(client, "agent-other")
+    auth = {"Authorization": f"Bearer {agent['token']}"}
+    mine = (await client.post("/api/services", json={
+        "name": "agent-mine", "url": "http://127.0.0.1:1", "agent_id": agent["id"],
+    })).json()
+    theirs = (await client.post("/api/services", json={
+        "name": "agent-theirs", "url": "http://127.0.0.1:1", "agent_id": other["id"],
+    })).json()
+    try:
+        now = datetime.utcnow()
+        body = {"results": [
+            {"service_id": mine["id"], "status": "degraded", "response_time_ms": 900, "checked_at": now.isoformat()},
+            {"service_id": theirs["id"], "status": "online", "checked_at": now.isoformat()},
+        ]}
+        response = await client.post("/api/agents/me/results", json=body, headers=auth)
+        assert response.json() == {"accepted": 1, "stale": 0, "rejected": [theirs["id"]]}
+        assert (await client.get(f"/api/services/{theirs['id']}")).json()["status"] == "unknown"
+
+        # An older result arriving late doesn't overwrite the newer one
+        late = {"results": [{"service_id": mine["id"], "status": "offline",
+                             "checked_at": (now - timedelta(minutes=1)).isoformat()}]}
+        response = await client.post("/api/agents/me/results", json=late, headers=auth)
+        assert response.json()["stale"] == 1
+        assert (await client.get(f"/api/services/{mine['id']}")).json()["status"] == "degraded"
+
+        monkeypatch.setattr(settings, "AGENT_MAX_BATCH_BYTES", 1024)
+        bomb = gzip.compress(json.dumps({"results": [], "pad": "x" * 100_000}).encode())
+        response = await client.post("/api/agents/me/results", content=bomb,
+                                     headers={**auth, "Content-Encoding": "gzip"})
+        assert response.status_code == 413
+
+        assert (await client.get("/api/agents/me/assignments", headers={"Authorization": "Bearer nope"})).status_code == 401
+        assignments = (await client.get("/api/agents/me/assignments", headers=auth)).json()
+        assert [a["id"] for a in assignments] == [mine["id"]]
+        assert (await client.post("/api/services", json={
+            "name": "agent-ghost", "url": "http://127.0.0.1:1", "agent_id": 999999999,
+        })).status_code == 400
+        assert (await client.post("/api/agents", json={"name": "agent-ingest"}, headers=ADMIN)).status_code == 409
+    finally:
+        for service in (mine, theirs):
+            await client.delete(f"/api/services/{service['id']}")
+        for a in (agent, other):
+            await client.delete(f"/api/agents/{a['id']}", headers=ADMIN)
@@ -0,0 +1,128 @@
+"""Tests for the alert rules engine and notification sinks."""
+
+import json
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+
+from app.database import async_session
+from app.main import app
+from app.models.ticket import Ticket
+from app.services.alerting import (
+    AlertManager, ConsecutiveFailures, EmailSink, Flapping, LatencyQuantile, WebhookSink,
+)
+from app.services.incident_tickets import TicketSink
+from benchmarks.targets import StandInHTTPServer, StandInSMTPServer
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+def test_consecutive_failures_open_one_incident_and_resolve():
+    manager = AlertManager([ConsecutiveFailures(3)])
+    kinds = []
+    for status in ["offline", "offline", "offline", "offline", "offline", "online"]:
+        kinds += [n.kind for n in manager.observe(1, "db", status, None)]
+
+    # Deduplicated: one notification when it starts firing, one when it clears;
+    # offline results in between are only "failed" updates for ticket sinks
+    assert kinds == ["opened", "failed", "failed", "resolved"]
+    assert manager.open_incidents == {}
+    assert manager.recent_incidents[0].history == ["consecutive_failures"]
+
+
+def test_latency_quantile_window():
+    rule = LatencyQuantile(threshold_ms=500, window=20, quantile=0.95, min_samples=5)
+    state = rule.new_state()
+    # 1 slow sample in 20 is exactly 5%: p95 is still within the threshold
+    for latency in [100] * 19 + [900]:
+        firing = rule.update(state, "online", latency)
+    assert not firing
+    assert rule.update(state, "online", 900)
+    # Slow samples age out of the window
+    for _ in range(20):
+        firing = rule.update(state, "online", 100)
+    assert not firing
+    assert state["over"] == 0
+
+
+def test_flapping_and_grouping_into_one_incident():
+    manager = AlertManager([ConsecutiveFailures(2), Flapping(transitions=3, window=6)])
+    notifications = []
+    for status in ["online", "offline", "online", "offline", "offline"]:
+        notifications += manager.observe(7, "vpn", status, None)
+
+    assert [(n.kind, n.rule) for n in notifications] == [
+        ("opened", "flapping"),
+        ("updated", "consecutive_failures"),
+    ]
+    incident = manager.open_incidents[7]
+    assert set(incident.alerts) == {"flapping", "consecutive_failures"}
+    assert notifications[0].incident is notifications[1].incident
+
+
+@pytest.mark.asyncio
+async def test_webhook_and_email_sinks():
+    webhook = await StandInHTTPServer().start()
+    smtp = await StandInSMTPServer().start()
+    try:
+        manager = AlertManager([ConsecutiveFailures(1)], sinks=[
+            WebhookSink(webhook.url),
+            EmailSink(smtp.host, smtp.port, "ops@test", ["oncall@test"]),
+        ])
+        await manager.deliver(manager.observe(3, "mail", "offline", None))
+    finally:
+        await webhook.stop()
+        await smtp.stop()
+
+    payload = json.loads(webhook.bodies[-1])
+    assert payload["notifications"][0]["kind"] == "opened"
+    assert payload["notifications"][0]["incident"]["service_name"] == "mail"
+
+    mail_from, rcpt_to, data = smtp.messages[-1]
+    assert (mail_from, rcpt_to) == ("ops@test", ["oncall@test"])
+    assert b"[OPENED] mail" in data
+
+
+@pytest.mark.asyncio
+async def test_failing_sink_does_not_block_others():
+    smtp = await StandInSMTPServer().start()
+    try:
+        manager = AlertManager([ConsecutiveFailures(1)], sinks=[
+            WebhookSink("http://127.0.0.1:9/unreachable", timeout=0.5),
+            EmailSink(smtp.host, smtp.port, "ops@test", ["oncall@test"]),
+        ])
+        await manager.deliver(manager.observe(4, "web", "offline", None))
+    finally:
+        await smtp.stop()
+    assert len(smtp.messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_ticket_sink_creates_ticket(client):
+    manager = AlertManager([ConsecutiveFailures(1)], sinks=[TicketSink()])
+    notifications = manager.observe(99999, "Alert Test Service", "offline", None)
+    await manager.deliver(notifications)
+
+    ticket_id = notifications[0].incident.ticket_id
+    async with async_session() as session:
+        ticket = (await session.execute(select(Ticket).where(Ticket.id == ticket_id))).scalar_one()
+    assert ticket.title == "Incident: Alert Test Service"
+    assert ticket.priority == "critical"
+    await client.delete(f"/api/tickets/{ticket_id}")
+
+
+@pytest.mark.asyncio
+async def test_alerts_endpoint(client):
+    response = await client.get("/api/alerts")
+    assert response.status_code == 200
+    assert set(response.json()) == {"open", "recent"}
+
+    rules = (await client.get("/api/alerts/rules")).json()
+    assert {rule["name"] for rule in rules} == {"consecutive_failures", "latency_p95", "flapping"}
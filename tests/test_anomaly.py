@@ -0,0 +1,119 @@
+"""Tests for adaptive latency baselines and anomaly detection."""
+
+import random
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.services import anomaly
+from app.services.anomaly import LatencyAnomalyDetector, robust_stats
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+def _warm(detector, service_id=1, n=60, seed=7):
+    rng = random.Random(seed)
+    for _ in range(n):
+        assert detector.observe(service_id, rng.gauss(20, 2)) is None
+
+
+def test_slow_but_online_response_is_flagged():
+    detector = LatencyAnomalyDetector(min_samples=20, threshold=5, min_delta_ms=50, consecutive=2)
+    _warm(detector)
+
+    # One slow result isn't enough; the second in a row starts the anomaly
+    assert detector.observe(1, 180) is None
+    assert not detector.is_anomalous(1)
+    assert detector.observe(1, 180) == "started"
+    assert detector.is_anomalous(1)
+    assert "180ms vs baseline 2" in detector.describe(1)
+
+    assert detector.observe(1, 21) == "cleared"
+    assert not detector.is_anomalous(1)
+
+
+def test_small_absolute_changes_are_ignored():
+    detector = LatencyAnomalyDetector(min_samples=20, threshold=5, min_delta_ms=50, consecutive=1)
+    # A very stable 2ms service: 40ms is many deviations out, but under the 50ms margin
+    for _ in range(40):
+        detector.observe(1, 2.0)
+    assert detector.observe(1, 40) is None
+    assert detector.observe(1, 60) == "started"
+
+
+def test_no_verdict_before_min_samples():
+    detector = LatencyAnomalyDetector(min_samples=20, consecutive=1)
+    for _ in range(10):
+        detector.observe(1, 20)
+    assert detector.observe(1, 5000) is None
+    assert detector.observe(1, None) is None
+
+
+def test_robust_stats_ignore_outliers():
+    stats = robust_stats({1: [10, 11, 12, 13, 14, 1000], 2: [5, 5, 5]})
+    median, spread = stats[1]
+    assert median == 12.5
+    assert spread == pytest.approx(1.5 * anomaly.MAD_SCALE)
+    assert stats[2] == (5, 0)
+
+
+@pytest.mark.asyncio
+async def test_seasonal_baseline_follows_the_hour_of_day():
+    detector = LatencyAnomalyDetector(min_samples=20, consecutive=1, seasonal_samples=30)
+    rng = random.Random(3)
+    # Nightly backups make 03:00 slow; midday is fast
+    for day in range(1, 3):
+        for minute in range(30):
+            detector.observe(1, rng.gauss(200, 5), datetime(2024, 1, day, 3, minute))
+            detector.observe(1, rng.gauss(20, 2), datetime(2024, 1, day, 12, minute))
+    await detector.recompute()
+
+    assert detector.observe(1, 205, datetime(2024, 1, 3, 3, 0)) is None
+    assert detector.baseline(1).to_dict()["method"] == "seasonal"
+    # The same latency at midday is an anomaly
+    assert detector.observe(1, 205, datetime(2024, 1, 3, 12, 0)) == "started"
+    # Hours without enough history fall back to the whole window
+    detector.observe(1, 20, datetime(2024, 1, 3, 18, 0))
+    assert detector.baseline(1).to_dict()["method"] == "median"
+
+
+@pytest.mark.asyncio
+async def test_recompute_switches_to_median_baseline():
+    detector = LatencyAnomalyDetector(min_samples=20, consecutive=1)
+    _warm(detector)
+    # A burst of outliers pulls the EWMA up, but not the median
+    for _ in range(5):
+        detector.observe(1, 400)
+    ewma = detector.baseline(1).center()[0]
+    await detector.recompute()
+    baseline = detector.baseline(1)
+    assert baseline.to_dict()["method"] == "median"
+    assert baseline.center()[0] < 25 < ewma
+
+
+@pytest.mark.asyncio
+async def test_anomalies_endpoint(client, monkeypatch):
+    detector = LatencyAnomalyDetector(min_samples=20, consecutive=1)
+    monkeypatch.setattr(anomaly, "detector", detector)
+    service = (await client.post("/api/services", json={"name": "anomaly-probe", "url": "http://127.0.0.1:1"})).json()
+    try:
+        _warm(detector, service["id"])
+        assert (await client.get("/api/services/anomalies")).json() == []
+
+        detector.observe(service["id"], 300)
+        rows = (await client.get("/api/services/anomalies")).json()
+        assert [(r["name"], r["anomalous"], r["last_ms"]) for r in rows] == [("anomaly-probe", True, 300)]
+
+        # Deleting the service drops its baseline
+        await client.delete(f"/api/services/{service['id']}")
+        assert detector.baseline(service["id"]) is None
+    finally:
+        await client.delete(f"/api/services/{service['id']}")
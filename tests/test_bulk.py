@@ -0,0 +1,128 @@
+"""Tests for the bulk import/export API."""
+
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.models.service import MonitoredService
+from app.models.ticket import Ticket
+from app.services import bulk_io
+from app.services.ticket_sla import scheduler
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson_reports_invalid_rows(client, monkeypatch):
+    monkeypatch.setattr(scheduler, "_stale", False)
+    body = "\n".join([
+        json.dumps({"title": "Bulk NDJSON A", "priority": "low"}),
+        json.dumps({"description": "missing title"}),
+        "not json",
+        json.dumps({"title": "Bulk NDJSON B", "status": "closed"}),
+    ])
+    response = await client.post(
+        "/api/import/tickets",
+        content=body,
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["inserted"] == 2
+    assert data["error_count"] == 2
+    assert [e["line"] for e in data["errors"]] == [2, 3]
+
+    response = await client.get("/api/tickets")
+    imported = {t["title"]: t for t in response.json() if t["title"].startswith("Bulk NDJSON")}
+    # Imported tickets get SLA timers, and the scheduler reloads to pick them up
+    assert imported["Bulk NDJSON A"]["next_due_at"] == imported["Bulk NDJSON A"]["response_due_at"] is not None
+    assert imported["Bulk NDJSON B"]["next_due_at"] is None
+    assert scheduler._stale
+    for ticket in imported.values():
+        await client.delete(f"/api/tickets/{ticket['id']}")
+
+
+@pytest.mark.asyncio
+async def test_import_csv_with_multiline_field(client):
+    body = 'title,content,category\n"Bulk CSV Article","line one\nline two",network\n'
+    response = await client.post(
+        "/api/import/knowledge",
+        content=body,
+        headers={"content-type": "text/csv"},
+    )
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 1
+
+    response = await client.get("/api/knowledge?search=Bulk CSV Article")
+    article = response.json()[0]
+    assert article["content"] == "line one\nline two"
+    await client.delete(f"/api/knowledge/{article['id']}")
+
+
+@pytest.mark.asyncio
+async def test_export_csv(client):
+    response = await client.get("/api/export/services?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    header = response.text.splitlines()[0]
+    assert header.startswith("id,name,url")
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(client):
+    response = await client.get("/api/export/tickets")
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert all("title" in row for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_unknown_entity(client):
+    response = await client.get("/api/export/unknown")
+    assert response.status_code == 404
+
+
+def test_rows_carry_column_defaults():
+    # COPY on PostgreSQL skips Python-side defaults, so every row carries them
+    now = datetime(2024, 6, 3, 9, 0)
+    ticket = bulk_io._to_row(Ticket, bulk_io.TicketRecord(title="Imported"), now, "acme")
+    assert (ticket["escalation_level"], ticket["response_breached"], ticket["resolution_breached"]) == (0, False, False)
+    service = bulk_io._to_row(MonitoredService, bulk_io.ServiceRecord(name="Imported", url="http://x.invalid"), now, "acme")
+    assert (service["http_method"], service["tenant"]) == ("GET", "acme")
+
+
+def _cli(tmp_path, *args: str) -> str:
+    env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'cli.db'}"}
+    result = subprocess.run(
+        [sys.executable, "bulk.py", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_cli_imports_and_exports_per_tenant(tmp_path):
+    path = tmp_path / "services.ndjson"
+    path.write_text(json.dumps({"name": "CLI Gateway", "url": "http://cli.invalid"}) + "\n")
+
+    assert "Imported 1 services into tenant default" in _cli(tmp_path, "import", "services", str(path))
+    assert "into tenant acme" in _cli(tmp_path, "import", "services", str(path), "--tenant", "Acme")
+
+    exported = _cli(tmp_path, "export", "services", "--format", "csv").splitlines()
+    assert len(exported) == 2 and "CLI Gateway" in exported[1] and ",default" in exported[1]
+    exported = _cli(tmp_path, "export", "services", "--tenant", "acme")
+    assert [json.loads(line)["tenant"] for line in exported.splitlines()] == ["acme"]
@@ -0,0 +1,220 @@
+"""Tests for confirmation re-probes, the circuit breaker and the probe budget."""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import Base, build_engine
+from app.main import app
+from app.models.service import MonitoredService
+from app.services import check_policy, health_checker
+from app.services.alerting import AlertManager
+from app.services.check_policy import CircuitBreaker, ProbeBudget, confirmed_check
+from benchmarks.targets import StandInHTTPServer, closed_port
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "CHECK_RETRY_BACKOFF_MS", 0)
+    monkeypatch.setattr(settings, "CHECK_CONFIRM_RETRIES", 2)
+
+
+def _probe(*statuses):
+    calls = []
+
+    async def probe(service):
+        calls.append(service)
+        return {"status": statuses[min(len(calls) - 1, len(statuses) - 1)], "response_time_ms": None}
+
+    return probe, calls
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_is_not_reported():
+    probe, calls = _probe("offline", "offline", "online")
+    budget = ProbeBudget(10)
+    result = await confirmed_check(MonitoredService(status="online"), probe, budget)
+    assert result["status"] == "online"
+    assert len(calls) == 3
+    assert budget.report()["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_known_offline_service_is_probed_once():
+    probe, calls = _probe("offline")
+    result = await confirmed_check(MonitoredService(status="offline"), probe, ProbeBudget(10))
+    assert result["status"] == "offline"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_budget_bounds_retries():
+    probe, calls = _probe("offline")
+    budget = ProbeBudget(1)
+    for _ in range(3):
+        await confirmed_check(MonitoredService(status="online"), probe, budget)
+    # 3 initial probes + the single retry the budget allowed
+    assert len(calls) == 4
+    assert budget.report()["retry_budget_left"] == 0
+    assert budget.report()["unconfirmed_failures"] == 3
+
+
+@pytest.mark.asyncio
+async def test_vantage_overrides_local_failure(monkeypatch):
+    async def vantage(service):
+        return {"status": "online", "response_time_ms": 42.0}
+
+    monkeypatch.setattr(settings, "PROBE_VANTAGE_URL", "http://vantage.invalid")
+    monkeypatch.setattr(check_policy, "probe_from_vantage", vantage)
+    probe, _ = _probe("offline")
+    budget = ProbeBudget(10)
+    result = await confirmed_check(MonitoredService(status="online"), probe, budget)
+    assert result == {"status": "online", "response_time_ms": 42.0}
+    assert budget.report()["vantage_probes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_vantage_failure_is_logged_with_the_result(monkeypatch):
+    monkeypatch.setattr(settings, "PROBE_VANTAGE_URL", f"http://127.0.0.1:{closed_port()}")
+    monkeypatch.setattr(health_checker, "alert_manager", AlertManager([]))
+    probe, _ = _probe("offline")
+    service = MonitoredService(id=1, name="Edge", status="online", tenant="acme")
+    result = await confirmed_check(service, probe, ProbeBudget(10))
+    assert result["status"] == "offline"
+    assert result["vantage_error"]
+
+    class Session:
+        added = []
+
+        def add(self, entry):
+            self.added.append(entry)
+
+    await health_checker.apply_result(Session(), service, result)
+    [warning] = [e for e in Session.added if "Vantage probe" in e.message]
+    assert (warning.level, warning.tenant) == ("WARNING", "acme")
+
+
+def test_circuit_breaker_backs_off():
+    breaker = CircuitBreaker(threshold=2, base_cooldown=10, max_cooldown=30)
+    breaker.record(1, ok=False, now=0)
+    assert breaker.allow(1, now=0)
+    breaker.record(1, ok=False, now=0)
+    assert not breaker.allow(1, now=5)
+    assert breaker.allow(1, now=10)
+
+    # Failed trial probes double the cooldown, up to the maximum
+    breaker.record(1, ok=False, now=10)
+    assert not breaker.allow(1, now=29)
+    assert breaker.allow(1, now=30)
+    breaker.record(1, ok=False, now=30)
+    assert not breaker.allow(1, now=59)
+    assert breaker.allow(1, now=60)
+
+    breaker.record(1, ok=True, now=60)
+    assert breaker.allow(1, now=60)
+
+
+@pytest.mark.asyncio
+async def test_probe_endpoint_requires_token(client, monkeypatch):
+    body = {"url": "http://127.0.0.1:1", "check_type": "http"}
+    monkeypatch.setattr(settings, "PROBE_VANTAGE_TOKEN", "")
+    assert (await client.post("/api/probe", json=body)).status_code == 403
+
+    monkeypatch.setattr(settings, "PROBE_VANTAGE_TOKEN", "vantage-secret")
+    response = await client.post("/api/probe", json=body, headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+    response = await client.post("/api/probe", json=body, headers={"Authorization": "Bearer tökén".encode()})
+    assert response.status_code == 401
+
+    target = await StandInHTTPServer().start()
+    try:
+        response = await client.post(
+            "/api/probe", json={"url": target.url}, headers={"Authorization": "Bearer vantage-secret"},
+        )
+    finally:
+        await target.stop()
+    assert response.status_code == 200
+    assert response.json()["status"] == "online"
+
+
+@pytest.mark.asyncio
+async def test_backoff_does_not_hold_a_check_slot(monkeypatch):
+    monkeypatch.setattr(settings, "HEALTH_CHECK_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "CHECK_RETRY_BACKOFF_MS", 300)
+    monkeypatch.setattr(settings, "CHECK_CONFIRM_RETRIES", 1)
+    monkeypatch.setattr(health_checker, "_check_limits", {})
+    finished = []
+
+    async def check_service(service):
+        return {"status": "offline" if service.name == "flaky" else "online", "response_time_ms": None}
+
+    async def check(service):
+        await health_checker.limited_check(service, ProbeBudget(10))
+        finished.append(service.name)
+
+    monkeypatch.setattr(health_checker, "check_service", check_service)
+    flaky, steady = MonitoredService(name="flaky", status="online"), MonitoredService(name="steady")
+    # The only slot is free while "flaky" waits to be re-probed
+    await asyncio.gather(check(flaky), check(steady))
+    assert finished == ["steady", "flaky"]
+
+
+@pytest.mark.asyncio
+async def test_cycle_confirms_failures_and_reports_budget(tmp_path, monkeypatch):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'checks.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(health_checker, "async_session", session_factory)
+    monkeypatch.setattr(health_checker, "breaker", CircuitBreaker(threshold=1, base_cooldown=3600))
+    monkeypatch.setattr(health_checker, "alert_manager", AlertManager([]))
+
+    target = await StandInHTTPServer().start()
+    try:
+        async with session_factory() as session:
+            session.add_all([
+                MonitoredService(name="up-1", url=target.url),
+                MonitoredService(name="up-2", url=target.url),
+                MonitoredService(name="down", url=f"127.0.0.1:{closed_port()}", check_type="tcp"),
+            ])
+            await session.commit()
+
+        await health_checker.run_health_checks()
+        report = dict(health_checker.last_cycle)
+        # The breaker opened for the dead service, so the next cycle skips it
+        await health_checker.run_health_checks()
+        second = dict(health_checker.last_cycle)
+    finally:
+        await target.stop()
+
+    assert report["checked"] == 3
+    assert report["retries"] == 2
+    assert report["probes"] == 5
+    assert second["checked"] == 2 and second["skipped_by_breaker"] == 1
+
+    async with session_factory() as session:
+        statuses = dict((await session.execute(select(MonitoredService.name, MonitoredService.status))).all())
+    assert statuses == {"up-1": "online", "up-2": "online", "down": "offline"}
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_check_cycle_endpoint(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "test-admin-token")
+    # Every tenant's services are in the cycle, so only operators may read it
+    assert (await client.get("/api/services/check-cycle")).status_code == 401
+    response = await client.get("/api/services/check-cycle", headers={"X-Admin-Token": "test-admin-token"})
+    assert response.status_code == 200
+    assert set(response.json()) == {"last_cycle", "open_circuits"}
@@ -0,0 +1,118 @@
+"""Tests for response compression and conditional GET."""
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import Base, build_engine
+from app.main import app
+from app.models.ticket import Ticket
+from app.services import table_versions
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_list_endpoint_conditional_get(client):
+    response = await client.get("/api/tickets")
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    response = await client.get("/api/tickets", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    # A different query is a different representation
+    response = await client.get("/api/tickets?status=open", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_etag_changes_after_write(client):
+    etag = (await client.get("/api/tickets")).headers["etag"]
+    created = (await client.post("/api/tickets", json={"title": "ETag test"})).json()
+
+    response = await client.get("/api/tickets", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+    await client.delete(f"/api/tickets/{created['id']}")
+
+
+@pytest.mark.asyncio
+async def test_etag_follows_the_data_not_the_process(client):
+    etag = (await client.get("/api/tickets")).headers["etag"]
+    # A write from another worker: its own engine, no in-process hooks involved
+    other = build_engine(settings.DATABASE_URL)
+    async with other.begin() as conn:
+        await conn.execute(text("UPDATE tickets SET title = title WHERE id = (SELECT min(id) FROM tickets)"))
+    await other.dispose()
+    assert (await client.get("/api/tickets", headers={"If-None-Match": etag})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_version_is_read_with_the_rows(tmp_path):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'versions.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        before = await table_versions.version(session, "tickets", "log_entries")
+        session.add(Ticket(title="Versioned"))
+        await session.flush()
+        # Bumped inside the writing transaction, so a rollback undoes it too
+        assert await table_versions.version(session, "tickets", "log_entries") != before
+        await session.rollback()
+        assert await table_versions.version(session, "tickets", "log_entries") == before == "0.0"
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_gzip_compression(client):
+    response = await client.get("/api/logs?limit=200", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "X-Tenant, Accept-Encoding"
+    assert isinstance(response.json(), list)
+
+
+@pytest.mark.asyncio
+async def test_small_responses_not_compressed(client):
+    response = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_streamed_export_is_compressed(client):
+    response = await client.get("/api/export/tickets", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text.splitlines()
+
+
+@pytest.mark.asyncio
+async def test_static_files_versioned_and_revalidated(client):
+    page = await client.get("/")
+    assert "/static/js/utils.js?v=" in page.text
+
+    response = await client.get("/static/js/utils.js?v=abc", headers={"Accept-Encoding": "identity"})
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    etag = response.headers["etag"]
+
+    response = await client.get("/static/js/utils.js", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = await client.get("/static/js/utils.js", headers={"Accept-Encoding": "gzip"})
+    compressed_etag = response.headers["etag"]
+    assert compressed_etag != etag
+    response = await client.get(
+        "/static/js/utils.js", headers={"Accept-Encoding": "gzip", "If-None-Match": compressed_etag},
+    )
+    assert response.status_code == 304
@@ -0,0 +1,150 @@
+"""Tests for configurable HTTP checks: body assertions, latency thresholds and TLS expiry."""
+
+import shutil
+import ssl
+import subprocess
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.services import certificates, health_checker
+from app.services.health_checker import check_http
+from benchmarks.targets import StandInHTTPServer
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def fresh_http_client():
+    # The shared client is per event loop; don't leak it across test loops
+    yield
+    await health_checker.close_http_client()
+
+
+def _self_signed(tmp_path, days: int):
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl not available")
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", str(key),
+         "-out", str(cert), "-days", str(days), "-subj", "/CN=127.0.0.1"],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+@pytest.mark.asyncio
+async def test_body_assertions():
+    server = await StandInHTTPServer(body=b'{"status": "ok", "version": "1.4.2"}').start()
+    try:
+        ok = await check_http(server.url, body_contains='"status": "ok"', body_regex=r'"version": "1\.\d+')
+        assert ok["status"] == "online"
+        assert ok["detail"] is None
+
+        missing = await check_http(server.url, body_contains="healthy")
+        assert missing["status"] == "degraded"
+        assert "does not contain" in missing["detail"]
+
+        mismatch = await check_http(server.url, body_regex=r"version.*2\.0")
+        assert mismatch["status"] == "degraded"
+        assert "does not match" in mismatch["detail"]
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_body_read_is_capped():
+    server = await StandInHTTPServer(body=b"x" * 100_000 + b"marker").start()
+    try:
+        result = await check_http(server.url, body_contains="marker", max_body_bytes=1024)
+        assert result["status"] == "degraded"
+        result = await check_http(server.url, body_contains="marker", max_body_bytes=200_000)
+        assert result["status"] == "online"
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_latency_threshold_and_status_mismatch():
+    server = await StandInHTTPServer(latency_ms=60).start()
+    try:
+        assert (await check_http(server.url, degraded_after_ms=1000))["status"] == "online"
+        slow = await check_http(server.url, degraded_after_ms=20)
+        assert slow["status"] == "degraded"
+        assert "threshold 20ms" in slow["detail"]
+        # 0 is a threshold, not "use the default"
+        assert "threshold 0ms" in (await check_http(server.url, degraded_after_ms=0))["detail"]
+
+        wrong = await check_http(server.url, expected_status=204, degraded_after_ms=1000)
+        assert wrong["status"] == "degraded"
+        assert "got 200" in wrong["detail"]
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_offline_carries_error_detail():
+    result = await check_http("http://127.0.0.1:1/", timeout=1.0)
+    assert result["status"] == "offline"
+    assert result["detail"]
+
+
+@pytest.mark.asyncio
+async def test_tls_expiry_is_read_from_connection(tmp_path):
+    cert, key = _self_signed(tmp_path, days=5)
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    server = await StandInHTTPServer(ssl_context=context).start()
+    try:
+        result = await check_http(server.url)
+        expires = result["tls_expires_at"]
+        assert expires is not None
+        assert abs(expires - (datetime.utcnow() + timedelta(days=5))) < timedelta(minutes=5)
+        # Inside the default 14-day warning window
+        assert result["status"] == "degraded"
+        assert "expires in" in result["detail"]
+    finally:
+        await server.stop()
+
+
+def test_not_after_parses_der(tmp_path):
+    cert, _ = _self_signed(tmp_path, days=400)
+    der = ssl.PEM_cert_to_DER_cert(cert.read_text())
+    expires = certificates.not_after(der)
+    assert abs(expires - (datetime.utcnow() + timedelta(days=400))) < timedelta(minutes=5)
+    with pytest.raises(ValueError):
+        certificates.not_after(der[:20])
+
+
+@pytest.mark.asyncio
+async def test_service_check_config_round_trip(client):
+    response = await client.post("/api/services", json={
+        "name": "config-check", "url": "http://127.0.0.1:1/health",
+        "http_method": "HEAD", "http_headers": {"X-Probe": "1"},
+        "degraded_after_ms": 500, "body_contains": "ok",
+    })
+    assert response.status_code in (200, 201)
+    service = response.json()
+    try:
+        assert service["http_method"] == "HEAD"
+        assert service["http_headers"] == {"X-Probe": "1"}
+        assert service["degraded_after_ms"] == 500
+
+        bad = await client.put(f"/api/services/{service['id']}", json={"body_regex": "(unclosed"})
+        assert bad.status_code == 422
+        bad = await client.put(f"/api/services/{service['id']}", json={"http_method": "BREW"})
+        assert bad.status_code == 422
+
+        response = await client.get("/api/services/certificates")
+        assert response.status_code == 200
+        assert isinstance(response.json(), list)
+    finally:
+        await client.delete(f"/api/services/{service['id']}")
@@ -0,0 +1,131 @@
+"""Tests for automatic incident tickets."""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, event, func, select
+
+from app.database import async_session, engine
+from app.models.ticket import Ticket
+from app.services.alerting import AlertManager, ConsecutiveFailures
+from app.services.incident_tickets import TicketSink
+
+BASE_ID = 900_000
+
+
+@pytest_asyncio.fixture
+async def cleanup():
+    await _delete_incident_tickets()
+    yield
+    await _delete_incident_tickets()
+
+
+async def _delete_incident_tickets():
+    async with async_session() as session:
+        await session.execute(delete(Ticket).where(Ticket.fingerprint.like("service:9%")))
+        await session.commit()
+
+
+async def _tickets(*service_ids: int) -> list[Ticket]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(Ticket).where(Ticket.fingerprint.in_([f"service:{i}" for i in service_ids])).order_by(Ticket.id)
+        )
+        return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_incident_ticket_lifecycle(cleanup):
+    sink = TicketSink(update_interval=0)
+    manager = AlertManager([ConsecutiveFailures(2)], sinks=[sink])
+    service_id = BASE_ID + 1
+
+    for status in ["offline", "offline", "offline", "offline"]:
+        await manager.deliver(manager.observe(service_id, "Core Switch", status, None))
+
+    [ticket] = await _tickets(service_id)
+    assert ticket.status == "open"
+    assert ticket.priority == "critical"
+    lines = ticket.description.splitlines()
+    assert "[OPENED] Core Switch" in lines[0]
+    # Later failures are appended as updates
+    assert len(lines) == 3 and all("[FAILED] Core Switch" in line for line in lines[1:])
+    assert manager.open_incidents[service_id].ticket_id == ticket.id
+
+    await manager.deliver(manager.observe(service_id, "Core Switch", "online", 20.0))
+    [ticket] = await _tickets(service_id)
+    assert ticket.status == "resolved"
+    assert ticket.resolved_at is not None
+    assert "[RESOLVED] Core Switch" in ticket.description.splitlines()[-1]
+
+
+@pytest.mark.asyncio
+async def test_failure_updates_are_throttled(cleanup):
+    manager = AlertManager([ConsecutiveFailures(1)], sinks=[TicketSink(update_interval=3600)])
+    service_id = BASE_ID + 2
+    for _ in range(5):
+        await manager.deliver(manager.observe(service_id, "Printer", "offline", None))
+
+    [ticket] = await _tickets(service_id)
+    assert len(ticket.description.splitlines()) == 2
+
+
+@pytest.mark.asyncio
+async def test_throttle_state_is_dropped_with_the_incident(cleanup):
+    sink = TicketSink(update_interval=3600)
+    manager = AlertManager([ConsecutiveFailures(1)], sinks=[sink])
+    resolved, removed = BASE_ID + 5, BASE_ID + 6
+    for service_id in (resolved, removed):
+        for _ in range(2):
+            await manager.deliver(manager.observe(service_id, "Printer", "offline", None))
+    assert set(sink._last_failure_update) == {f"service:{resolved}", f"service:{removed}"}
+
+    await manager.deliver(manager.observe(resolved, "Printer", "online", 5.0))
+    manager.forget(removed)
+    assert sink._last_failure_update == {}
+
+
+@pytest.mark.asyncio
+async def test_open_ticket_is_reused_after_restart(cleanup):
+    service_id = BASE_ID + 3
+    for _ in range(2):
+        # A fresh manager has no memory of the earlier incident, like after a restart
+        manager = AlertManager([ConsecutiveFailures(1)], sinks=[TicketSink()])
+        await manager.deliver(manager.observe(service_id, "Mail", "offline", None))
+
+    [ticket] = await _tickets(service_id)
+    assert ticket.description.count("[OPENED] Mail") == 2
+
+
+@pytest.mark.asyncio
+async def test_mass_outage_is_one_transaction(cleanup):
+    manager = AlertManager([ConsecutiveFailures(1)], sinks=[TicketSink()])
+    service_ids = [BASE_ID + 1000 + i for i in range(500)]
+    notifications = []
+    for service_id in service_ids:
+        notifications += manager.observe(service_id, f"svc-{service_id}", "offline", None)
+
+    commits = []
+    statements = []
+
+    def on_commit(conn):
+        commits.append(1)
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "commit", on_commit)
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        await manager.deliver(notifications)
+    finally:
+        event.remove(engine.sync_engine, "commit", on_commit)
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+    assert len(commits) == 1
+    assert sum(s.lstrip().upper().startswith("SELECT") for s in statements) == 1
+
+    async with async_session() as session:
+        count = await session.scalar(
+            select(func.count()).select_from(Ticket).where(Ticket.fingerprint.like("service:901%"))
+        )
+    assert count == 500
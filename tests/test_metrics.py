@@ -0,0 +1,37 @@
+"""Tests for the /metrics endpoint and metric primitives."""
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.services.metrics import Histogram
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client):
+    await client.get("/api/services/99999")
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/services/{service_id}",status="404"}' in body
+    assert "db_query_duration_seconds_bucket" in body
+    assert "websocket_clients 0.0" in body
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram("test_seconds", "Test.", ("kind",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        hist.labels("a").observe(value)
+    lines = hist.render().splitlines()
+    assert 'test_seconds_bucket{kind="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{kind="a",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{kind="a",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{kind="a"} 4' in lines
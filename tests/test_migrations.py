@@ -0,0 +1,49 @@
+"""Tests for the schema migrations: any database upgrades to exactly what the models create."""
+
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _alembic(db_path: Path, *args: str) -> str:
+    env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{db_path}"}
+    result = subprocess.run(
+        [sys.executable, "-m", "alembic", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_first_release_database_upgrades_to_the_models(tmp_path):
+    db_path = tmp_path / "old.db"
+    _alembic(db_path, "upgrade", "0001")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO tickets (title, description, priority, status, created_at, updated_at) "
+            "VALUES ('Printer jam', 'floor 2', 'low', 'open', '2024-01-01', '2024-01-01')"
+        )
+
+    _alembic(db_path, "upgrade", "head")
+    assert "No new upgrade operations detected" in _alembic(db_path, "check")
+
+    with sqlite3.connect(db_path) as conn:
+        # Existing rows land in the default tenant and in the search index
+        assert conn.execute("SELECT title, tenant FROM tickets").fetchall() == [("Printer jam", "default")]
+        assert conn.execute("SELECT rowid FROM tickets_fts WHERE tickets_fts MATCH 'printer'").fetchall() == [(1,)]
+        # and writes now bump the table version
+        conn.execute("UPDATE tickets SET status = 'closed'")
+        assert conn.execute("SELECT version FROM table_versions WHERE name = 'tickets'").fetchall() == [(1,)]
+
+
+def test_upgrade_is_a_no_op_on_a_current_schema(tmp_path):
+    db_path = tmp_path / "current.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{db_path}"}
+    subprocess.run([sys.executable, "seed.py", "--schema-only"], cwd=ROOT, env=env, check=True, timeout=60)
+
+    _alembic(db_path, "upgrade", "head")
+    assert "No new upgrade operations detected" in _alembic(db_path, "check")
@@ -0,0 +1,71 @@
+"""Tests for pre-rendered page shells."""
+
+import json
+import re
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_page_conditional_get(client):
+    response = await client.get("/services")
+    assert response.status_code == 200
+    assert "text/html" in response.headers["content-type"]
+    etag = response.headers["etag"]
+
+    response = await client.get("/services", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_active_nav_link(client):
+    response = await client.get("/tickets")
+    link = re.search(r'<a href="/tickets" class="([^"]*)"', response.text)
+    assert "text-cyan-400" in link.group(1)
+    link = re.search(r'<a href="/services" class="([^"]*)"', response.text)
+    assert "text-cyan-400" not in link.group(1)
+
+
+@pytest.mark.asyncio
+async def test_dashboard_embeds_initial_data(client):
+    response = await client.get("/")
+    match = re.search(r'<script id="initial-data" type="application/json">(.*?)</script>', response.text, re.S)
+    assert match
+    data = json.loads(match.group(1))
+
+    stats = (await client.get("/api/services/stats")).json()
+    assert data["/api/services/stats"] == stats
+    assert isinstance(data["/api/logs?limit=20"], list)
+    assert len(data["/api/logs?limit=20"]) <= 20
+
+
+@pytest.mark.asyncio
+async def test_dashboard_etag_follows_data(client):
+    etag = (await client.get("/")).headers["etag"]
+    response = await client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    created = await client.post("/api/tickets", json={"title": "Snapshot refresh", "description": "x"})
+    assert created.status_code == 201
+
+    response = await client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "Snapshot refresh" in response.text
+    await client.delete(f"/api/tickets/{created.json()['id']}")
+
+
+@pytest.mark.asyncio
+async def test_not_found_page(client):
+    response = await client.get("/no-such-page")
+    assert response.status_code == 404
+    assert "Page Not Found" in response.text
@@ -0,0 +1,140 @@
+"""Tests for rate limits and in-flight caps on expensive endpoints."""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.routers import services
+from app.services import rate_limit
+from app.services.rate_limit import Budget, MemoryStore, RateLimiter, parse_budgets
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+def test_parse_budgets():
+    assert parse_budgets("portscan:6/30/4, geoip:0/120/0,") == {
+        "portscan": Budget(6, 30, 4),
+        "geoip": Budget(0, 120, 0),
+    }
+
+
+@pytest.mark.asyncio
+async def test_bucket_bursts_then_refills():
+    store = MemoryStore()
+    bucket = [("scan:1.2.3.4", 3)]
+    for _ in range(3):
+        assert await store.take(bucket, 1000.0) == [0.0]
+    assert await store.take(bucket, 1000.0) == [pytest.approx(20.0)]
+    # One token comes back every 20 seconds
+    assert await store.take(bucket, 1020.0) == [0.0]
+    assert (await store.take(bucket, 1020.0))[0] > 0
+
+
+@pytest.mark.asyncio
+async def test_rejected_request_spends_no_tokens():
+    store = MemoryStore()
+    assert await store.take([("total", 1)], 0.0) == [0.0]
+    # The total budget is exhausted, so the client's token isn't taken either
+    assert (await store.take([("client", 1), ("total", 1)], 0.0))[1] > 0
+    assert await store.take([("client", 1)], 0.0) == [0.0]
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_with_retry_after():
+    limiter = RateLimiter({"scan": Budget(2, 3, 1)})
+    await limiter.check("scan", "a")
+    await limiter.check("scan", "a")
+    with pytest.raises(HTTPException) as exc:
+        await limiter.check("scan", "a")
+    assert exc.value.status_code == 429
+    assert exc.value.headers == {"Retry-After": "30"}
+
+    # Another client has its own budget, until the endpoint's total runs out
+    await limiter.check("scan", "b")
+    with pytest.raises(HTTPException):
+        await limiter.check("scan", "b")
+    await limiter.check("unlimited", "a")
+
+    slot = limiter.acquire("scan")
+    with pytest.raises(HTTPException) as exc:
+        limiter.acquire("scan")
+    assert exc.value.headers == {"Retry-After": "1"}
+    slot.release()
+    slot.release()
+    assert limiter.in_flight("scan") == 0
+    limiter.acquire("scan").release()
+
+
+@pytest.mark.asyncio
+async def test_endpoint_returns_429(client, monkeypatch):
+    monkeypatch.setattr(rate_limit, "limiter", RateLimiter({"portscan": Budget(1, 0, 0)}))
+    scan = {"host": "127.0.0.1", "ports": [1]}
+    assert (await client.post("/api/network/portscan", json=scan)).status_code == 200
+
+    response = await client.post("/api/network/portscan", json=scan)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "60"
+    assert response.text == "Too many requests, try again later"
+
+    metrics = (await client.get("/metrics")).text
+    assert 'rate_limit_rejected_total{route="portscan",reason="client"}' in metrics
+    assert 'rate_limit_in_flight{route="portscan"} 0.0' in metrics
+
+
+@pytest.mark.asyncio
+async def test_streamed_bulk_check_holds_its_slot(client, monkeypatch):
+    limiter = RateLimiter({"bulk-check": Budget(0, 0, 1)})
+    monkeypatch.setattr(rate_limit, "limiter", limiter)
+    started, finish = asyncio.Event(), asyncio.Event()
+
+    async def slow_stream(selection, tenant):
+        started.set()
+        await finish.wait()
+        yield b'{"done": true}\n'
+
+    monkeypatch.setattr(services, "_stream_checks", slow_stream)
+    first = asyncio.create_task(client.post("/api/services/bulk/check", json={"group_name": "rate-limit-test"}))
+    await asyncio.wait_for(started.wait(), 5)
+
+    # The slot is held while the body streams, not just until the endpoint returns
+    assert limiter.in_flight("bulk-check") == 1
+    response = await client.post("/api/services/bulk/check", json={"group_name": "rate-limit-test"})
+    assert response.status_code == 429
+
+    finish.set()
+    assert (await first).text == '{"done": true}\n'
+    assert limiter.in_flight("bulk-check") == 0
+
+
+@pytest.mark.asyncio
+async def test_slot_is_released_when_the_client_leaves_before_the_body():
+    limiter = RateLimiter({"bulk-check": Budget(0, 0, 1)})
+    slot = limiter.acquire("bulk-check")
+    started = False
+
+    async def body():
+        nonlocal started
+        started = True
+        yield b"never sent"
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        await asyncio.sleep(0)
+
+    await slot.response(body())({"type": "http", "asgi": {"version": "3.0"}}, receive, send)
+    assert not started
+    assert limiter.in_flight("bulk-check") == 0
+    # Releasing again is a no-op
+    slot.release()
+    assert limiter.in_flight("bulk-check") == 0
@@ -0,0 +1,65 @@
+"""Tests for read-replica routing with read-your-writes fallback."""
+
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app import database
+from app.database import Base, build_engine
+from app.main import app
+from app.models import LogEntry
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest_asyncio.fixture
+async def replica(tmp_path, monkeypatch):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(LogEntry.__table__).values(
+            timestamp=datetime.utcnow(), level="INFO", source="replica-test", message="Only on the replica.",
+        ))
+    monkeypatch.setattr(
+        database, "replica_session", async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    yield
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_use_replica(client, replica):
+    response = await client.get("/api/logs?source=replica-test")
+    assert [log["message"] for log in response.json()] == ["Only on the replica."]
+
+
+@pytest.mark.asyncio
+async def test_reads_fall_back_to_primary_after_write(client, replica):
+    response = await client.post("/api/tickets", json={"title": "Replica routing test"})
+    assert response.status_code == 201
+    ticket_id = response.json()["id"]
+    cookie = response.headers["set-cookie"]
+    assert cookie.startswith(f"{database.LAST_WRITE_COOKIE}=")
+    last_write = cookie.split(";")[0]
+    client.cookies.clear()
+
+    # Without the cookie the read goes to the replica, which never saw the write
+    response = await client.get(f"/api/tickets/{ticket_id}")
+    assert response.status_code == 404
+
+    response = await client.get(f"/api/tickets/{ticket_id}", headers={"Cookie": last_write})
+    assert response.status_code == 200
+
+    response = await client.get("/api/logs?source=replica-test", headers={"Cookie": last_write})
+    assert response.json() == []
+
+    await client.delete(f"/api/tickets/{ticket_id}")
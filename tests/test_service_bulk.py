@@ -0,0 +1,160 @@
+"""Tests for service groups, tags and bulk create/update/delete/check."""
+
+import json
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from app.config import settings
+from app.main import app
+from app.routers import services as services_router
+from app.services import health_checker
+from app.services.alerting import AlertManager, ConsecutiveFailures
+from app.services.check_policy import CircuitBreaker
+from benchmarks.targets import StandInHTTPServer
+
+GROUP = "bulk-test-dc"
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+        await ac.post("/api/services/bulk/delete", json={"group_name": GROUP})
+
+
+async def _create(client, count, url="http://127.0.0.1:1", **extra):
+    services = [{"name": f"bulk-{i:03d}", "url": url, "group_name": GROUP, **extra} for i in range(count)]
+    response = await client.post("/api/services/bulk", json={"services": services})
+    assert response.status_code == 201
+    return response.json()["ids"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_and_filter(client):
+    ids = await _create(client, 50, tags="Web, eu-west,web")
+    assert len(ids) == 50
+
+    services = (await client.get("/api/services", params={"group_name": GROUP})).json()
+    assert sorted(s["id"] for s in services) == ids
+    assert services[0]["tags"] == "web,eu-west"
+    assert len((await client.get("/api/services", params={"tag": "eu-west"})).json()) >= 50
+    # Tags match whole, not as substrings
+    partial = (await client.get("/api/services", params={"tag": "eu"})).json()
+    assert [s for s in partial if s["group_name"] == GROUP] == []
+
+    groups = (await client.get("/api/services/groups")).json()
+    group = next(g for g in groups if g["group_name"] == GROUP)
+    assert group["services"] == 50
+    assert group["statuses"] == {"unknown": 50}
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_is_all_or_nothing(client):
+    response = await client.post("/api/services/bulk", json={"services": [
+        {"name": "bulk-ok", "url": "http://127.0.0.1:1", "group_name": GROUP},
+        {"name": "bulk-bad", "url": "http://127.0.0.1:1", "group_name": GROUP, "parent_id": 999999999},
+    ]})
+    assert response.status_code == 400
+    assert (await client.get("/api/services", params={"group_name": GROUP})).json() == []
+
+    response = await client.post("/api/services/bulk", json={"services": [
+        {"name": "bulk-bad", "url": "http://127.0.0.1:1", "tags": "no spaces allowed"},
+    ]})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_and_tags(client):
+    ids = await _create(client, 10, tags="web")
+
+    response = await client.patch("/api/services/bulk", json={
+        "ids": ids[:4], "changes": {"is_active": False}, "add_tags": "maintenance", "remove_tags": "web",
+    })
+    assert response.json() == {"updated": 4}
+
+    services = {s["id"]: s for s in (await client.get("/api/services", params={"group_name": GROUP})).json()}
+    assert [services[i]["is_active"] for i in ids[:5]] == [False] * 4 + [True]
+    assert services[ids[0]]["tags"] == "maintenance"
+    assert services[ids[5]]["tags"] == "web"
+
+    response = await client.patch("/api/services/bulk", json={"tag": "maintenance", "changes": {"parent_id": ids[0]}})
+    assert response.status_code == 400  # ids[0] can't be its own parent
+    assert "cycle" in response.text
+
+    assert (await client.patch("/api/services/bulk", json={"group_name": GROUP})).status_code == 400
+    assert (await client.patch("/api/services/bulk", json={"changes": {"is_active": True}})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_detaches_dependents(client):
+    ids = await _create(client, 3)
+    child = (await client.post("/api/services", json={
+        "name": "bulk-child", "url": "http://127.0.0.1:1", "parent_id": ids[0],
+    })).json()
+    try:
+        response = await client.post("/api/services/bulk/delete", json={"group_name": GROUP})
+        assert response.json() == {"deleted": 3}
+        assert (await client.get(f"/api/services/{child['id']}")).json()["parent_id"] is None
+    finally:
+        await client.delete(f"/api/services/{child['id']}")
+
+
+@pytest.mark.asyncio
+async def test_bulk_check_streams_results(client):
+    server = await StandInHTTPServer().start()
+    try:
+        online = await _create(client, 5, url=server.url, tags="up")
+        offline = await _create(client, 2, tags="down")
+
+        async with client.stream("POST", "/api/services/bulk/check", json={"group_name": GROUP}) as response:
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            lines = [json.loads(line) async for line in response.aiter_lines() if line]
+    finally:
+        await server.stop()
+
+    results, summary = lines[:-1], lines[-1]
+    assert sorted(r["id"] for r in results) == sorted(online + offline)
+    assert {r["status"] for r in results if r["id"] in online} == {"online"}
+    assert summary == {
+        "done": True, "checked": 7, "statuses": {"online": 5, "offline": 2}, "remote": 0, "skipped_by_breaker": 0,
+    }
+
+    # Results were saved
+    services = (await client.get("/api/services", params={"tag": "down"})).json()
+    assert {s["status"] for s in services if s["group_name"] == GROUP} == {"offline"}
+    assert (await client.post("/api/services/bulk/check", json={})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_check_uses_the_check_pipeline(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "test-admin-token")
+    monkeypatch.setattr(settings, "CHECK_RETRY_BACKOFF_MS", 0)
+    breaker = CircuitBreaker(threshold=1, base_cooldown=3600)
+    alerts = AlertManager([ConsecutiveFailures(1)])
+    monkeypatch.setattr(services_router, "breaker", breaker)
+    monkeypatch.setattr(health_checker, "alert_manager", alerts)
+    admin = {"X-Admin-Token": "test-admin-token"}
+    agent = (await client.post("/api/agents", json={"name": "bulk-check-agent"}, headers=admin)).json()
+    server = await StandInHTTPServer().start()
+    try:
+        online, tripped = await _create(client, 2, url=server.url)
+        down, = await _create(client, 1)
+        remote, = await _create(client, 1, url=server.url, agent_id=agent["id"])
+        breaker.record(tripped, False)
+
+        response = await client.post("/api/services/bulk/check", json={"group_name": GROUP})
+        lines = [json.loads(line) for line in response.text.splitlines()]
+
+        # Agent-assigned services and open circuits aren't probed
+        assert sorted(r["id"] for r in lines[:-1]) == [online, down]
+        assert lines[-1]["remote"] == 1 and lines[-1]["skipped_by_breaker"] == 1
+        # The failure was recorded on the breaker and raised an alert, like a background check
+        assert not breaker.allow(down)
+        assert list(alerts.open_incidents) == [down]
+    finally:
+        await server.stop()
+        await client.post("/api/services/bulk/delete", json={"group_name": GROUP})
+        await client.delete(f"/api/agents/{agent['id']}", headers=admin)
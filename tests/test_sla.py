@@ -0,0 +1,262 @@
+"""Tests for status-interval recording, monthly SLA summaries and the report endpoint."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import Base, build_engine
+from app.main import app
+from app.models.sla import ServiceStatusInterval, SlaMonth
+from app.services import sla
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path, monkeypatch):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'sla.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(sla, "async_session", factory)
+    monkeypatch.setattr(sla, "_open", set())
+    monkeypatch.setattr(sla, "_rolled_through", None)
+    yield factory
+    await engine.dispose()
+
+
+def _interval(service_id, status, start, end, failure=False):
+    return ServiceStatusInterval(service_id=service_id, status=status, started_at=start, ended_at=end,
+                                 failure=failure)
+
+
+def _history(service_id, *runs):
+    """Intervals for consecutive (status, start, end) runs, recorded the way the health checker does."""
+    rows, previous = [], None
+    for status, start, end in runs:
+        failure = status in sla.DOWN_STATUSES and previous not in sla.DOWN_STATUSES
+        rows += [ServiceStatusInterval(**row) for row in sla.split_by_month(service_id, status, start, end, failure)]
+        previous = status
+    return rows
+
+
+JAN, FEB, MAR, APR = (datetime(2024, m, 1) for m in (1, 2, 3, 4))
+
+
+async def _seed_history(session):
+    # Service 1: up all of January except two one-hour outages; down across the Feb/Mar boundary
+    session.add_all(_history(
+        1,
+        ("online", JAN, JAN + timedelta(days=10)),
+        ("offline", JAN + timedelta(days=10), JAN + timedelta(days=10, hours=1)),
+        ("degraded", JAN + timedelta(days=10, hours=1), JAN + timedelta(days=20)),
+        ("unreachable", JAN + timedelta(days=20), JAN + timedelta(days=20, hours=1)),
+        ("online", JAN + timedelta(days=20, hours=1), MAR - timedelta(hours=2)),
+        ("offline", MAR - timedelta(hours=2), MAR + timedelta(hours=2)),
+        ("online", MAR + timedelta(hours=2), APR),
+    ))
+    # Service 2: only observed from mid-January, never down
+    session.add_all(_history(2, ("unknown", JAN, JAN + timedelta(days=15)), ("online", JAN + timedelta(days=15), APR)))
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_totals_from_intervals(session_factory):
+    async with session_factory() as session:
+        await _seed_history(session)
+        january = await sla.scan_intervals(session, JAN, FEB)
+
+    one = january[1].to_dict()
+    assert one["observed_seconds"] == 31 * 86400
+    assert one["downtime_seconds"] == 2 * 3600
+    assert one["failures"] == 2
+    assert one["mttr_seconds"] == 3600
+    assert one["mtbf_seconds"] == (31 * 86400 - 2 * 3600) // 2
+    assert one["uptime_pct"] == round((31 * 86400 - 7200) / (31 * 86400) * 100, 4)
+
+    # Unknown time isn't observed
+    assert january[2].observed == pytest.approx(16 * 86400)
+    assert january[2].to_dict()["uptime_pct"] == 100.0
+    assert january[2].to_dict()["mtbf_seconds"] is None
+
+
+@pytest.mark.asyncio
+async def test_outage_spanning_months_counts_once(session_factory):
+    async with session_factory() as session:
+        await _seed_history(session)
+        totals = await sla.compute(FEB, APR, service_id=1)
+        march = await sla.scan_intervals(session, MAR, APR, service_id=1)
+
+    assert totals[1].failures == 1
+    assert totals[1].down == pytest.approx(4 * 3600)
+    # The outage started in February; March only carries its tail
+    assert march[1].failures == 0
+    assert march[1].down == pytest.approx(2 * 3600)
+
+
+@pytest.mark.asyncio
+async def test_closed_months_are_summarised_once(session_factory):
+    async with session_factory() as session:
+        await _seed_history(session)
+        # Mid-January to mid-March: one cached month (February) plus two scanned edges
+        start, end = JAN + timedelta(days=15), MAR + timedelta(days=15)
+        first = await sla.compute(start, end)
+        assert (await session.execute(select(SlaMonth.month))).scalars().all() == [FEB]
+
+        # Rewriting February's raw history doesn't change the cached month
+        await session.execute(
+            update(ServiceStatusInterval).where(ServiceStatusInterval.service_id == 2).values(status="offline")
+        )
+        await session.commit()
+        second = await sla.compute(FEB, MAR)
+        scanned = await sla.scan_intervals(session, FEB, MAR)
+
+    assert second[2].down == 0
+    assert scanned[2].down == pytest.approx(29 * 86400)
+    assert first[1].failures == 2  # Jan 20 and the Feb/Mar outage
+    assert first[2].observed == pytest.approx((end - start).total_seconds())
+
+
+@pytest.mark.asyncio
+async def test_record_statuses_is_run_length_encoded(session_factory):
+    t0 = datetime(2024, 5, 1)
+    async with session_factory() as session:
+        await sla.record_statuses(session, {1: "online", 2: "online"}, {1: "unknown", 2: "online"}, t0)
+        for minute in range(1, 30):
+            await sla.record_statuses(session, {1: "online", 2: "online"}, {1: "online", 2: "online"},
+                                      t0 + timedelta(minutes=minute))
+        await sla.record_statuses(session, {1: "offline", 2: "online"}, {1: "online", 2: "online"},
+                                  t0 + timedelta(minutes=30))
+        await session.commit()
+
+        rows = (await session.execute(
+            select(ServiceStatusInterval).order_by(ServiceStatusInterval.service_id, ServiceStatusInterval.started_at)
+        )).scalars().all()
+
+    assert [(r.service_id, r.status, r.ended_at) for r in rows] == [
+        (1, "online", t0 + timedelta(minutes=30)),
+        (1, "offline", None),
+        (2, "online", None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_open_intervals_roll_over_month_boundaries(session_factory):
+    async with session_factory() as session:
+        session.add(_interval(1, "offline", JAN + timedelta(days=15), None, failure=True))
+        await session.commit()
+        await sla.record_statuses(session, {1: "offline"}, {1: "offline"}, MAR + timedelta(days=9))
+        await session.commit()
+
+        rows = (await session.execute(
+            select(ServiceStatusInterval.started_at, ServiceStatusInterval.ended_at)
+            .order_by(ServiceStatusInterval.started_at)
+        )).all()
+        totals = await sla.scan_intervals(session, JAN, MAR + timedelta(days=9))
+
+    assert rows == [(JAN + timedelta(days=15), FEB), (FEB, MAR), (MAR, None)]
+    # Still one outage, not one per month
+    assert totals[1].failures == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_roll_overs_cut_each_interval_once(session_factory):
+    async with session_factory() as session:
+        session.add(_interval(1, "offline", JAN + timedelta(days=15), None, failure=True))
+        await session.commit()
+
+    # The health checker and a report request both reach the boundary
+    async with session_factory() as first, session_factory() as second:
+        await asyncio.gather(sla.roll_over(first, MAR), sla.roll_over(second, MAR))
+        await first.commit()
+        await second.commit()
+
+    async with session_factory() as session:
+        # Another process that read the stale interval before the rollover committed
+        rows = sla.split_by_month(1, "offline", JAN + timedelta(days=15), MAR, True)
+        await session.execute(sla._insert_intervals(session), rows)
+        await session.commit()
+        started = (await session.execute(
+            select(ServiceStatusInterval.started_at).order_by(ServiceStatusInterval.started_at)
+        )).scalars().all()
+    assert started == [JAN + timedelta(days=15), FEB, MAR]
+
+
+@pytest.mark.asyncio
+async def test_uncommitted_writes_leave_the_caches_alone(session_factory):
+    async with session_factory() as session:
+        session.add(_interval(1, "offline", JAN + timedelta(days=15), None, failure=True))
+        await session.commit()
+
+    async with session_factory() as session:
+        await sla.record_statuses(session, {1: "offline", 2: "online"}, {1: "offline"}, MAR)
+        assert sla._open == {1, 2} and sla._rolled_through == MAR
+        await session.rollback()
+    assert sla._open == set() and sla._rolled_through is None
+
+    # A session closed without committing counts as rolled back too
+    async with session_factory() as session:
+        await sla.record_statuses(session, {1: "offline", 2: "online"}, {1: "offline"}, MAR)
+    assert sla._open == set() and sla._rolled_through is None
+
+    # so the next cycle still rolls over and opens the intervals
+    async with session_factory() as session:
+        await sla.record_statuses(session, {1: "offline", 2: "online"}, {1: "offline"}, MAR)
+        await session.commit()
+        started = (await session.execute(
+            select(ServiceStatusInterval.service_id, ServiceStatusInterval.started_at)
+            .where(ServiceStatusInterval.ended_at.is_(None))
+            .order_by(ServiceStatusInterval.service_id)
+        )).all()
+    assert started == [(1, MAR), (2, MAR)]
+    assert sla._open == {1, 2} and sla._rolled_through == MAR
+
+
+@pytest.mark.asyncio
+async def test_record_statuses_resumes_open_intervals(session_factory):
+    t0 = datetime(2024, 5, 1)
+    async with session_factory() as session:
+        session.add(_interval(1, "online", t0, None))
+        await session.commit()
+        # A fresh process doesn't know about the open interval yet
+        await sla.record_statuses(session, {1: "online"}, {1: "online"}, t0 + timedelta(hours=1))
+        await session.commit()
+        count = await session.scalar(select(func.count()).select_from(ServiceStatusInterval))
+    assert count == 1
+
+
+@pytest.mark.asyncio
+async def test_sla_report_endpoint(client):
+    service = (await client.post("/api/services", json={"name": "sla-probe", "url": "http://127.0.0.1:1"})).json()
+    try:
+        response = await client.post(f"/api/services/{service['id']}/check")
+        assert response.json()["status"] == "offline"
+
+        response = await client.get("/api/reports/sla", params={"service_id": service["id"], "group_by": "check_type"})
+        assert response.status_code == 200
+        report = response.json()
+        assert [s["name"] for s in report["services"]] == ["sla-probe"]
+        assert report["services"][0]["failures"] == 1
+        assert report["groups"][0]["group"] == "http"
+
+        response = await client.get("/api/reports/sla", params={"month": "2020-01", "group_by": "dependency"})
+        assert response.status_code == 200
+        assert response.json()["overall"]["uptime_pct"] is None
+
+        assert (await client.get("/api/reports/sla", params={"month": "2020-1"})).status_code == 422
+        assert (await client.get("/api/reports/sla", params={
+            "start": "2024-02-01T00:00:00", "end": "2024-01-01T00:00:00",
+        })).status_code == 400
+        assert (await client.get("/api/reports/sla", params={"service_id": 999999999})).status_code == 404
+    finally:
+        await client.delete(f"/api/services/{service['id']}")
@@ -0,0 +1,72 @@
+"""Tests for cold start: deferred imports, startup modes and time to first request."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Budget for a fast-mode boot, from interpreter start to the first response
+FIRST_REQUEST_BUDGET_SECONDS = 5.0
+
+FIRST_REQUEST_SCRIPT = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+from app.main import app
+from app.services import startup
+deferred_at_import = [name for name in startup.DEFERRED_MODULES if name in sys.modules]
+
+async def first_request():
+    messages = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        messages.append(message)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/health", "raw_path": b"/health", "query_string": b"",
+        "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    async with app.router.lifespan_context(app):
+        await app(scope, receive, send)
+        return messages[0]["status"], time.perf_counter() - start
+
+status, elapsed = asyncio.run(first_request())
+print(json.dumps({
+    "status": status, "elapsed": elapsed, "deferred_at_import": deferred_at_import,
+    "timings": startup.timer.to_dict(),
+}))
+"""
+
+
+def _boot(tmp_path, mode: str) -> dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'startup.db'}",
+        "STARTUP_MODE": mode,
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST_SCRIPT],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_fast_mode_time_to_first_request(tmp_path):
+    report = _boot(tmp_path, "fast")
+    assert report["status"] == 200
+    assert report["elapsed"] < FIRST_REQUEST_BUDGET_SECONDS
+    assert report["deferred_at_import"] == []
+
+    phases = report["timings"]["phases"]
+    assert "schema" not in phases and "seed" not in phases
+    assert {"import", "pool_warmup", "templates", "total"} <= phases.keys()
+
+
+def test_full_mode_creates_schema_and_seeds(tmp_path):
+    report = _boot(tmp_path, "full")
+    assert report["status"] == 200
+    assert {"schema", "seed"} <= report["timings"]["phases"].keys()
@@ -0,0 +1,81 @@
+"""Tests for similar-ticket and knowledge-article suggestions."""
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.services.suggestions import TextIndex, tokenize
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+def test_index_ranks_updates_and_removes():
+    index = TextIndex()
+    index.add(1, "VPN client drops connection every hour", {"title": "vpn"})
+    index.add(2, "Printer on floor 3 is out of toner", {"title": "printer"})
+    index.add(3, "VPN connection refused after password change", {"title": "vpn2"})
+
+    terms = tokenize("The VPN drops the connection")
+    assert terms == ["vpn", "drops", "connection"]
+    assert [doc for doc, _ in index.search(terms, 5)] == [1, 3]
+    assert [doc for doc, _ in index.search(terms, 5, exclude=1)] == [3]
+
+    # Re-adding replaces the old text; removing drops every posting
+    index.add(1, "Printer jams on floor 3", {"title": "printer2"})
+    assert [doc for doc, _ in index.search(terms, 5)] == [3]
+    index.remove(3)
+    index.remove(3)
+    assert index.search(terms, 5) == []
+    assert len(index) == 2
+    assert [doc for doc, _ in index.search(tokenize("printer floor toner"), 1)] == [2]
+
+
+@pytest.mark.asyncio
+async def test_create_response_and_endpoints_suggest_similar_items(client):
+    article = (await client.post("/api/knowledge", json={
+        "title": "Fixing quokkaflux replication lag",
+        "content": "Restart the quokkaflux replica and clear its relay log.",
+        "tags": "quokkaflux,replication",
+    })).json()
+    earlier = (await client.post("/api/tickets", json={
+        "title": "Quokkaflux replication lag on db-7",
+        "description": "Replica is minutes behind the primary.",
+    })).json()
+    created = [earlier]
+    try:
+        assert earlier["suggestions"]["articles"][0]["id"] == article["id"]
+
+        ticket = (await client.post("/api/tickets", json={
+            "title": "Replication lag again",
+            "description": "quokkaflux replica on db-9 is behind",
+        })).json()
+        created.append(ticket)
+        similar = ticket["suggestions"]["tickets"]
+        assert similar[0] == {**similar[0], "id": earlier["id"], "status": "open"}
+        assert ticket["id"] not in [t["id"] for t in similar]
+        assert ticket["suggestions"]["articles"][0]["title"] == article["title"]
+
+        response = await client.get(f"/api/tickets/{ticket['id']}/suggestions", params={"k": 1})
+        assert [t["id"] for t in response.json()["tickets"]] == [earlier["id"]]
+        assert (await client.get("/api/tickets/999999999/suggestions")).status_code == 404
+
+        # Edits and deletions are reflected straight away
+        await client.put(f"/api/tickets/{earlier['id']}", json={"status": "resolved"})
+        found = (await client.get("/api/tickets/suggestions", params={"q": "quokkaflux lag"})).json()
+        assert {t["id"]: t["status"] for t in found["tickets"]}[earlier["id"]] == "resolved"
+
+        await client.delete(f"/api/knowledge/{article['id']}")
+        await client.delete(f"/api/tickets/{earlier['id']}")
+        found = (await client.get("/api/tickets/suggestions", params={"q": "quokkaflux lag"})).json()
+        assert [t["id"] for t in found["tickets"]] == [ticket["id"]]
+        assert article["id"] not in [a["id"] for a in found["articles"]]
+    finally:
+        await client.delete(f"/api/knowledge/{article['id']}")
+        for t in created:
+            await client.delete(f"/api/tickets/{t['id']}")
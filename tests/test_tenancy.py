@@ -0,0 +1,140 @@
+"""Tests for tenant isolation across the API and the live feed."""
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from app import tenancy
+from app.config import settings
+from app.main import app
+from app.routers import websocket
+
+PROXY_TOKEN = "test-proxy-token"
+ACME = {"X-Tenant": "acme", "X-Tenant-Proxy-Token": PROXY_TOKEN}
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    monkeypatch.setattr(settings, "TENANT_PROXY_TOKEN", PROXY_TOKEN)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_rows_are_only_visible_to_their_tenant(client):
+    service = (await client.post("/api/services", json={
+        "name": "Acme Gateway", "url": "http://acme.invalid", "group_name": "acme-dc",
+    }, headers=ACME)).json()
+    ticket = (await client.post("/api/tickets", json={
+        "title": "Wobblefrost printer offline", "description": "Acme floor 2",
+    }, headers=ACME)).json()
+    try:
+        assert service["tenant"] == ticket["tenant"] == "acme"
+
+        acme_services = (await client.get("/api/services", headers=ACME)).json()
+        assert [s["id"] for s in acme_services] == [service["id"]]
+        assert service["id"] not in [s["id"] for s in (await client.get("/api/services")).json()]
+        assert (await client.get(f"/api/services/{service['id']}")).status_code == 404
+        assert (await client.delete(f"/api/tickets/{ticket['id']}")).status_code == 404
+
+        groups = (await client.get("/api/services/groups")).json()
+        assert "acme-dc" not in str(groups)
+
+        # Another tenant's ticket is neither searched nor suggested
+        found = (await client.get("/api/tickets/search", params={"q": "wobblefrost"})).json()
+        assert found["total"] == 0
+        found = (await client.get("/api/tickets/search", params={"q": "wobblefrost"}, headers=ACME)).json()
+        assert [t["id"] for t in found["results"]] == [ticket["id"]]
+        suggested = (await client.get("/api/tickets/suggestions", params={"q": "wobblefrost printer"})).json()
+        assert ticket["id"] not in [t["id"] for t in suggested["tickets"]]
+
+        # A parent must belong to the same tenant
+        response = await client.post("/api/services", json={
+            "name": "Default child", "url": "http://child.invalid", "parent_id": service["id"],
+        })
+        assert response.status_code == 400
+
+        # Cached list responses differ per tenant
+        default_list = await client.get("/api/services")
+        acme_list = await client.get("/api/services", headers=ACME)
+        assert default_list.headers["etag"] != acme_list.headers["etag"]
+        assert "X-Tenant" in acme_list.headers["vary"]
+    finally:
+        await client.delete(f"/api/tickets/{ticket['id']}", headers=ACME)
+        await client.delete(f"/api/services/{service['id']}", headers=ACME)
+
+
+@pytest.mark.asyncio
+async def test_invalid_and_unknown_tenants_are_rejected(client, monkeypatch):
+    response = await client.get("/api/services", headers={**ACME, "X-Tenant": "no spaces!"})
+    assert response.status_code == 400
+    assert response.text == "Invalid tenant name"
+
+    monkeypatch.setattr(tenancy, "ALLOWED", {"acme"})
+    assert (await client.get("/api/services", headers={**ACME, "X-Tenant": "globex"})).status_code == 403
+    assert (await client.get("/api/services", headers=ACME)).status_code == 200
+    # The allow-list covers the default tenant too
+    assert (await client.get("/api/services")).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_tenant_header_requires_the_proxy_token(client, monkeypatch):
+    response = await client.get("/api/services", headers={"X-Tenant": "acme"})
+    assert (response.status_code, response.text) == (401, "Invalid tenant proxy token")
+    response = await client.get("/api/services", headers={**ACME, "X-Tenant-Proxy-Token": "guess"})
+    assert response.status_code == 401
+    response = await client.get("/api/services", headers={**ACME, "X-Tenant-Proxy-Token": "tökén".encode()})
+    assert response.status_code == 401
+
+    # Without a configured proxy, X-Tenant is never trusted
+    monkeypatch.setattr(settings, "TENANT_PROXY_TOKEN", "")
+    assert (await client.get("/api/services", headers=ACME)).status_code == 403
+    assert (await client.get("/api/services")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_service_quota(client, monkeypatch):
+    monkeypatch.setattr(settings, "TENANT_MAX_SERVICES", 2)
+    headers = {**ACME, "X-Tenant": "quota-test"}
+    created = []
+    try:
+        response = await client.post("/api/services/bulk", json={"services": [
+            {"name": f"svc-{i}", "url": f"http://svc-{i}.invalid"} for i in range(3)
+        ]}, headers=headers)
+        assert response.status_code == 403
+
+        for i in range(2):
+            response = await client.post("/api/services", json={
+                "name": f"svc-{i}", "url": f"http://svc-{i}.invalid",
+            }, headers=headers)
+            created.append(response.json()["id"])
+        response = await client.post("/api/services", json={"name": "one more", "url": "http://x.invalid"},
+                                     headers=headers)
+        assert response.status_code == 403
+        assert "quota" in response.text
+        # The rejected batch inserted nothing
+        assert len((await client.get("/api/services", headers=headers)).json()) == 2
+    finally:
+        for service_id in created:
+            await client.delete(f"/api/services/{service_id}", headers=headers)
+
+
+class FakeSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def send_text(self, message: str):
+        self.messages.append(message)
+
+
+@pytest.mark.asyncio
+async def test_events_reach_only_their_tenant(monkeypatch):
+    default, acme = FakeSocket(), FakeSocket()
+    monkeypatch.setattr(websocket, "connected_clients", {"default": [default], "acme": [acme]})
+
+    await websocket.broadcast_event({"type": "ping"}, "acme")
+    await websocket.broadcast_event({"type": "pong"})
+    await websocket.broadcast_event({"type": "nobody"}, "globex")
+    assert acme.messages == ['{"type": "ping"}']
+    assert default.messages == ['{"type": "pong"}']
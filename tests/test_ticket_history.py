@@ -0,0 +1,86 @@
+"""Tests for the ticket audit history, timelines and the activity feed."""
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import delete, select
+
+from app.database import async_session
+from app.main import app
+from app.models.ticket import Ticket, TicketEvent
+from app.services.alerting import AlertManager, ConsecutiveFailures
+from app.services.incident_tickets import TicketSink
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_updates_record_field_level_diffs(client):
+    ticket = (await client.post("/api/tickets", json={"title": "History probe", "priority": "low"},
+                                headers={"X-Actor": "alice"})).json()
+    tid = ticket["id"]
+    try:
+        await client.put(f"/api/tickets/{tid}", json={"priority": "high", "assigned_to": "bob"},
+                         headers={"X-Actor": "alice"})
+        # Setting the same values again changes nothing and records nothing
+        await client.put(f"/api/tickets/{tid}", json={"priority": "high"}, headers={"X-Actor": "alice"})
+        await client.put(f"/api/tickets/{tid}", json={"status": "resolved"}, headers={"X-Actor": "bob"})
+
+        timeline = (await client.get(f"/api/tickets/{tid}/history")).json()
+        events = timeline["events"]
+        assert [e["kind"] for e in events] == ["updated", "updated", "created"]
+        assert timeline["next_before"] is None
+        assert events[0] == {**events[0], "actor": "bob", "changes": {"status": ["open", "resolved"]}}
+        assert events[1]["changes"] == {"priority": ["low", "high"], "assigned_to": [None, "bob"]}
+        assert events[2]["changes"]["title"] == [None, "History probe"]
+
+        # Keyset pages: one event at a time, newest first
+        seen, before = [], None
+        while True:
+            params = {"limit": 1, **({"before": before} if before else {})}
+            page = (await client.get(f"/api/tickets/{tid}/history", params=params)).json()
+            seen += [e["id"] for e in page["events"]]
+            before = page["next_before"]
+            if before is None:
+                break
+        assert seen == [e["id"] for e in events]
+
+        feed = (await client.get("/api/tickets/activity", params={"actor": "alice", "limit": 500})).json()
+        assert [e["kind"] for e in feed["events"] if e["ticket_id"] == tid] == ["updated", "created"]
+    finally:
+        await client.delete(f"/api/tickets/{tid}", headers={"X-Actor": "carol"})
+
+    # The history outlives the ticket
+    timeline = (await client.get(f"/api/tickets/{tid}/history")).json()
+    assert timeline["events"][0]["kind"] == "deleted"
+    assert timeline["events"][0]["actor"] == "carol"
+    assert (await client.get("/api/tickets/999999999/history")).status_code == 404
+    assert (await client.get("/api/tickets/activity", params={"kind": "bogus"})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_incident_tickets_are_audited():
+    service_id = 900_501
+    fingerprint = f"service:{service_id}"
+    manager = AlertManager([ConsecutiveFailures(1)], sinks=[TicketSink(update_interval=0)])
+    try:
+        await manager.deliver(manager.observe(service_id, "Edge Router", "offline", None))
+        await manager.deliver(manager.observe(service_id, "Edge Router", "online", 12.0))
+
+        async with async_session() as session:
+            ticket = (await session.execute(select(Ticket).where(Ticket.fingerprint == fingerprint))).scalar_one()
+            events = (await session.execute(
+                select(TicketEvent).where(TicketEvent.ticket_id == ticket.id).order_by(TicketEvent.id)
+            )).scalars().all()
+        assert [(e.kind, e.actor) for e in events] == [("created", "system:alerting"), ("updated", "system:alerting")]
+        assert events[1].changes["status"] == ["open", "resolved"]
+        assert "[RESOLVED]" in events[1].changes["description"][1]
+    finally:
+        async with async_session() as session:
+            await session.execute(delete(Ticket).where(Ticket.fingerprint == fingerprint))
+            await session.commit()
@@ -0,0 +1,191 @@
+"""Tests for ticket SLA timers, the deadline heap and escalations."""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import Base, build_engine
+from app.main import app
+from app.models.log_entry import LogEntry
+from app.models.ticket import Ticket
+from app.services import ticket_sla
+from app.services.ticket_sla import SlaScheduler
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path, monkeypatch):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'tickets.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(ticket_sla, "async_session", factory)
+    yield factory
+    await engine.dispose()
+
+
+T0 = datetime(2024, 6, 3, 9, 0)
+
+
+def _ticket(priority="high", created_at=T0, **fields):
+    ticket = Ticket(title=f"{priority} ticket", priority=priority, status="open", created_at=created_at,
+                    response_breached=False, resolution_breached=False, escalation_level=0, **fields)
+    ticket_sla.apply_timers(ticket, created_at)
+    return ticket
+
+
+def test_timers_follow_priority_and_status():
+    ticket = _ticket("high")
+    assert ticket.response_due_at == T0 + timedelta(minutes=60)
+    assert ticket.resolution_due_at == T0 + timedelta(minutes=480)
+    assert ticket.next_due_at == ticket.response_due_at
+
+    # Responding stops the response timer; the resolution deadline is next
+    ticket.status = "in_progress"
+    ticket_sla.apply_timers(ticket, T0 + timedelta(minutes=5))
+    assert ticket.responded_at == T0 + timedelta(minutes=5)
+    assert ticket.next_due_at == T0 + timedelta(minutes=480)
+
+    # A priority change moves deadlines relative to when the ticket was opened
+    ticket.priority = "critical"
+    ticket_sla.apply_timers(ticket, T0 + timedelta(minutes=10), priority_changed=True)
+    assert ticket.next_due_at == T0 + timedelta(minutes=240)
+
+    ticket.status = "resolved"
+    ticket_sla.apply_timers(ticket, T0 + timedelta(minutes=30))
+    assert ticket.next_due_at is None
+
+
+def test_heap_skips_superseded_deadlines():
+    scheduler = SlaScheduler()
+    scheduler.schedule(1, T0 + timedelta(minutes=30))
+    scheduler.schedule(2, T0 + timedelta(minutes=10))
+    scheduler.schedule(1, T0 + timedelta(minutes=5))  # moved earlier
+    scheduler.schedule(3, T0 + timedelta(minutes=1))
+    scheduler.forget(3)
+
+    assert scheduler.next_due() == T0 + timedelta(minutes=5)
+    assert scheduler.pop_due(T0 + timedelta(minutes=20)) == [1, 2]
+    assert scheduler.next_due() is None
+
+
+@pytest.mark.asyncio
+async def test_breach_escalates_once(session_factory, monkeypatch):
+    monkeypatch.setattr(ticket_sla, "ESCALATION_CHAIN", ["team-lead", "ops-manager"])
+    async with session_factory() as session:
+        late = _ticket("medium", assigned_to="alice")
+        answered = _ticket("medium")
+        answered.status = "in_progress"
+        ticket_sla.apply_timers(answered, T0 + timedelta(minutes=1))
+        session.add_all([late, answered])
+        await session.commit()
+
+    scheduler = SlaScheduler()
+    async with session_factory() as session:
+        await scheduler.load(session)
+    assert scheduler.next_due() == T0 + timedelta(minutes=240)
+
+    # Nothing is due yet
+    assert await scheduler.fire_due(T0 + timedelta(minutes=239)) == []
+
+    events = await scheduler.fire_due(T0 + timedelta(minutes=241))
+    assert [e["data"]["id"] for e in events] == [late.id]
+    assert events[0]["type"] == "ticket_sla_breach"
+    assert events[0]["data"]["timers"] == ["response"]
+
+    async with session_factory() as session:
+        ticket = await session.get(Ticket, late.id)
+        assert (ticket.priority, ticket.assigned_to, ticket.escalation_level) == ("high", "team-lead", 1)
+        assert ticket.response_breached and not ticket.resolution_breached
+        assert ticket.next_due_at == T0 + timedelta(minutes=1440)
+        logs = (await session.execute(select(LogEntry.message).where(LogEntry.source == "ticket-sla"))).scalars().all()
+    assert logs == [f"Ticket #{late.id} breached its response SLA; escalated to high. Reassigned to team-lead."]
+
+    # Already breached: firing again at the same time does nothing
+    assert await scheduler.fire_due(T0 + timedelta(minutes=241)) == []
+    events = await scheduler.fire_due(T0 + timedelta(days=2))
+    assert sorted((e["data"]["id"], e["data"]["assigned_to"]) for e in events) == [
+        (late.id, "ops-manager"), (answered.id, "team-lead"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stale_heap_entry_rechecks_the_row(session_factory):
+    async with session_factory() as session:
+        ticket = _ticket("critical")
+        session.add(ticket)
+        await session.commit()
+
+    scheduler = SlaScheduler()
+    scheduler.schedule(ticket.id, ticket.next_due_at)
+    # Another process resolved the ticket in the meantime
+    async with session_factory() as session:
+        row = await session.get(Ticket, ticket.id)
+        row.status = "resolved"
+        ticket_sla.apply_timers(row, T0 + timedelta(minutes=5))
+        await session.commit()
+
+    assert await scheduler.fire_due(T0 + timedelta(hours=1)) == []
+    assert scheduler.next_due() is None
+
+
+@pytest.mark.asyncio
+async def test_failed_escalation_reloads_the_heap(session_factory, monkeypatch):
+    async with session_factory() as session:
+        ticket = _ticket("critical")
+        session.add(ticket)
+        await session.commit()
+
+    scheduler = SlaScheduler()
+    async with session_factory() as session:
+        await scheduler.load(session)
+
+    async def broken_commit(self):
+        raise RuntimeError("database went away")
+
+    with monkeypatch.context() as m:
+        m.setattr(AsyncSession, "commit", broken_commit)
+        with pytest.raises(RuntimeError):
+            await scheduler.fire_due(T0 + timedelta(hours=1))
+    # The popped deadline is not lost: the heap is reloaded and the breach fires on the next pass
+    assert scheduler._stale
+    async with session_factory() as session:
+        await scheduler.load(session)
+    events = await scheduler.fire_due(T0 + timedelta(hours=1))
+    assert [e["data"]["id"] for e in events] == [ticket.id]
+
+
+@pytest.mark.asyncio
+async def test_due_soon_endpoint(client):
+    ticket = (await client.post("/api/tickets", json={"title": "SLA probe ticket", "priority": "critical"})).json()
+    try:
+        assert ticket["response_due_at"] is not None
+        assert ticket["next_due_at"] == ticket["response_due_at"]
+
+        due = (await client.get("/api/tickets/due-soon", params={"within": 20})).json()
+        row = next(r for r in due if r["id"] == ticket["id"])
+        assert row["timer"] == "response"
+        assert row["overdue"] is False
+        assert all(r["due_at"] <= row["due_at"] for r in due[:due.index(row)])
+
+        # Not due within five minutes
+        due = (await client.get("/api/tickets/due-soon", params={"within": 5})).json()
+        assert ticket["id"] not in [r["id"] for r in due]
+
+        updated = (await client.put(f"/api/tickets/{ticket['id']}", json={"status": "in_progress"})).json()
+        assert updated["responded_at"] is not None
+        assert updated["next_due_at"] == updated["resolution_due_at"]
+        assert ticket_sla.scheduler._due[ticket["id"]].isoformat() == updated["next_due_at"]
+    finally:
+        await client.delete(f"/api/tickets/{ticket['id']}")
+    assert ticket["id"] not in ticket_sla.scheduler._due
@@ -20,6 +20,16 @@ async def test_list_tickets(client):
     assert isinstance(response.json(), list)
 
 
+@pytest.mark.asyncio
+async def test_list_tickets_columnar(client):
+    objects = (await client.get("/api/tickets")).json()
+    response = await client.get("/api/tickets?format=columnar")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["columns"][:2] == ["id", "title"]
+    assert [dict(zip(data["columns"], row)) for row in data["rows"]] == objects
+
+
 @pytest.mark.asyncio
 async def test_ticket_stats(client):
     response = await client.get("/api/tickets/stats")
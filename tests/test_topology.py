@@ -0,0 +1,177 @@
+"""Tests for the service dependency graph, suppressed checks and the impact API."""
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import Base, build_engine
+from app.main import app
+from app.models.service import MonitoredService
+from app.models.log_entry import LogEntry
+from app.services import health_checker, topology
+from app.services.alerting import AlertManager, ConsecutiveFailures
+from app.services.check_policy import CircuitBreaker
+from app.services.topology import ServiceGraph
+from benchmarks.targets import StandInHTTPServer, closed_port
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+def test_graph_levels_and_impact():
+    #   1 -> 2 -> 4
+    #     -> 3
+    #   5 (parent 99 doesn't exist, so it's a root)
+    graph = ServiceGraph({1: None, 2: 1, 3: 1, 4: 2, 5: 99})
+    assert [sorted(level) for level in graph.levels] == [[1, 5], [2, 3], [4]]
+    assert sorted(graph.descendants(1)) == [(2, 1), (3, 1), (4, 2)]
+    assert graph.ancestors(4) == [2, 1]
+    assert graph.would_cycle(1, 4)
+    assert graph.would_cycle(3, 3)
+    assert not graph.would_cycle(4, 3)
+    assert not graph.cyclic
+
+
+def test_graph_tolerates_cycles():
+    graph = ServiceGraph({1: None, 2: 3, 3: 2, 4: 3})
+    assert graph.cyclic == {2, 3, 4}
+    # Every service still gets checked exactly once
+    assert sorted(sid for level in graph.levels for sid in level) == [1, 2, 3, 4]
+    assert graph.ancestors(2) == [3]
+    assert sorted(graph.descendants(2)) == [(3, 1), (4, 2)]
+
+
+@pytest.mark.asyncio
+async def test_parent_validation_and_impact(client):
+    created = []
+
+    async def create(name, parent_id=None):
+        response = await client.post("/api/services", json={
+            "name": name, "url": "http://127.0.0.1:1", "parent_id": parent_id,
+        })
+        assert response.status_code == 201, response.text
+        created.append(response.json()["id"])
+        return response.json()["id"]
+
+    try:
+        router = await create("topo-router")
+        lb = await create("topo-lb", router)
+        app_id = await create("topo-app", lb)
+
+        response = await client.get(f"/api/services/{router}/impact")
+        assert response.status_code == 200
+        impact = response.json()
+        assert impact["impact_count"] == 2
+        assert impact["max_depth"] == 2
+        assert [(d["name"], d["depth"]) for d in impact["dependents"]] == [("topo-lb", 1), ("topo-app", 2)]
+
+        impact = (await client.get(f"/api/services/{app_id}/impact")).json()
+        assert [u["name"] for u in impact["upstream"]] == ["topo-lb", "topo-router"]
+        assert impact["impact_count"] == 0
+
+        response = await client.put(f"/api/services/{router}", json={"parent_id": app_id})
+        assert response.status_code == 400
+        assert "cycle" in response.text
+        response = await client.post("/api/services", json={
+            "name": "topo-orphan", "url": "http://127.0.0.1:1", "parent_id": 10**9,
+        })
+        assert response.status_code == 400
+
+        # Deleting a parent turns its dependents into roots
+        assert (await client.delete(f"/api/services/{lb}")).status_code == 200
+        created.remove(lb)
+        assert (await client.get(f"/api/services/{app_id}")).json()["parent_id"] is None
+        assert (await client.get(f"/api/services/{router}/impact")).json()["impact_count"] == 0
+        assert (await client.get("/api/services/999999999/impact")).status_code == 404
+    finally:
+        for service_id in created:
+            await client.delete(f"/api/services/{service_id}")
+
+
+@pytest.mark.asyncio
+async def test_dependents_of_offline_parent_are_not_probed(tmp_path, monkeypatch):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'topology.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(health_checker, "async_session", session_factory)
+    monkeypatch.setattr(health_checker, "breaker", CircuitBreaker(threshold=100))
+    alerts = AlertManager([ConsecutiveFailures(1)])
+    monkeypatch.setattr(health_checker, "alert_manager", alerts)
+    monkeypatch.setattr(settings, "CHECK_CONFIRM_RETRIES", 0)
+
+    target = await StandInHTTPServer().start()
+    try:
+        async with session_factory() as session:
+            router = MonitoredService(name="router", url=f"127.0.0.1:{closed_port()}", check_type="tcp")
+            session.add(router)
+            await session.flush()
+            session.add_all([MonitoredService(name=f"app-{i}", url=target.url, parent_id=router.id)
+                             for i in range(20)])
+            await session.commit()
+
+        await health_checker.run_health_checks()
+        report = dict(health_checker.last_cycle)
+        assert target.requests == 0
+
+        # Router recovers: its dependents are probed again
+        async with session_factory() as session:
+            service = (await session.execute(select(MonitoredService).where(MonitoredService.name == "router"))).scalar_one()
+            service.url = target.url
+            service.check_type = "http"
+            await session.commit()
+        await health_checker.run_health_checks()
+    finally:
+        await target.stop()
+
+    assert report["checked"] == 1
+    assert report["unreachable"] == 20
+    assert report["dependency_levels"] == 2
+    # One incident for the router, none for the suppressed dependents
+    assert [i.service_name for i in alerts.recent_incidents] == ["router"]
+    assert target.requests == 21
+
+    async with session_factory() as session:
+        statuses = set((await session.execute(select(MonitoredService.status))).scalars())
+    assert statuses == {"online"}
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_dependency_cycle_is_logged_once(tmp_path, monkeypatch):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'cycle.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(health_checker, "async_session", session_factory)
+    monkeypatch.setattr(health_checker, "alert_manager", AlertManager([]))
+    monkeypatch.setattr(topology, "_graphs", {})
+
+    target = await StandInHTTPServer().start()
+    try:
+        async with session_factory() as session:
+            a = MonitoredService(name="a", url=target.url, tenant="acme")
+            b = MonitoredService(name="b", url=target.url, tenant="acme")
+            session.add_all([a, b])
+            await session.flush()
+            a.parent_id, b.parent_id = b.id, a.id
+            await session.commit()
+
+        for _ in range(2):
+            await health_checker.run_health_checks()
+    finally:
+        await target.stop()
+
+    async with session_factory() as session:
+        logs = (await session.execute(
+            select(LogEntry.tenant, LogEntry.message).where(LogEntry.message.like("%dependency cycle%"))
+        )).all()
+    assert logs == [("acme", f"Service dependency cycle involving {[a.id, b.id]}; checking them ungated.")]
+    await engine.dispose()